@@ -20,7 +20,8 @@
 
 import hmac
 import hashlib
-import urllib
+import time
+import urllib.parse
 import datetime
 
 
@@ -139,6 +140,22 @@ class AWSV4Signer(object):
 
         return request_uri
 
+    # Helper method for generating canonical query string for v4 signing.
+    def fmt_s3_query_params(params):
+        """Returns URL safe query param string sorted by param name.
+
+        Args:
+            params (dict): query parameter names and values, use empty
+            string value for parameters without value e.g. {'uploads': ''}
+
+        Returns:
+            str: e.g. partNumber=1&uploadId=abc
+        """
+        return '&'.join(
+            urllib.parse.quote(key, safe='-_.~') + '=' +
+            urllib.parse.quote(str(params[key]), safe='-_.~')
+            for key in sorted(params))
+
     # generating AWS v4 Authorization signature
     def sign_request_v4(
             self,
@@ -237,3 +254,131 @@ class AWSV4Signer(object):
         # generated in _create_canonical_request()
         headers['x-amz-content-sha256'] = self._body_hash_hex
         return headers
+
+
+class AWSV4SigningContext(object):
+    """Generate Authentication headers for requests to an endpoint.
+
+    Same as AWSV4Signer, but created once per endpoint and credentials,
+    e.g. per S3Session, and reused for all requests. Parsed host, signed
+    header names and signing key are computed once. Signing key depends
+    on date, so it is derived again when UTC date rolls over.
+    """
+
+    _algorithm = 'AWS4-HMAC-SHA256'
+    # Sorted names of headers signed for every request.
+    _signed_headers = 'host;x-amz-content-sha256;x-amz-date'
+
+    def __init__(self, endpoint, service_name, region, access_key, secret_key):
+        """Initialise config."""
+        self._service_name = service_name
+        self._region = region
+        self._access_key = access_key
+        self._secret_key = secret_key
+
+        self._host = urllib.parse.urlparse(endpoint).netloc.strip()
+        self._canonical_host_header = 'host:' + self._host + '\n'
+
+        # Derived on first use and when UTC date changes.
+        self._date_stamp = None
+        self._signing_key = None
+        self._credential_scope = None
+        self._credential_prefix = None
+
+        # x-amz-date for the current second, amz timestamp has no
+        # sub second part.
+        self._amz_timestamp_secs = None
+        self._amz_timestamp = None
+
+    def _get_amz_timestamp(self):
+        """Return current timestamp in YMDTHMSZ format."""
+        now_secs = int(time.time())
+        if now_secs != self._amz_timestamp_secs:
+            self._amz_timestamp = time.strftime(
+                '%Y%m%dT%H%M%SZ', time.gmtime(now_secs))
+            self._amz_timestamp_secs = now_secs
+        return self._amz_timestamp
+
+    def _get_signing_key(self, date_stamp):
+        """Return signing key for date, derived again on date change."""
+        if date_stamp != self._date_stamp:
+            self._signing_key = AWSV4Signer._getV4SignatureKey(
+                self._secret_key, date_stamp, self._region,
+                self._service_name)
+            self._credential_scope = date_stamp + '/' + self._region + \
+                '/' + self._service_name + '/' + 'aws4_request'
+            self._credential_prefix = self._algorithm + ' ' + \
+                'Credential=' + self._access_key + '/' + \
+                self._credential_scope + ', ' + 'SignedHeaders='
+            self._date_stamp = date_stamp
+        return self._signing_key
+
+    def prepare_signed_header(
+            self,
+            http_request,
+            request_uri,
+            query_params,
+            body,
+            epoch_t=None,
+            extra_headers=None):
+        """
+        Generate headers used for authorization requests.
+
+        Parameters are same as AWSV4Signer.prepare_signed_header(). epoch_t
+        is request time as datetime in UTC, defaults to current time.
+        extra_headers are additional headers to be signed, e.g.
+        {'x-amz-copy-source': '/bucket/object'}.
+
+        Returns:
+            headers dictionary with following header keys: Authorization,
+            x-amz-date, x-amz-content-sha256 and keys of extra_headers
+        """
+        if epoch_t is None:
+            amz_timestamp = self._get_amz_timestamp()
+        else:
+            amz_timestamp = AWSV4Signer._get_amz_timestamp(epoch_t)
+        signing_key = self._get_signing_key(amz_timestamp[:8])
+
+        body_256sha_hex = 'UNSIGNED-PAYLOAD'
+        if body:
+            # body has some content.
+            body_256sha_hex = hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+        if extra_headers:
+            headers = {'host': self._host,
+                       'x-amz-content-sha256': body_256sha_hex,
+                       'x-amz-date': amz_timestamp}
+            for key, value in extra_headers.items():
+                headers[key.lower()] = value.strip()
+            sorted_headers = sorted(headers)
+            canonical_headers = ''.join(
+                key + ':' + headers[key] + '\n' for key in sorted_headers)
+            signed_headers = ';'.join(sorted_headers)
+        else:
+            canonical_headers = self._canonical_host_header + \
+                'x-amz-content-sha256:' + body_256sha_hex + '\n' + \
+                'x-amz-date:' + amz_timestamp + '\n'
+            signed_headers = self._signed_headers
+
+        canonical_request = http_request + '\n' + request_uri + '\n' + \
+            query_params + '\n' + canonical_headers + '\n' + \
+            signed_headers + '\n' + body_256sha_hex
+
+        string_to_sign = self._algorithm + '\n' + amz_timestamp + '\n' + \
+            self._credential_scope + '\n' + \
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+
+        signature = hmac.new(
+            signing_key,
+            string_to_sign.encode('utf-8'),
+            hashlib.sha256).hexdigest()
+
+        headers = {'content-type': 'application/x-www-form-urlencoded',
+                   'Accept': 'text/plain',
+                   'Authorization': self._credential_prefix +
+                   signed_headers + ', ' + 'Signature=' + signature,
+                   'x-amz-date': amz_timestamp,
+                   'x-amz-content-sha256': body_256sha_hex}
+        if extra_headers:
+            headers.update(extra_headers)
+        return headers
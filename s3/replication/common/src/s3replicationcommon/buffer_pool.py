@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Pool of fixed size reusable data buffers (slabs)."""
+
+import asyncio
+from collections import deque
+
+
+class BufferLease:
+    """A slab leased from BufferPool, filled from start to end.
+
+    Data is copied in once using write() and handed out without copies
+    as memoryview using view(). Lease must be released once consumer of
+    view() is done with the data, so slab can be reused.
+    """
+
+    def __init__(self, pool, slab):
+        """Initialise lease of slab, pool is None for unpooled slabs."""
+        self._pool = pool
+        self._slab = slab
+        self._view = memoryview(slab)
+        self._length = 0
+
+    def __len__(self):
+        """Returns count of bytes filled in."""
+        return self._length
+
+    def capacity(self):
+        """Returns size of slab."""
+        return len(self._slab)
+
+    def free_space(self):
+        """Returns count of bytes that can still be filled in."""
+        return len(self._slab) - self._length
+
+    def is_full(self):
+        return self._length == len(self._slab)
+
+    def write(self, data):
+        """Copies data at end of filled bytes, like readinto().
+
+        Args:
+            data (bytes-like): Data to copy in.
+
+        Returns:
+            int: Count of bytes copied, less than len(data) if slab is full.
+        """
+        count = min(len(data), self.free_space())
+        self._view[self._length:self._length + count] = data[:count]
+        self._length += count
+        return count
+
+    def view(self):
+        """Returns memoryview of filled bytes without copying."""
+        return self._view[:self._length]
+
+    def release(self):
+        """Return the slab to pool."""
+        if self._slab is None:
+            return
+        self._view.release()
+        if self._pool is not None:
+            self._pool._put(self._slab)
+        self._slab = None
+        self._view = None
+
+
+class BufferPool:
+    """Pool of max_slabs bytearray slabs of slab_size bytes each.
+
+    Slabs are allocated on demand and reused once released. At most
+    max_idle_slabs released slabs are kept for reuse, so memory held by
+    pool shrinks after a burst. acquire() waits in FIFO order when all
+    max_slabs slabs are leased.
+    """
+
+    def __init__(self, slab_size, max_slabs, max_idle_slabs=None):
+        """Initialise pool."""
+        self._slab_size = slab_size
+        self._max_slabs = max_slabs
+        if max_idle_slabs is None:
+            max_idle_slabs = max_slabs
+        self._max_idle_slabs = max_idle_slabs
+
+        self._idle_slabs = []
+        self._waiters = deque()
+        # Count of slabs currently allocated, leased + idle.
+        self._slabs_count = 0
+
+        # Statistics.
+        self._allocations_count = 0
+        self._reuse_count = 0
+        self._max_leased_count = 0
+
+    def get_slab_size(self):
+        return self._slab_size
+
+    def _leased_count(self):
+        return self._slabs_count - len(self._idle_slabs)
+
+    def _lease(self):
+        if self._idle_slabs:
+            self._reuse_count += 1
+            slab = self._idle_slabs.pop()
+        else:
+            self._allocations_count += 1
+            self._slabs_count += 1
+            slab = bytearray(self._slab_size)
+        self._max_leased_count = max(self._max_leased_count,
+                                     self._leased_count())
+        return BufferLease(self, slab)
+
+    async def acquire(self):
+        """Lease a slab, waits if all slabs are leased.
+
+        Returns:
+            BufferLease: Leased slab, release() once done.
+        """
+        if not self._waiters and \
+                (self._idle_slabs or self._slabs_count < self._max_slabs):
+            return self._lease()
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            slab = await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slab just before cancel, pass it on.
+                self._put(waiter.result())
+            raise
+        return BufferLease(self, slab)
+
+    def _put(self, slab):
+        """Called by BufferLease.release() to return slab.
+
+        Slab is handed to first waiter, so a later acquire() does not take
+        it before waiter runs.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._reuse_count += 1
+                waiter.set_result(slab)
+                return
+        if len(self._idle_slabs) < self._max_idle_slabs:
+            self._idle_slabs.append(slab)
+        else:
+            # Let go of slab, so memory is returned.
+            self._slabs_count -= 1
+
+    def get_stats(self):
+        """Returns pool occupancy and allocation statistics."""
+        return {
+            "slab_size": self._slab_size,
+            "max_slabs": self._max_slabs,
+            "allocated_slabs": self._slabs_count,
+            "leased_slabs": self._leased_count(),
+            "idle_slabs": len(self._idle_slabs),
+            "max_leased_slabs": self._max_leased_count,
+            "waiting_count": len(self._waiters),
+            "allocations_count": self._allocations_count,
+            "reuse_count": self._reuse_count
+        }
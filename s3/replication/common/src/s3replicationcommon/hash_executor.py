@@ -0,0 +1,209 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Hashing of transfer data away from event loop."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Data smaller than this is hashed inline, as handing it to a thread
+# costs more than hashing it.
+MAX_INLINE_HASH_SIZE = 262144  # 256 KB
+
+
+class HashStream:
+    """Hash updated in order with chunks of a data stream.
+
+    Updates are queued and hashed in executor threads, so caller can
+    move on to next chunk while previous ones are hashed. Atmost one
+    thread hashes a stream at a time, in order of updates. Small
+    updates are hashed inline when nothing is queued.
+    """
+
+    def __init__(self, executor, hash_obj):
+        """Initialise, use HashExecutor.stream()."""
+        self._executor = executor
+        self._hash = hash_obj
+        self._lock = threading.Lock()
+        self._chunks = deque()
+        self._backlog_bytes = 0
+        # Completes when queued chunks are hashed.
+        self._drain_future = None
+
+    def _drain(self):
+        """Hashes queued chunks, runs in executor thread."""
+        while True:
+            with self._lock:
+                if not self._chunks:
+                    return
+                data = self._chunks[0]
+            start_time = time.perf_counter()
+            self._hash.update(data)
+            self._executor._record_offloaded(
+                len(data), time.perf_counter() - start_time)
+            with self._lock:
+                self._chunks.popleft()
+                self._backlog_bytes -= len(data)
+
+    def _is_draining(self):
+        return self._drain_future is not None and \
+            not self._drain_future.done()
+
+    async def update(self, data):
+        """Updates hash with data.
+
+        Returns once data is hashed or queued, waits for queued data to
+        be hashed when more than max_backlog_bytes are queued.
+        """
+        if not self._is_draining() and \
+                len(data) <= self._executor.max_inline_size:
+            self._executor._hash_inline(self._hash, data)
+            return
+        with self._lock:
+            self._chunks.append(data)
+            self._backlog_bytes += len(data)
+            drain_running = self._is_draining() and len(self._chunks) > 1
+        if not drain_running:
+            # Earlier drain, if any, has seen its queue empty and exited.
+            if self._drain_future is not None:
+                await self._drain_future
+            self._drain_future = asyncio.wrap_future(
+                self._executor._submit(self._drain))
+        if self._backlog_bytes > self._executor.max_backlog_bytes:
+            await self.flush()
+
+    async def flush(self):
+        """Waits till all updates are hashed."""
+        while self._is_draining():
+            await self._drain_future
+        if self._drain_future is not None:
+            # Raise exception of drain if any.
+            self._drain_future.result()
+
+    def digest(self):
+        """Returns digest, call after flush()."""
+        assert not self._chunks, "Hash updates pending, flush first."
+        return self._hash.digest()
+
+    def hexdigest(self):
+        """Returns hex digest, call after flush()."""
+        assert not self._chunks, "Hash updates pending, flush first."
+        return self._hash.hexdigest()
+
+
+class HashExecutor:
+    """Bounded thread pool for hashing transfer data.
+
+    Chunks upto max_inline_size are hashed inline on event loop, larger
+    ones in threads, hashlib releases GIL while hashing large buffers.
+    Time spent hashing on event loop is counted, as it blocks all other
+    transfers in the process.
+    """
+
+    def __init__(self, max_threads=4, max_inline_size=MAX_INLINE_HASH_SIZE,
+                 max_backlog_bytes=16777216):
+        """Initialise.
+
+        Args:
+            max_threads (int): Threads hashing at once across streams.
+            max_inline_size (int): Larger data is hashed in a thread.
+            max_backlog_bytes (int): Per stream, updates wait once more
+            than this is queued for hashing.
+        """
+        self.max_threads = max_threads
+        self.max_inline_size = max_inline_size
+        self.max_backlog_bytes = max_backlog_bytes
+        self._pool = ThreadPoolExecutor(max_workers=max_threads,
+                                        thread_name_prefix="s3hash")
+        self._stats_lock = threading.Lock()
+
+        # Statistics.
+        self._inline_count = 0
+        self._inline_bytes = 0
+        self._inline_time_secs = 0.0
+        self._offloaded_count = 0
+        self._offloaded_bytes = 0
+        self._offloaded_time_secs = 0.0
+
+    def _submit(self, function, *args):
+        return self._pool.submit(function, *args)
+
+    def _hash_inline(self, hash_obj, data):
+        start_time = time.perf_counter()
+        hash_obj.update(data)
+        self._inline_count += 1
+        self._inline_bytes += len(data)
+        self._inline_time_secs += time.perf_counter() - start_time
+
+    def _record_offloaded(self, size, elapsed_secs):
+        with self._stats_lock:
+            self._offloaded_count += 1
+            self._offloaded_bytes += size
+            self._offloaded_time_secs += elapsed_secs
+
+    def _hash_offloaded(self, hash_obj, data):
+        start_time = time.perf_counter()
+        hash_obj.update(data)
+        self._record_offloaded(len(data), time.perf_counter() - start_time)
+
+    def stream(self, hash_obj):
+        """Returns HashStream to hash a data stream using hash_obj."""
+        return HashStream(self, hash_obj)
+
+    async def update(self, hash_obj, data):
+        """Updates hash_obj with data, e.g. to hash a part buffer.
+
+        Returns hash_obj once updated.
+        """
+        if len(data) <= self.max_inline_size:
+            self._hash_inline(hash_obj, data)
+        else:
+            await asyncio.wrap_future(
+                self._submit(self._hash_offloaded, hash_obj, data))
+        return hash_obj
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    def get_stats(self):
+        """Returns hashing statistics, inline time is event loop time."""
+        with self._stats_lock:
+            return {
+                "inline_count": self._inline_count,
+                "inline_bytes": self._inline_bytes,
+                "inline_time_ms": round(self._inline_time_secs * 1000, 3),
+                "offloaded_count": self._offloaded_count,
+                "offloaded_bytes": self._offloaded_bytes,
+                "offloaded_time_ms":
+                    round(self._offloaded_time_secs * 1000, 3)
+            }
+
+
+_default_hash_executor = None
+
+
+def get_default_hash_executor():
+    """Returns process wide HashExecutor, for sessions not given one."""
+    global _default_hash_executor
+    if _default_hash_executor is None:
+        _default_hash_executor = HashExecutor()
+    return _default_hash_executor
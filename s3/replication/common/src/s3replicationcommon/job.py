@@ -17,6 +17,7 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
+import datetime
 import json
 import uuid
 from enum import Enum
@@ -112,9 +113,15 @@ class Job:
         try:
             # Following fields should atleast be present
             # to perform replication.
+            assert self.get_operation_type() in (
+                ReplicationJobType.OBJECT_REPLICATION,
+                ReplicationJobType.OBJECT_TAGS_REPLICATION)
             assert self.get_source_bucket_name() is not None
             assert self.get_source_object_name() is not None
-            assert self.get_source_object_size() is not None
+            if self.get_operation_type() == \
+                    ReplicationJobType.OBJECT_REPLICATION:
+                # Tags replication does not read object data.
+                assert self.get_source_object_size() is not None
 
             assert self.get_source_endpoint() is not None
             assert self.get_source_s3_service_name() is not None
@@ -263,6 +270,28 @@ class Job:
     def get_source_object_size(self):
         return self._obj["source"]["operation"]["attributes"]["Content-Length"]
 
+    def get_source_object_md5(self):
+        """
+        Returns source object md5 if present, else None.
+        """
+        return self._obj["source"]["operation"]["attributes"].get(
+            "Content-MD5", None)
+
+    def get_source_last_modified(self):
+        """
+        Returns Last-Modified of source object version as datetime, None if
+        not present or not in ISO 8601 format used by S3.
+        """
+        last_modified = self._obj["source"]["operation"]["attributes"].get(
+            "Last-Modified", None)
+        if last_modified is None:
+            return None
+        try:
+            return datetime.datetime.strptime(
+                last_modified, "%Y-%m-%dT%H:%M:%S.%fZ")
+        except ValueError:
+            return None
+
     def get_source_endpoint(self):
         return self._obj["source"]["endpoint"]
 
@@ -314,6 +343,15 @@ class Job:
     def get_target_secret_key(self):
         return self._obj["target"]["secret_key"]
 
+    def set_retry_count(self, count):
+        """
+        Sets count of retries used to process job.
+        """
+        self._obj["retry_count"] = count
+
+    def get_retry_count(self):
+        return self._obj.get("retry_count", 0)
+
     def set_subscriber_id(self, sub_id):
         self._obj["subscriber_id"] = sub_id
 
@@ -18,6 +18,7 @@
 #
 
 import asyncio
+import time
 from collections import OrderedDict
 from .job import Job
 from .job import JobState
@@ -36,15 +37,27 @@ class Jobs:
     def list_dumps(obj):
         return json.dumps(obj, cls=JobJsonEncoder)
 
-    def __init__(self, logger, label, timeout=None):
+    def __init__(self, logger, label, timeout=None, coalesce=False,
+                 debounce_secs=0):
         """
         Initialises collection with given label used for logging. Entries in
         Collection will be retained for given timeout. When timeout is
         not specified, entries will remain until explicitly removed.
+
+        When coalesce is True, a job for an object (same source and target
+        object and operation) replaces job of an older version still
+        queued, and takes its place in queue. Versions are ordered by
+        Last-Modified of source object, by arrival when not known, so a
+        late job of an older version is dropped. Queued jobs are held for
+        debounce_secs after first of such versions was queued, so versions
+        of a frequently updated object within that window are replicated
+        once.
         Args:
             logger (logger): For debug logging.
             label (str): Identifies the collection in logs.
             timeout (int, optional): Specified in secs. Defaults to None.
+            coalesce (bool, optional): Replace queued older versions.
+            debounce_secs (int, optional): Hold queued jobs for this long.
         """
         # Dictionary holding replication_id and replication record.
         # e.g. : jobs = {"replication-id": Job({"attribute-1": "foo"})}
@@ -59,11 +72,138 @@ class Jobs:
         # Set of replication-id per Job state.
         # For faster lookups as per state.
         # _jobs = _jobs_queued + _jobs_inprogress + _jobs_completed
+        # Queue position to replication-id queued in it, in queue order. A
+        # position is identified by replication-id first queued in it, a
+        # newer version queued in place of older one keeps its position.
         self._jobs_queued = OrderedDict()
+        # replication-id to its queue position.
+        self._queue_positions = {}
         self._jobs_inprogress = set()
         self._jobs_paused = set()
         self._jobs_completed = set()
 
+        self._coalesce = coalesce
+        self._debounce_secs = debounce_secs
+        # Object key to replication-id of its queued job.
+        self._queued_object_keys = {}
+        # Queue position to time when job can be taken from queue.
+        self._ready_times = {}
+        # replication-id to ready time of jobs taken from queue, to be
+        # queued again with it.
+        self._taken_ready_times = {}
+
+        # Called when a job is added to queue.
+        self._queued_callback = None
+
+        # Statistics.
+        self._coalesced_count = 0
+
+    @staticmethod
+    def _object_key(job):
+        """Identifies object replicated by job, same for all versions."""
+        return (job.get_operation_type(),
+                job.get_source_endpoint_netloc(),
+                job.get_source_bucket_name(),
+                job.get_source_object_name(),
+                job.get_target_endpoint_netloc(),
+                job.get_target_bucket_name())
+
+    @staticmethod
+    def _is_older(job, other_job):
+        """Returns True if job is of an older object version than
+        other_job, False when not known.
+        """
+        last_modified = job.get_source_last_modified()
+        other_last_modified = other_job.get_source_last_modified()
+        return last_modified is not None and \
+            other_last_modified is not None and \
+            last_modified < other_last_modified
+
+    def _drop(self, job, newer_replication_id):
+        """Removes job replaced by job of a newer version."""
+        self._jobs.pop(job.get_replication_id())
+        self._job_id_to_replication_id_map.pop(job.get_job_id(), None)
+        self._coalesced_count += 1
+        self._logger.debug(
+            "Jobs[{}]: Coalesced replication-id {} into {}.".format(
+                self._label, job.get_replication_id(), newer_replication_id))
+
+    def _enqueue(self, job, ready_time=None):
+        """Adds job at end of queue, or in place of queued older version
+        of object when coalescing.
+
+        Args:
+            ready_time (float): When job was taken from queue and is queued
+            again, ready time it was first queued with. Job is added at
+            front of queue, as it was ready before jobs queued. A version
+            of object queued after job was taken replaces it, unless job
+            is newer as per Last-Modified.
+
+        Returns:
+            bool: False if job is dropped, as a newer version is queued.
+        """
+        replication_id = job.get_replication_id()
+        if not self._coalesce:
+            self._jobs_queued[replication_id] = replication_id
+            self._queue_positions[replication_id] = replication_id
+            if ready_time is not None:
+                self._jobs_queued.move_to_end(replication_id, last=False)
+            return True
+
+        object_key = Jobs._object_key(job)
+        queued_replication_id = self._queued_object_keys.get(object_key)
+        if queued_replication_id is None:
+            position = replication_id
+            self._jobs_queued[position] = replication_id
+            if ready_time is None:
+                ready_time = time.monotonic() + self._debounce_secs
+            else:
+                # Job was ready when taken, so it goes ahead of jobs held
+                # for debounce, and first position stays ready first.
+                self._jobs_queued.move_to_end(position, last=False)
+            self._ready_times[position] = ready_time
+        else:
+            queued_job = self._jobs[queued_replication_id]
+            if ready_time is not None:
+                # Queued version arrived after job was taken.
+                keep_queued = not Jobs._is_older(queued_job, job)
+            else:
+                keep_queued = Jobs._is_older(job, queued_job)
+            if keep_queued:
+                self._drop(job, queued_replication_id)
+                return False
+            # Older version is not replicated, newer one replaces it.
+            position = self._queue_positions.pop(queued_replication_id)
+            self._drop(queued_job, replication_id)
+            self._jobs_queued[position] = replication_id
+        self._queue_positions[replication_id] = position
+        self._queued_object_keys[object_key] = replication_id
+        return True
+
+    def _dequeue(self, job):
+        """Removes queued job from queue."""
+        replication_id = job.get_replication_id()
+        position = self._queue_positions.pop(replication_id)
+        self._jobs_queued.pop(position)
+        if self._coalesce:
+            self._taken_ready_times[replication_id] = \
+                self._ready_times.pop(position, 0)
+            self._queued_object_keys.pop(Jobs._object_key(job), None)
+
+    def set_queued_callback(self, callback):
+        """Sets callback to be called when a job is added to queue."""
+        self._queued_callback = callback
+
+    def get_ready_delay(self):
+        """Returns secs till first queued job can be taken from queue, 0 if
+        it can be taken now, None if queue is empty.
+        """
+        for position in self._jobs_queued.keys():
+            # Positions are queued in order of their ready time.
+            return max(0, self._ready_times.get(position, 0) -
+                       time.monotonic())
+        return None
+
     def get_keys(self):
         """Returns all jobs."""
         return self._jobs.keys()
@@ -72,16 +212,21 @@ class Jobs:
         """Clear all jobs."""
         self._jobs.clear()
         self._jobs_queued.clear()
+        self._queue_positions.clear()
+        self._queued_object_keys.clear()
+        self._ready_times.clear()
+        self._taken_ready_times.clear()
         self._jobs_inprogress.clear()
         self._jobs_paused.clear()
         self._jobs_completed.clear()
 
-    def get_queued(self, count=None):
+    def get_queued(self, count=None, ready_only=False):
         """Get list of queued jobs.
 
         Args:
             count (int, optional): Number if jobs to return. Defaults to None.
             When count is None, return all jobs.
+            ready_only (bool, optional): Skip jobs held for debounce.
 
         Returns
         -------
@@ -93,10 +238,13 @@ class Jobs:
             # Return all.
             count = len(self._jobs_queued)
 
+        now = time.monotonic()
         # Only return first 'count' number of entries.
-        for replication_id in self._jobs_queued.keys():
+        for position, replication_id in self._jobs_queued.items():
             if count == 0:
                 break
+            if ready_only and self._ready_times.get(position, 0) > now:
+                continue
             count -= 1
             queued_list.append(
                 self.get_job(replication_id))
@@ -123,12 +271,12 @@ class Jobs:
 
     def move_to_inprogress(self, replication_id):
         """Move job to in-progress list."""
-        if replication_id in self._jobs_queued:
+        if replication_id in self._queue_positions:
             self._logger.debug(
                 "State change [Queued to Inprogress] for replication-id {},".
                 format(replication_id))
 
-            self._jobs_queued.pop(replication_id)
+            self._dequeue(self._jobs[replication_id])
             self._jobs_inprogress.add(replication_id)
         elif replication_id in self._jobs_paused:
             self._logger.debug(
@@ -162,8 +310,10 @@ class Jobs:
             self._logger.debug(
                 "State change [Inprogress to Queued] for replication-id {},".
                 format(replication_id))
-            self._jobs_queued[replication_id] = None
             self._jobs_inprogress.remove(replication_id)
+            # Version queued meanwhile replaces job, unless job is newer.
+            self._enqueue(self._jobs[replication_id],
+                          self._taken_ready_times.pop(replication_id, 0))
         else:
             # If was not in inprogress, then invalid state.
             assert False, "Bug: Invalid state transition for job {}".format(
@@ -176,6 +326,7 @@ class Jobs:
             self._logger.debug(
                 "State change [Inprogress to Complete]" +
                 " for replication-id {},".format(replication_id))
+            self._taken_ready_times.pop(replication_id, None)
             move_across_sets(self._jobs_inprogress, self._jobs_completed,
                              replication_id)
         else:
@@ -202,6 +353,15 @@ class Jobs:
         """
         return len(self._jobs_queued)
 
+    def coalesced_count(self):
+        """
+        Returns count of jobs replaced by job of a newer version.
+
+        Returns:
+            int: Count of coalesced jobs.
+        """
+        return self._coalesced_count
+
     def inprogress_count(self):
         """
         Returns in-progress jobs in collection.
@@ -256,7 +416,11 @@ class Jobs:
         self._job_id_to_replication_id_map[job.get_job_id()] = \
             job.get_replication_id()
         # Initial state is queued.
-        self._jobs_queued[job.get_replication_id()] = None
+        if not self._enqueue(job):
+            # Newer version of object is queued.
+            return True
+        if self._queued_callback is not None:
+            self._queued_callback()
 
         if self._timeout is not None:
             asyncio.ensure_future(
@@ -303,8 +467,9 @@ class Jobs:
         """
         job = self._jobs.pop(replication_id, None)
         if job is not None:
+            self._taken_ready_times.pop(replication_id, None)
             if job.get_state() == JobState.INITIAL:
-                self._jobs_queued.pop(replication_id)
+                self._dequeue(job)
             elif job.get_state() == JobState.RUNNING:
                 self._jobs_inprogress.remove(replication_id)
             elif job.get_state() == JobState.PAUSED:
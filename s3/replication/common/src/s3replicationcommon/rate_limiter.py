@@ -0,0 +1,213 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Bandwidth and request rate limits per S3 site."""
+
+import asyncio
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """Limits rate of a quantity, e.g. bytes, with bursts upto burst_secs
+    worth of rate.
+
+    Each acquire reserves its amount right away and waits till bucket
+    would have had it, so waiters are served in order and an amount
+    larger than the bucket is allowed, just waited for longer. Rate can
+    be changed anytime, rate 0 is no limit.
+    """
+
+    # Waits are split, so rate changes apply to waiters soon.
+    MAX_WAIT_SECS = 1
+
+    def __init__(self, rate=0, burst_secs=1):
+        """Initialise."""
+        self._rate = rate
+        self._burst_secs = burst_secs
+        # Time when reserved amounts are paid for.
+        self._next_free_time = time.monotonic()
+        # Changes on every rate change.
+        self._generation = 0
+
+    def get_rate(self):
+        return self._rate
+
+    def set_rate(self, rate):
+        """Changes rate, 0 for no limit."""
+        self._rate = rate
+        self._next_free_time = time.monotonic()
+        self._generation += 1
+
+    async def acquire(self, amount):
+        """Waits till amount is within rate."""
+        while amount > 0 and self._rate > 0:
+            rate = self._rate
+            generation = self._generation
+            now = time.monotonic()
+            # Burst is allowed once, by waiting only till burst_secs
+            # before reserved amounts are paid for.
+            start_time = max(self._next_free_time, now)
+            self._next_free_time = start_time + amount / rate
+            ready_time = self._next_free_time - self._burst_secs
+            while generation == self._generation:
+                wait_secs = ready_time - time.monotonic()
+                if wait_secs <= 0:
+                    return
+                await asyncio.sleep(
+                    min(wait_secs, TokenBucket.MAX_WAIT_SECS))
+            # Rate changed, amount not yet paid for is waited on at new
+            # rate.
+            amount = max(0, ready_time - time.monotonic()) * rate
+
+
+class RateMeter:
+    """Observed rate of a quantity over last window_secs."""
+
+    def __init__(self, window_secs=10):
+        """Initialise."""
+        self._window_secs = window_secs
+        # (second, amount) per second with activity.
+        self._seconds = deque()
+
+    def record(self, amount):
+        second = int(time.monotonic())
+        if self._seconds and self._seconds[-1][0] == second:
+            self._seconds[-1][1] += amount
+        else:
+            self._seconds.append([second, amount])
+        self._expire(second)
+
+    def _expire(self, second):
+        while self._seconds and \
+                self._seconds[0][0] <= second - self._window_secs:
+            self._seconds.popleft()
+
+    def get_rate(self):
+        """Returns average rate per second over window."""
+        self._expire(int(time.monotonic()))
+        return sum(amount for _, amount in self._seconds) / \
+            self._window_secs
+
+
+class SiteRateLimiter:
+    """Rate limits of an S3 site.
+
+    Bytes read from site (as source) and written to site (as target) are
+    limited separately, requests to site are limited together.
+    """
+
+    LIMITS = ("read_bytes_per_sec", "write_bytes_per_sec",
+              "requests_per_sec")
+
+    def __init__(self, netloc, read_bytes_per_sec=0, write_bytes_per_sec=0,
+                 requests_per_sec=0, burst_secs=1):
+        """Initialise, limit of 0 is no limit."""
+        self.netloc = netloc
+        self._buckets = {
+            "read_bytes_per_sec": TokenBucket(read_bytes_per_sec,
+                                              burst_secs),
+            "write_bytes_per_sec": TokenBucket(write_bytes_per_sec,
+                                               burst_secs),
+            "requests_per_sec": TokenBucket(requests_per_sec, burst_secs)
+        }
+        self._meters = {limit: RateMeter() for limit in self._buckets}
+
+    def set_limits(self, limits):
+        """Changes limits present in limits dictionary.
+
+        Raises:
+            ValueError: Unknown limit or negative value.
+        """
+        for limit, value in limits.items():
+            if limit not in self._buckets:
+                raise ValueError("Unknown rate limit {}".format(limit))
+            if isinstance(value, bool) or \
+                    not isinstance(value, (int, float)) or value < 0:
+                raise ValueError("Invalid value {} for rate limit {}".format(
+                    value, limit))
+        for limit, value in limits.items():
+            self._buckets[limit].set_rate(value)
+
+    def get_limits(self):
+        return {limit: bucket.get_rate()
+                for limit, bucket in self._buckets.items()}
+
+    async def _acquire(self, limit, amount):
+        self._meters[limit].record(amount)
+        await self._buckets[limit].acquire(amount)
+
+    async def acquire_read_bytes(self, size):
+        """Waits till reading size bytes from site is within limit."""
+        await self._acquire("read_bytes_per_sec", size)
+
+    async def acquire_write_bytes(self, size):
+        """Waits till writing size bytes to site is within limit."""
+        await self._acquire("write_bytes_per_sec", size)
+
+    async def acquire_request(self):
+        """Waits till a request to site is within limit."""
+        await self._acquire("requests_per_sec", 1)
+
+    def get_stats(self):
+        """Returns allowed and observed rates, 0 allowed is no limit."""
+        return {
+            limit: {
+                "allowed": self._buckets[limit].get_rate(),
+                "observed": round(self._meters[limit].get_rate(), 3)
+            }
+            for limit in self._buckets
+        }
+
+
+class SiteRateLimits:
+    """Rate limiters of S3 sites, by site netloc.
+
+    Limiter of a site is created on first use without limits, so limits
+    set later apply to sessions already using the site.
+    """
+
+    def __init__(self, site_limits=None, burst_secs=1):
+        """Initialise.
+
+        Args:
+            site_limits (dict): {netloc: {limit: value}}, see
+            SiteRateLimiter.LIMITS.
+        """
+        self._burst_secs = burst_secs
+        self._limiters = {}
+        for netloc, limits in (site_limits or {}).items():
+            self.set_site_limits(netloc, limits)
+
+    def get_site_limiter(self, netloc):
+        """Returns SiteRateLimiter for site, creates if missing."""
+        limiter = self._limiters.get(netloc, None)
+        if limiter is None:
+            limiter = SiteRateLimiter(netloc, burst_secs=self._burst_secs)
+            self._limiters[netloc] = limiter
+        return limiter
+
+    def set_site_limits(self, netloc, limits):
+        """Changes limits of site, see SiteRateLimiter.set_limits()."""
+        self.get_site_limiter(netloc).set_limits(limits)
+
+    def get_stats(self):
+        """Returns allowed and observed rates per site."""
+        return {netloc: limiter.get_stats()
+                for netloc, limiter in self._limiters.items()}
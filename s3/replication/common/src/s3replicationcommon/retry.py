@@ -0,0 +1,295 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Retry of transient failures with jittered exponential backoff."""
+
+import aiohttp
+import asyncio
+import random
+import time
+from s3replicationcommon.log import fmt_reqid_log
+
+# Request timed out, throttled or failed on server, likely to succeed later.
+RETRYABLE_HTTP_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+
+
+class RetryOperation:
+    """Operations with their own retry policy."""
+    GET_OBJECT = "get_object"
+    PUT_OBJECT = "put_object"
+    UPLOAD_PART = "upload_part"
+    COPY_OBJECT = "copy_object"  # Server side copy using CopyObject
+    UPLOAD_PART_COPY = "upload_part_copy"
+    MULTIPART_UPLOAD = "multipart_upload"  # Create/Complete/Abort upload
+    OBJECT_TAGGING = "object_tagging"  # Get/Put object tags
+    HEAD_OBJECT = "head_object"  # Target object check before transfer
+    OBJECT_TRANSFER = "object_transfer"  # Whole replication of an object
+    MANAGER_UPDATE = "manager_update"  # Job status to replication manager
+    REPLICATOR_POST = "replicator_post"  # Jobs to replicator
+
+
+def is_retryable_status(http_status):
+    """Returns True if request failed with http_status can be retried."""
+    return http_status in RETRYABLE_HTTP_STATUSES
+
+
+def is_retryable_error(error):
+    """Returns True if request failed with error can be retried.
+
+    Connection failures, disconnects, truncated responses and timeouts
+    are retryable, other errors e.g. invalid url are fatal.
+    """
+    return isinstance(error, (aiohttp.ClientConnectionError,
+                              aiohttp.ClientPayloadError,
+                              asyncio.TimeoutError))
+
+
+class RetryPolicy:
+    """Retry budget of an operation.
+
+    Delay before each retry is chosen using decorrelated jitter, random
+    between base delay and thrice the previous delay, capped at max
+    delay. Retries of many requests failed together are so spread out
+    instead of hitting the remote in waves.
+    """
+
+    def __init__(self, max_attempts=1, base_delay_ms=100,
+                 max_delay_ms=10000):
+        """Initialise, max_attempts of 1 disables retries."""
+        self.max_attempts = max_attempts
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max_delay_ms
+
+    def next_delay_ms(self, previous_delay_ms):
+        """Returns delay before next retry."""
+        upper_delay_ms = max(self.base_delay_ms, previous_delay_ms * 3)
+        return min(self.max_delay_ms,
+                   random.uniform(self.base_delay_ms, upper_delay_ms))
+
+
+class RetryRateLimiter:
+    """Caps rate of retries across all operations (token bucket).
+
+    When remote is down, every request fails and would be retried, so
+    retries are capped to retries_per_sec with bursts of burst_size.
+    Failures beyond the cap are not retried.
+    """
+
+    def __init__(self, retries_per_sec, burst_size):
+        """Initialise."""
+        self._retries_per_sec = retries_per_sec
+        self._burst_size = burst_size
+        self._tokens = burst_size
+        self._last_refill_time = time.monotonic()
+
+    def try_acquire(self):
+        """Returns True if a retry is allowed now."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst_size,
+            self._tokens +
+            (now - self._last_refill_time) * self._retries_per_sec)
+        self._last_refill_time = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class Retrier:
+    """Tracks retries of one operation, e.g. one request or transfer."""
+
+    def __init__(self, engine, operation, policy, logger=None,
+                 request_id=None):
+        """Initialise, use RetryEngine.retrier()."""
+        self._engine = engine
+        self._operation = operation
+        self._policy = policy
+        self._logger = logger
+        self._request_id = request_id
+
+        self._attempts = 1
+        self._delay_ms = 0
+
+    def get_retry_count(self):
+        return self._attempts - 1
+
+    def next_delay(self, reason):
+        """Reserves a retry of failed attempt.
+
+        Args:
+            reason (str): Failure, logged with retry.
+
+        Returns:
+            float: Seconds to wait before retry, None if retry is not
+            allowed as attempts are exhausted or retry rate cap is hit.
+        """
+        if self._attempts >= self._policy.max_attempts:
+            return None
+        if self._engine is None or \
+                not self._engine._allow_retry(self._request_id):
+            if self._logger is not None:
+                self._logger.warning(
+                    fmt_reqid_log(self._request_id) +
+                    "Not retrying {}, retry rate limit reached: {}".format(
+                        self._operation, reason))
+            return None
+
+        self._attempts += 1
+        self._delay_ms = self._policy.next_delay_ms(self._delay_ms)
+        if self._logger is not None:
+            self._logger.warning(
+                fmt_reqid_log(self._request_id) +
+                "Retrying {} in {:.0f}ms (attempt {} of {}): {}".format(
+                    self._operation, self._delay_ms, self._attempts,
+                    self._policy.max_attempts, reason))
+        return self._delay_ms / 1000
+
+    async def wait_to_retry(self, reason):
+        """Waits before retry of failed attempt.
+
+        Returns:
+            bool: True if operation should be retried.
+        """
+        delay = self.next_delay(reason)
+        if delay is None:
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+
+class RetryEngine:
+    """Retry policies of operations and retry rate cap shared by them.
+
+    Retries are also counted per tracked request id, e.g. job id, so
+    retries used by a job across its requests can be reported.
+    """
+
+    def __init__(self, policies=None, max_retries_per_sec=None,
+                 retry_burst_size=None):
+        """Initialise.
+
+        Args:
+            policies (dict): RetryPolicy per RetryOperation, operations
+            not present are not retried.
+            max_retries_per_sec (float): Cap on retries across operations,
+            None for no cap.
+            retry_burst_size (int): Retries allowed at once within cap.
+        """
+        self._policies = policies or {}
+        self._rate_limiter = None
+        if max_retries_per_sec is not None:
+            if retry_burst_size is None:
+                retry_burst_size = max(1, int(max_retries_per_sec))
+            self._rate_limiter = RetryRateLimiter(
+                max_retries_per_sec, retry_burst_size)
+
+        # Retries per tracked request id.
+        self._retry_counts = {}
+
+        # Statistics.
+        self._retries_count = 0
+        self._rate_limited_count = 0
+
+    def get_policy(self, operation):
+        """Returns RetryPolicy for operation."""
+        return self._policies.get(operation, RetryPolicy())
+
+    def retrier(self, operation, logger=None, request_id=None):
+        """Returns Retrier for one run of operation."""
+        return Retrier(self, operation, self.get_policy(operation),
+                       logger, request_id)
+
+    def _allow_retry(self, request_id):
+        """Called by Retrier to reserve a retry."""
+        if self._rate_limiter is not None and \
+                not self._rate_limiter.try_acquire():
+            self._rate_limited_count += 1
+            return False
+        self._retries_count += 1
+        if request_id in self._retry_counts:
+            self._retry_counts[request_id] += 1
+        return True
+
+    def track_retries(self, request_id):
+        """Starts counting retries of requests using request_id."""
+        self._retry_counts.setdefault(request_id, 0)
+
+    def untrack_retries(self, request_id):
+        """Stops counting retries of request_id.
+
+        Returns:
+            int: Retries used by requests with request_id.
+        """
+        return self._retry_counts.pop(request_id, 0)
+
+    def get_stats(self):
+        """Returns retry statistics."""
+        return {
+            "retries_count": self._retries_count,
+            "rate_limited_count": self._rate_limited_count
+        }
+
+
+def new_retrier(engine, operation, logger=None, request_id=None):
+    """Returns Retrier for operation, one that never retries if engine is
+    None.
+    """
+    if engine is None:
+        return Retrier(None, operation, RetryPolicy(), logger, request_id)
+    return engine.retrier(operation, logger, request_id)
+
+
+async def request_with_retries(retrier, send_request, rate_limiter=None):
+    """Sends http request, retrying transient failures.
+
+    Args:
+        retrier (Retrier): Retrier of operation.
+        send_request (function): Sends request and returns awaitable for
+        its ClientResponse, called for each attempt so request can be
+        signed again.
+        rate_limiter (SiteRateLimiter): Limits rate of attempts, None for
+        no limit.
+
+    Returns:
+        ClientResponse: Response of last attempt, caller should release
+        it e.g. using async with.
+
+    Raises:
+        aiohttp.ClientError, asyncio.TimeoutError: Error of last attempt
+        when it is not retryable or retries are exhausted.
+    """
+    while True:
+        if rate_limiter is not None:
+            await rate_limiter.acquire_request()
+        try:
+            resp = await send_request()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if is_retryable_error(e) and \
+                    await retrier.wait_to_retry(
+                        "{}: {}".format(type(e).__name__, e)):
+                continue
+            raise
+        if is_retryable_status(resp.status):
+            delay = retrier.next_delay("http status {}".format(resp.status))
+            if delay is not None:
+                resp.release()
+                await asyncio.sleep(delay)
+                continue
+        return resp
@@ -17,7 +17,10 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
+import base64
+import binascii
 from enum import Enum
+import xml.etree.ElementTree as ElementTree
 
 
 class S3RequestState(Enum):
@@ -72,3 +75,49 @@ def url_with_resources(base_url, resources=None):
         return base_url
     else:
         return "{}/{}".format(base_url.rstrip('/'), "/".join(resources))
+
+
+def parse_s3_xml(xml_body):
+    """Parses S3 xml response body with namespaces stripped from tags.
+
+    Args
+    -----
+        xml_body (str): XML document returned by S3, e.g. for
+        CreateMultipartUpload or CompleteMultipartUpload.
+
+    Returns
+    -------
+        Root Element of parsed document, None if body is not valid xml.
+    """
+    try:
+        root = ElementTree.fromstring(xml_body)
+    except ElementTree.ParseError:
+        return None
+    for element in root.iter():
+        # '{http://s3.amazonaws.com/doc/2006-03-01/}UploadId' -> 'UploadId'
+        if element.tag.startswith('{'):
+            element.tag = element.tag.split('}', 1)[1]
+    return root
+
+
+def content_md5_header(md5):
+    """Returns value for Content-MD5 http header.
+
+    Args
+    -----
+        md5 (str): MD5 of content as hex string (as in ETag) or base64.
+
+    Returns
+    -------
+        Base64 encoded md5, None if md5 is not a valid md5.
+    """
+    if md5 is None:
+        return None
+    try:
+        if len(md5) == 32:
+            return base64.b64encode(bytes.fromhex(md5)).decode()
+        if len(md5) == 24 and len(base64.b64decode(md5)) == 16:
+            return md5
+    except (ValueError, binascii.Error):
+        pass
+    return None
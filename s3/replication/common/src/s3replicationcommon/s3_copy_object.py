@@ -0,0 +1,190 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import asyncio
+import sys
+
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import is_retryable_error
+from s3replicationcommon.retry import is_retryable_status
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_common import content_md5_header
+from s3replicationcommon.s3_common import parse_s3_xml
+from s3replicationcommon.timer import Timer
+
+
+class S3AsyncCopyObject:
+    """Copies an object within the S3 endpoint of session (CopyObject).
+
+    Data is copied by S3 server, no data is transferred to or from the
+    client. Source object should be readable using session credentials.
+    """
+
+    def __init__(self, session, request_id,
+                 source_bucket_name, source_object_name,
+                 bucket_name, object_name, object_size, content_md5=None):
+        """Initialise.
+
+        When content_md5 of object is known, ETag of copied object is
+        validated against it.
+        """
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._source_bucket_name = source_bucket_name
+        self._source_object_name = source_object_name
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+        self._object_size = object_size
+        self._content_md5 = content_md5
+
+        self.remote_down = False
+        self._http_status = None
+        self._retryable = False
+        self._etag = None
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_execution_time(self):
+        """Return total time for Copy Object operation."""
+        return self._timer.elapsed_time_ms()
+
+    def get_etag(self):
+        """Returns ETag for copied object."""
+        return self._etag
+
+    def is_retryable(self):
+        """Returns True if copy failed on a transient error."""
+        return self._retryable
+
+    async def copy(self):
+        self._state = S3RequestState.RUNNING
+
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = ""
+        body = ""
+        copy_source = AWSV4Signer.fmt_s3_request_uri(
+            self._source_bucket_name, self._source_object_name)
+
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "PUT (copy from {}) on {}".format(
+                              copy_source,
+                              self._session.endpoint + request_uri))
+        retrier = new_retrier(self._session.retry_engine,
+                              RetryOperation.COPY_OBJECT,
+                              self._logger, self._request_id)
+
+        def send_request():
+            headers = self._session.signer.prepare_signed_header(
+                'PUT',
+                request_uri,
+                query_params,
+                body,
+                extra_headers={'x-amz-copy-source': copy_source})
+
+            if (headers['Authorization'] is None):
+                self._logger.error(fmt_reqid_log(self._request_id) +
+                                   "Failed to generate v4 signature")
+                sys.exit(-1)
+
+            self._logger.debug(fmt_reqid_log(self._request_id) +
+                               "PUT with headers {}".format(headers))
+            return self._session.get_client_session().put(
+                self._session.endpoint + request_uri,
+                headers=headers)
+
+        self._timer.start()
+        try:
+            resp = await request_with_retries(
+                retrier, send_request, self._session.rate_limiter)
+            async with resp:
+                self._http_status = resp.status
+                response_body = await resp.text()
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self._timer.stop()
+            self.remote_down = True
+            self._state = S3RequestState.FAILED
+            self._retryable = True
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._timer.stop()
+            self._state = S3RequestState.FAILED
+            self._retryable = is_retryable_error(e)
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Copy Object failed: " + repr(e))
+            return
+        self._timer.stop()
+
+        # CopyObject can fail with 200 OK and Error in body.
+        root = parse_s3_xml(response_body)
+        if self._http_status != 200 or root is None or \
+                root.find('ETag') is None:
+            self._state = S3RequestState.FAILED
+            # Error in body of 200 OK, e.g. InternalError, is transient.
+            self._retryable = is_retryable_status(self._http_status) or \
+                self._http_status == 200
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'Copy Object failed with http status: {} '.
+                format(self._http_status) +
+                'Error Response: {}'.format(response_body))
+            return
+
+        self._etag = root.find('ETag').text.strip("\"")
+        expected_md5 = content_md5_header(self._content_md5)
+        if expected_md5 is not None and \
+                expected_md5 != content_md5_header(self._etag):
+            self._state = S3RequestState.FAILED
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'ETag mismatch. Received {}, Expected {}'.format(
+                    self._etag, self._content_md5))
+            return
+
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            'Copy Object completed with ETag {}'.format(self._etag))
+        self._state = S3RequestState.COMPLETED
+
+    def pause(self):
+        self._state = S3RequestState.PAUSED
+        # XXX Take real pause action
+
+    def resume(self):
+        self._state = S3RequestState.PAUSED
+        # XXX Take real resume action
+
+    def abort(self):
+        self._state = S3RequestState.ABORTED
+        # XXX Take real abort action
@@ -18,17 +18,31 @@
 #
 
 import aiohttp
+import asyncio
+import hashlib
 import sys
 from s3replicationcommon.aws_v4_signer import AWSV4Signer
 from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import is_retryable_error
+from s3replicationcommon.retry import is_retryable_status
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.timer import Timer
 
 
 class S3AsyncGetObject:
     def __init__(self, session, request_id,
-                 bucket_name, object_name, object_size):
-        """Initialise."""
+                 bucket_name, object_name, object_size,
+                 range_read_offset=None, range_read_length=None,
+                 compute_md5=True):
+        """Initialise.
+
+        When range_read_offset and range_read_length are specified, only
+        given byte range of object is fetched. When compute_md5 is True,
+        MD5 of fetched data is computed as data is read.
+        """
         self._session = session
         # Request id for better logging.
         self._request_id = request_id
@@ -38,11 +52,22 @@ class S3AsyncGetObject:
         self._object_name = object_name
         self._object_size = object_size
 
+        self._range_read_offset = range_read_offset
+        self._range_read_length = range_read_length
+
+        self._hash = None
+        if compute_md5:
+            self._hash = session.hash_executor.stream(hashlib.md5())
+
         self.remote_down = False
         self._http_status = None
+        self._retryable = False
 
         self._timer = Timer()
         self._state = S3RequestState.INITIALISED
+        # Cleared while paused, fetch waits on it between chunks.
+        self._resumed = asyncio.Event()
+        self._resumed.set()
 
     def get_state(self):
         """Returns current request state."""
@@ -56,20 +81,25 @@ class S3AsyncGetObject:
         """Returns ETag for object."""
         return self._response_headers["ETag"].strip("\"")
 
-    # yields data chunk for given size
-    async def fetch(self, chunk_size):
-        request_uri = AWSV4Signer.fmt_s3_request_uri(
-            self._bucket_name, self._object_name)
+    def get_md5(self):
+        """Returns MD5 computed on data fetched, None if fetch incomplete."""
+        if self._hash is None or self._state != S3RequestState.COMPLETED:
+            return None
+        return self._hash.hexdigest()
+
+    def get_http_status(self):
+        """Returns http status of response, None if no response."""
+        return self._http_status
+
+    def is_retryable(self):
+        """Returns True if fetch failed on a transient error."""
+        return self._retryable
 
+    def _prepare_headers(self, request_uri, skip_bytes=0):
         query_params = ""
         body = ""
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.signer.prepare_signed_header(
             'GET',
             request_uri,
             query_params,
@@ -80,97 +110,248 @@ class S3AsyncGetObject:
                                "Failed to generate v4 signature")
             sys.exit(-1)
 
-        # Maximum to fetch so we dont keep reading indefinitely.
-        total_to_fetch = self._object_size
+        if skip_bytes > 0:
+            # Rest of data, after a fetch paused midway, of same object.
+            offset = self._range_read_offset or 0
+            fetch_size, _ = self._get_expected_response()
+            headers["Range"] = "bytes={}-{}".format(
+                offset + skip_bytes, offset + fetch_size - 1)
+            headers["If-Match"] = self._response_headers["ETag"]
+        elif self._range_read_length is not None:
+            headers["Range"] = "bytes={}-{}".format(
+                self._range_read_offset,
+                self._range_read_offset + self._range_read_length - 1)
+        return headers
+
+    def _get_expected_response(self):
+        """Returns (bytes to fetch, expected http status)."""
+        if self._range_read_length is not None:
+            return self._range_read_length, 206  # Partial Content
+        return self._object_size, 200
 
+    async def _send_request(self, skip_bytes=0):
+        """Sends GET, retried till response starts. Returns response.
+
+        Args:
+            skip_bytes (int): Bytes already fetched, not fetched again.
+        """
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
         self._logger.info(fmt_reqid_log(self._request_id) +
                           'GET on {}'.format(
                               self._session.endpoint + request_uri))
-        self._logger.debug(fmt_reqid_log(self._request_id) +
-                           "GET with headers {}".format(headers))
+        retrier = new_retrier(self._session.retry_engine,
+                              RetryOperation.GET_OBJECT,
+                              self._logger, self._request_id)
+
+        def send_request():
+            headers = self._prepare_headers(request_uri, skip_bytes)
+            self._logger.debug(fmt_reqid_log(self._request_id) +
+                               "GET with headers {}".format(headers))
+            return self._session.get_client_session().get(
+                self._session.endpoint + request_uri, headers=headers)
+
+        return await request_with_retries(
+            retrier, send_request, self._session.rate_limiter)
+
+    async def _check_response(self, resp, expected_status):
+        """Returns True if response has expected status, else fails."""
+        self._http_status = resp.status
+        if resp.status != expected_status:
+            self._state = S3RequestState.FAILED
+            self._retryable = is_retryable_status(resp.status)
+            error_msg = await resp.text()
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'GET Object failed with http status: {}'.
+                format(resp.status) +
+                'Error Response: {}'.format(error_msg))
+            return False
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            'GET Object completed with http status: {}'.format(
+                resp.status))
+        self._response_headers = resp.headers
+        return True
+
+    def _on_request_error(self, e):
+        """Fails request on connection or timeout error e."""
+        self._state = S3RequestState.FAILED
+        if isinstance(e, aiohttp.client_exceptions.ClientConnectorError):
+            self.remote_down = True
+            self._retryable = True
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+        else:
+            self._retryable = is_retryable_error(e)
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "GET Object failed: " + repr(e))
+
+    # yields data chunk for given size
+    async def fetch(self, chunk_size):
+        """Yields data chunks of upto chunk_size.
+
+        While paused, response is closed so that its connection is not
+        held and does not time out, rest of data is fetched with a range
+        GET on resume.
+        """
+        # Maximum to fetch so we dont keep reading indefinitely.
+        total_to_fetch, expected_status = self._get_expected_response()
+        fetch_size = total_to_fetch
+
+        # Request is retried till response starts, data already yielded
+        # cannot be taken back, so failures after that are for caller.
         self._timer.start()
         try:
-            async with self._session.get_client_session().get(
-                    self._session.endpoint + request_uri,
-                    headers=headers) as resp:
-                self._http_status = resp.status
-                if resp.status == 200:
-                    self._logger.info(
-                        fmt_reqid_log(self._request_id) +
-                        'GET Object completed with http status: {}'.format(
-                            resp.status))
-                else:
-                    self._state = S3RequestState.FAILED
-                    error_msg = await resp.text()
-                    self._logger.error(
-                        fmt_reqid_log(self._request_id) +
-                        'GET Object failed with http status: {}'.
-                        format(resp.status) +
-                        'Error Response: {}'.format(error_msg))
+            resp = await self._send_request()
+            while resp is not None:
+                async with resp:
+                    if not await self._check_response(resp, expected_status):
+                        return
+                    if self._state == S3RequestState.INITIALISED:
+                        self._state = S3RequestState.RUNNING
+                    paused = False
+                    while True:
+                        if not self._resumed.is_set():
+                            self._logger.debug(
+                                fmt_reqid_log(self._request_id) +
+                                "Paused after reading {} bytes".format(
+                                    fetch_size - total_to_fetch))
+                            paused = True
+                            break
+
+                        # If abort requested, stop the loop and return.
+                        if self._state == S3RequestState.ABORTED:
+                            break
+
+                        data_chunk = await resp.content.read(chunk_size)
+                        if not data_chunk:
+                            break
+                        await self._session.rate_limiter.acquire_read_bytes(
+                            len(data_chunk))
+                        self._logger.debug(
+                            fmt_reqid_log(self._request_id) +
+                            "Received data_chunk of size {} bytes.".format(
+                                len(data_chunk)))
+                        if self._hash is not None:
+                            await self._hash.update(data_chunk)
+                        yield data_chunk
+
+                        total_to_fetch = total_to_fetch - len(data_chunk)
+                        if total_to_fetch == 0:
+                            # Completed reading all expected data.
+                            if self._hash is not None:
+                                await self._hash.flush()
+                            self._state = S3RequestState.COMPLETED
+                            break
+                        elif total_to_fetch < 0:
+                            self._state = S3RequestState.FAILED
+                            self._logger.error(
+                                fmt_reqid_log(self._request_id) +
+                                "Received %d more bytes than"
+                                "expected object size of %d",
+                                (total_to_fetch * -1,
+                                 fetch_size))
+                    # end of While True
+                    if paused:
+                        # Unread data is dropped with the connection.
+                        resp.close()
+
+                resp = None
+                if paused:
+                    await self._resumed.wait()
+                    if self._state != S3RequestState.ABORTED:
+                        resp = await self._send_request(
+                            fetch_size - total_to_fetch)
+                        expected_status = 206  # Partial Content
+
+            if self._state == S3RequestState.ABORTED:
+                self._logger.debug(
+                    fmt_reqid_log(self._request_id) +
+                    "Aborted after reading {} bytes for object size of {}".
+                    format(fetch_size - total_to_fetch, fetch_size))
+            elif total_to_fetch > 0:
+                # Connection closed early.
+                self._state = S3RequestState.FAILED
+                self._retryable = True
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    "Received partial object."
+                    "Expected object size (%d), "
+                    "Actual received size (%d)",
+                    fetch_size,
+                    fetch_size - total_to_fetch)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._on_request_error(e)
+        self._timer.stop()
+        return
+
+    async def fetch_into(self, buffer):
+        """Reads object data into buffer, like readinto().
+
+        Meant for small objects that fit in buffer. Each chunk received is
+        copied once into buffer, without joining chunks or yielding them.
+
+        Args:
+            buffer (BufferLease): Buffer with free space for object data.
+        """
+        total_to_fetch, expected_status = self._get_expected_response()
+        start_offset = len(buffer)
+        self._timer.start()
+        try:
+            resp = await self._send_request()
+            async with resp:
+                if not await self._check_response(resp, expected_status):
                     return
-                self._response_headers = resp.headers
                 self._state = S3RequestState.RUNNING
+                fetched_size = 0
                 while True:
-                    # If abort requested, stop the loop and return.
                     if self._state == S3RequestState.ABORTED:
-                        self._logger.debug(
-                            fmt_reqid_log(self._request_id) +
-                            "Aborted after reading %d bytes"
-                            "for object size of %d",
-                            (self._object_size - total_to_fetch,
-                             self._object_size))
-                        break
-
-                    data_chunk = await resp.content.read(chunk_size)
+                        return
+                    data_chunk = await resp.content.readany()
                     if not data_chunk:
                         break
-                    self._logger.debug(
-                        fmt_reqid_log(self._request_id) +
-                        "Received data_chunk of size {} bytes.".format(
-                            len(data_chunk)))
-                    yield data_chunk
-
-                    total_to_fetch = total_to_fetch - len(data_chunk)
-                    if total_to_fetch == 0:
-                        # Completed reading all expected data.
-                        self._state = S3RequestState.COMPLETED
-                        break
-                    elif total_to_fetch < 0:
-                        self._state = S3RequestState.FAILED
-                        self._logger.error(
-                            fmt_reqid_log(self._request_id) +
-                            "Received %d more bytes than"
-                            "expected object size of %d",
-                            (total_to_fetch * -1,
-                             self._object_size))
-                # end of While True
-
-                if self._state != S3RequestState.ABORTED:
-                    if total_to_fetch > 0:
+                    fetched_size += len(data_chunk)
+                    if buffer.write(data_chunk) != len(data_chunk):
                         self._state = S3RequestState.FAILED
                         self._logger.error(
                             fmt_reqid_log(self._request_id) +
-                            "Received partial object."
-                            "Expected object size (%d), "
-                            "Actual received size (%d)",
-                            self._object_size,
-                            self._object_size - total_to_fetch)
-        except aiohttp.client_exceptions.ClientConnectorError as e:
-            self.remote_down = True
-            self._state = S3RequestState.FAILED
-            self._logger.error(fmt_reqid_log(self._request_id) +
-                               "Failed to connect to S3: " + str(e))
-        self._timer.stop()
-        return
+                            "Object data does not fit in buffer of size {}".
+                            format(buffer.capacity()))
+                        return
+                await self._session.rate_limiter.acquire_read_bytes(
+                    fetched_size)
+                if fetched_size != total_to_fetch:
+                    self._state = S3RequestState.FAILED
+                    # Connection closed early.
+                    self._retryable = fetched_size < total_to_fetch
+                    self._logger.error(
+                        fmt_reqid_log(self._request_id) +
+                        "Received {} bytes, expected object size {}".
+                        format(fetched_size, total_to_fetch))
+                    return
+                if self._hash is not None:
+                    await self._hash.update(buffer.view()[start_offset:])
+                    await self._hash.flush()
+                self._state = S3RequestState.COMPLETED
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._on_request_error(e)
+        finally:
+            self._timer.stop()
 
     def pause(self):
-        self._state = S3RequestState.PAUSED
-        # XXX Take real pause action
+        """Pauses fetch before reading next chunk, till resume()."""
+        self._resumed.clear()
+        if self._state == S3RequestState.RUNNING:
+            self._state = S3RequestState.PAUSED
 
     def resume(self):
-        self._state = S3RequestState.PAUSED
-        # XXX Take real resume action
+        self._resumed.set()
+        if self._state == S3RequestState.PAUSED:
+            self._state = S3RequestState.RUNNING
 
     def abort(self):
         self._state = S3RequestState.ABORTED
+        # Paused fetch wakes up to stop.
+        self._resumed.set()
         # XXX Take abort pause action
@@ -0,0 +1,151 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import asyncio
+import sys
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import is_retryable_error
+from s3replicationcommon.retry import is_retryable_status
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.timer import Timer
+
+
+class S3AsyncHeadObject:
+    """Reads metadata of an object (HeadObject), object data is not read."""
+
+    def __init__(self, session, request_id, bucket_name, object_name):
+        """Initialise."""
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+
+        self.remote_down = False
+        self._http_status = None
+        self._retryable = False
+        self._exists = False
+        self._etag = None
+        self._object_size = None
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_execution_time(self):
+        """Return total time for HEAD Object operation."""
+        return self._timer.elapsed_time_ms()
+
+    def get_http_status(self):
+        """Returns http status of response, None if no response."""
+        return self._http_status
+
+    def is_retryable(self):
+        """Returns True if request failed on a transient error."""
+        return self._retryable
+
+    def exists(self):
+        """Returns True if object was found."""
+        return self._exists
+
+    def get_etag(self):
+        """Returns ETag of object without quotes, None if not found."""
+        return self._etag
+
+    def get_object_size(self):
+        """Returns size of object, None if not found."""
+        return self._object_size
+
+    async def head(self):
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = ""
+        body = ""
+        url = self._session.endpoint + request_uri
+
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "HEAD on {}".format(url))
+        retrier = new_retrier(self._session.retry_engine,
+                              RetryOperation.HEAD_OBJECT,
+                              self._logger, self._request_id)
+
+        def send_request():
+            headers = self._session.signer.prepare_signed_header(
+                'HEAD', request_uri, query_params, body)
+            if (headers['Authorization'] is None):
+                self._logger.error(fmt_reqid_log(self._request_id) +
+                                   "Failed to generate v4 signature")
+                sys.exit(-1)
+            self._logger.debug(fmt_reqid_log(self._request_id) +
+                               "HEAD with headers {}".format(headers))
+            return self._session.get_client_session().head(
+                url, headers=headers)
+
+        self._state = S3RequestState.RUNNING
+        self._timer.start()
+        try:
+            resp = await request_with_retries(
+                retrier, send_request, self._session.rate_limiter)
+            async with resp:
+                self._http_status = resp.status
+                if resp.status == 200:
+                    self._exists = True
+                    self._etag = resp.headers.get('ETag', '').strip('"')
+                    self._object_size = int(
+                        resp.headers.get('Content-Length', 0))
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self.remote_down = True
+            self._state = S3RequestState.FAILED
+            self._retryable = True
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._state = S3RequestState.FAILED
+            self._retryable = is_retryable_error(e)
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "HEAD Object failed: " + repr(e))
+            return
+        finally:
+            self._timer.stop()
+
+        if self._http_status not in (200, 404):
+            # HEAD response has no body for error details.
+            self._state = S3RequestState.FAILED
+            self._retryable = is_retryable_status(self._http_status)
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'HEAD Object failed with http status: {}'.format(
+                    self._http_status))
+            return
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            'HEAD Object completed with http status: {}'.format(
+                self._http_status))
+        self._state = S3RequestState.COMPLETED
@@ -0,0 +1,708 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import asyncio
+import base64
+import hashlib
+import sys
+
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.buffer_pool import BufferLease
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import is_retryable_error
+from s3replicationcommon.retry import is_retryable_status
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_common import content_md5_header
+from s3replicationcommon.s3_common import parse_s3_xml
+from s3replicationcommon.timer import Timer
+
+# S3 limits of multipart upload.
+MAX_PARTS_COUNT = 10000
+MIN_PART_SIZE = 5242880  # 5 MB, except last part
+
+
+def get_part_size(object_size, part_size):
+    """Returns size of parts to upload object_size bytes in.
+
+    part_size is raised when object needs more than MAX_PARTS_COUNT parts
+    of part_size, or it is below MIN_PART_SIZE. Raised size is rounded up
+    to a MB.
+    """
+    min_part_size = max(MIN_PART_SIZE, -(-object_size // MAX_PARTS_COUNT))
+    if part_size >= min_part_size:
+        return part_size
+    return -(-min_part_size // 1048576) * 1048576
+
+
+class S3AsyncMultipartUpload:
+    """Uploads an object as multiple parts sent in parallel.
+
+    Data is read sequentially from data_reader and cut into parts of
+    part_size bytes. Up to max_concurrent_parts UploadPart requests run
+    in parallel on the session connection pool. Upload is completed once
+    all parts are uploaded, or aborted on any failure.
+
+    Each part is filled in a part size buffer, leased from buffer_pool
+    when specified, and sent from the buffer without further copies.
+
+    copy() instead creates parts from an object on the same S3 endpoint
+    using UploadPartCopy, so data is copied by S3 server.
+
+    An upload interrupted earlier can be continued using resume_upload(), data
+    reader should then start at first byte of next part.
+    """
+
+    def __init__(self, session, request_id,
+                 bucket_name, object_name, object_size,
+                 part_size, max_concurrent_parts=4, content_md5=None,
+                 buffer_pool=None):
+        """Initialise.
+
+        When content_md5 of object is known, md5 of data read is validated
+        against it before upload is completed. part_size is adjusted as per
+        get_part_size(). Slab size of buffer_pool should be same as
+        part_size, buffer_pool is not used for parts larger than slabs.
+        """
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+        self._object_size = object_size
+
+        self._part_size = get_part_size(object_size, part_size)
+        self._max_concurrent_parts = max_concurrent_parts
+        self._content_md5 = content_md5
+
+        if buffer_pool is not None and \
+                self._part_size > buffer_pool.get_slab_size():
+            # Part size raised for a very large object.
+            buffer_pool = None
+        assert buffer_pool is None or \
+            buffer_pool.get_slab_size() == self._part_size, \
+            "Buffer pool slab size should be part size."
+        self._buffer_pool = buffer_pool
+
+        self._upload_id = None
+        # Completed parts {part_number: {"etag": etag, "md5": md5_digest}}
+        self._parts = {}
+        self._first_part_number = 1
+        self._data_reader = None
+
+        # Set by enable_resume().
+        self._keep_failed_upload = False
+        self._progress_callback = None
+        # Upload cannot be resumed, data uploaded is not valid or upload
+        # no longer exists.
+        self._upload_invalid = False
+
+        self.remote_down = False
+        self._http_status = None
+        self._retryable = False
+        self._response_headers = None
+        self._etag = None
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_execution_time(self):
+        """Return total time for multipart upload operation."""
+        return self._timer.elapsed_time_ms()
+
+    def is_retryable(self):
+        """Returns True if upload failed on a transient error."""
+        return self._retryable
+
+    def get_upload_id(self):
+        """Returns upload id generated by target for this upload."""
+        return self._upload_id
+
+    def get_etag(self):
+        """Returns composite ETag for object e.g. abcd...-4."""
+        return self._etag
+
+    def get_parts(self):
+        """Returns ETags of completed parts as {part_number: etag}."""
+        return {part_number: part["etag"]
+                for part_number, part in self._parts.items()}
+
+    def enable_resume(self, progress_callback):
+        """Keeps upload on transfer failures, so it can be resumed later.
+
+        Args:
+            progress_callback (function): Called with upload id and
+            get_parts() once upload is created and after each part upload.
+        """
+        self._keep_failed_upload = True
+        self._progress_callback = progress_callback
+
+    def can_resume(self):
+        """Returns True if upload failed and was kept to resume later."""
+        return self._state == S3RequestState.FAILED and \
+            self._keep_failed_upload and not self._upload_invalid and \
+            self._upload_id is not None
+
+    def resume_upload(self, upload_id, parts):
+        """Continue upload created earlier instead of creating new one.
+
+        Args:
+            upload_id (str): Upload id of earlier upload.
+            parts (dict): Parts 1..N completed earlier, {part_number: etag}.
+            Data reader should start at first byte of part N + 1.
+        """
+        self._upload_id = upload_id
+        for part_number, etag in parts.items():
+            # ETag of a part is md5 of its data.
+            self._parts[part_number] = {"etag": etag,
+                                        "md5": bytes.fromhex(etag)}
+        self._first_part_number = len(parts) + 1
+
+    def _notify_progress(self):
+        if self._progress_callback is not None:
+            self._progress_callback(self._upload_id, self.get_parts())
+
+    def get_response_header(self, header_key):
+        """Returns response http header value."""
+        if self._state == S3RequestState.COMPLETED:
+            return self._response_headers[header_key]
+        return None
+
+    def _expected_etag(self):
+        """Composite ETag, md5 of concatenated part md5s with -N suffix."""
+        part_numbers = sorted(self._parts)
+        hash_obj = hashlib.md5()
+        for part_number in part_numbers:
+            hash_obj.update(self._parts[part_number]["md5"])
+        return "{}-{}".format(hash_obj.hexdigest(), len(part_numbers))
+
+    async def _acquire_part_buffer(self):
+        """Returns buffer to fill part data in."""
+        if self._buffer_pool is not None:
+            return await self._buffer_pool.acquire()
+        return BufferLease(None, bytearray(self._part_size))
+
+    def _prepare_headers(self, http_request, request_uri, query_params,
+                         body, extra_headers=None):
+        headers = self._session.signer.prepare_signed_header(
+            http_request,
+            request_uri,
+            query_params,
+            body,
+            extra_headers=extra_headers)
+
+        if (headers['Authorization'] is None):
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to generate v4 signature")
+            sys.exit(-1)
+        return headers
+
+    def _new_retrier(self, operation):
+        return new_retrier(self._session.retry_engine, operation,
+                           self._logger, self._request_id)
+
+    def _on_request_error(self, error):
+        """Marks upload failed on request error."""
+        if isinstance(error, aiohttp.client_exceptions.ClientConnectorError):
+            self.remote_down = True
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(error))
+        else:
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Request failed: " + repr(error))
+        self._retryable = is_retryable_error(error)
+        self._state = S3RequestState.FAILED
+
+    async def _create_upload(self):
+        """Initiates multipart upload and saves upload id."""
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = AWSV4Signer.fmt_s3_query_params({'uploads': ''})
+        body = ""
+
+        url = self._session.endpoint + request_uri + '?' + query_params
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "POST on {}".format(url))
+
+        def send_request():
+            headers = self._prepare_headers(
+                'POST', request_uri, query_params, body)
+            self._logger.debug(fmt_reqid_log(self._request_id) +
+                               "POST with headers {}".format(headers))
+            return self._session.get_client_session().post(
+                url, headers=headers)
+
+        resp = await request_with_retries(
+            self._new_retrier(RetryOperation.MULTIPART_UPLOAD), send_request,
+            self._session.rate_limiter)
+        async with resp:
+            self._http_status = resp.status
+            response_body = await resp.text()
+            if resp.status != 200:
+                self._retryable = is_retryable_status(resp.status)
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    'CreateMultipartUpload failed with http status: {} '.
+                    format(resp.status) +
+                    'Error Response: {}'.format(response_body))
+                return False
+
+            root = parse_s3_xml(response_body)
+            if root is None or root.find('UploadId') is None:
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    'CreateMultipartUpload invalid response: {}'.
+                    format(response_body))
+                return False
+            self._upload_id = root.find('UploadId').text
+            self._logger.info(
+                fmt_reqid_log(self._request_id) +
+                'CreateMultipartUpload completed with upload id {}'.
+                format(self._upload_id))
+        return True
+
+    async def _upload_part(self, part_number, part_buffer, part_slots):
+        """Uploads one part and releases its buffer and slot once done."""
+        try:
+            # Sent as is from buffer, no copies.
+            data = part_buffer.view()
+
+            request_uri = AWSV4Signer.fmt_s3_request_uri(
+                self._bucket_name, self._object_name)
+            query_params = AWSV4Signer.fmt_s3_query_params(
+                {'partNumber': part_number, 'uploadId': self._upload_id})
+            body = ""
+
+            # Parts are large, compute md5 away from event loop.
+            hash_obj = await self._session.hash_executor.update(
+                hashlib.md5(), data)
+            md5_digest = hash_obj.digest()
+
+            url = self._session.endpoint + request_uri + '?' + query_params
+
+            def send_request():
+                headers = self._prepare_headers(
+                    'PUT', request_uri, query_params, body)
+                headers["Content-Length"] = str(len(data))
+                # Target validates part data integrity.
+                headers["Content-MD5"] = \
+                    base64.b64encode(md5_digest).decode()
+                self._logger.debug(fmt_reqid_log(self._request_id) +
+                                   "PUT on {}".format(url))
+                return self._session.get_client_session().put(
+                    url, headers=headers, data=data)
+
+            # Part data is in buffer, so part can be sent again.
+            resp = await request_with_retries(
+                self._new_retrier(RetryOperation.UPLOAD_PART), send_request,
+                self._session.rate_limiter)
+            async with resp:
+                if resp.status != 200:
+                    error_msg = await resp.text()
+                    self._logger.error(
+                        fmt_reqid_log(self._request_id) +
+                        'UploadPart {} failed with http status: {} '.
+                        format(part_number, resp.status) +
+                        'Error Response: {}'.format(error_msg))
+                    if resp.status == 404:
+                        # NoSuchUpload, e.g. resumed upload was aborted.
+                        self._upload_invalid = True
+                    self._retryable = is_retryable_status(resp.status)
+                    self._state = S3RequestState.FAILED
+                    return
+                etag = resp.headers["ETag"].strip("\"")
+
+            if etag != md5_digest.hex():
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    'UploadPart {} ETag mismatch.'.format(part_number))
+                self._upload_invalid = True
+                self._state = S3RequestState.FAILED
+                return
+
+            self._parts[part_number] = {"etag": etag, "md5": md5_digest}
+            self._notify_progress()
+            self._logger.debug(
+                fmt_reqid_log(self._request_id) +
+                'UploadPart {} of size {} completed.'.format(
+                    part_number, len(data)))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._on_request_error(e)
+        finally:
+            part_buffer.release()
+            part_slots.release()
+
+    async def _copy_part(self, part_number, copy_source, first_byte,
+                         last_byte, part_slots):
+        """Creates one part from range of source object using UploadPartCopy.
+
+        Releases part slot once done.
+        """
+        try:
+            request_uri = AWSV4Signer.fmt_s3_request_uri(
+                self._bucket_name, self._object_name)
+            query_params = AWSV4Signer.fmt_s3_query_params(
+                {'partNumber': part_number, 'uploadId': self._upload_id})
+            body = ""
+
+            url = self._session.endpoint + request_uri + '?' + query_params
+
+            def send_request():
+                headers = self._prepare_headers(
+                    'PUT', request_uri, query_params, body,
+                    {'x-amz-copy-source': copy_source,
+                     'x-amz-copy-source-range': 'bytes={}-{}'.format(
+                         first_byte, last_byte)})
+                self._logger.debug(fmt_reqid_log(self._request_id) +
+                                   "PUT (copy) on {}".format(url))
+                return self._session.get_client_session().put(
+                    url, headers=headers)
+
+            resp = await request_with_retries(
+                self._new_retrier(RetryOperation.UPLOAD_PART_COPY),
+                send_request, self._session.rate_limiter)
+            async with resp:
+                http_status = resp.status
+                response_body = await resp.text()
+
+            # UploadPartCopy can fail with 200 OK and Error in body.
+            root = parse_s3_xml(response_body)
+            if http_status != 200 or root is None or \
+                    root.find('ETag') is None:
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    'UploadPartCopy {} failed with http status: {} '.
+                    format(part_number, http_status) +
+                    'Error Response: {}'.format(response_body))
+                # Error in body of 200 OK, e.g. InternalError, is
+                # transient.
+                self._retryable = is_retryable_status(http_status) or \
+                    http_status == 200
+                self._state = S3RequestState.FAILED
+                return
+            etag = root.find('ETag').text.strip("\"")
+
+            try:
+                # ETag of a part is md5 of its data.
+                md5_digest = bytes.fromhex(etag)
+            except ValueError:
+                md5_digest = None
+            if md5_digest is None or len(md5_digest) != 16:
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    'UploadPartCopy {} invalid ETag {}.'.format(
+                        part_number, etag))
+                self._state = S3RequestState.FAILED
+                return
+
+            self._parts[part_number] = {"etag": etag, "md5": md5_digest}
+            self._logger.debug(
+                fmt_reqid_log(self._request_id) +
+                'UploadPartCopy {} of size {} completed.'.format(
+                    part_number, last_byte - first_byte + 1))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._on_request_error(e)
+        finally:
+            part_slots.release()
+
+    async def _complete_upload(self):
+        """Completes upload using uploaded parts and validates ETag."""
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = AWSV4Signer.fmt_s3_query_params(
+            {'uploadId': self._upload_id})
+
+        body = "<CompleteMultipartUpload>"
+        for part_number in sorted(self._parts):
+            body += "<Part><PartNumber>{}</PartNumber>" \
+                "<ETag>\"{}\"</ETag></Part>".format(
+                    part_number, self._parts[part_number]["etag"])
+        body += "</CompleteMultipartUpload>"
+
+        url = self._session.endpoint + request_uri + '?' + query_params
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "POST on {}".format(url))
+
+        def send_request():
+            headers = self._prepare_headers(
+                'POST', request_uri, query_params, body)
+            return self._session.get_client_session().post(
+                url, headers=headers, data=body)
+
+        resp = await request_with_retries(
+            self._new_retrier(RetryOperation.MULTIPART_UPLOAD), send_request,
+            self._session.rate_limiter)
+        async with resp:
+            self._http_status = resp.status
+            self._response_headers = resp.headers
+            response_body = await resp.text()
+
+        # CompleteMultipartUpload can fail with 200 OK and Error in body.
+        root = parse_s3_xml(response_body)
+        if self._http_status != 200 or root is None or \
+                root.find('ETag') is None:
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'CompleteMultipartUpload failed with http status: {} '.
+                format(self._http_status) +
+                'Error Response: {}'.format(response_body))
+            self._retryable = is_retryable_status(self._http_status)
+            return False
+
+        self._etag = root.find('ETag').text.strip("\"")
+        expected_etag = self._expected_etag()
+        if self._etag != expected_etag:
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'ETag mismatch. Received {}, Expected {}'.format(
+                    self._etag, expected_etag))
+            self._upload_invalid = True
+            return False
+
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            'CompleteMultipartUpload completed with ETag {}'.format(
+                self._etag))
+        return True
+
+    async def _abort_upload(self):
+        """Aborts upload so target can release uploaded parts.
+
+        Returns:
+            bool: True if upload was aborted or no longer exists.
+        """
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = AWSV4Signer.fmt_s3_query_params(
+            {'uploadId': self._upload_id})
+        body = ""
+
+        url = self._session.endpoint + request_uri + '?' + query_params
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "DELETE on {}".format(url))
+
+        def send_request():
+            headers = self._prepare_headers(
+                'DELETE', request_uri, query_params, body)
+            return self._session.get_client_session().delete(
+                url, headers=headers)
+
+        try:
+            resp = await request_with_retries(
+                self._new_retrier(RetryOperation.MULTIPART_UPLOAD),
+                send_request, self._session.rate_limiter)
+            async with resp:
+                if resp.status in (204, 404):
+                    # 404, upload was aborted or completed earlier.
+                    return True
+                error_msg = await resp.text()
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    'AbortMultipartUpload failed with http status: {} '.
+                    format(resp.status) +
+                    'Error Response: {}'.format(error_msg))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if isinstance(e, aiohttp.client_exceptions.ClientConnectorError):
+                self.remote_down = True
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "AbortMultipartUpload failed: " + repr(e))
+        return False
+
+    async def _start_upload(self):
+        """Initiates upload, returns False on failure."""
+        self._state = S3RequestState.RUNNING
+        self._timer.start()
+        if self._upload_id is not None:
+            self._logger.info(
+                fmt_reqid_log(self._request_id) +
+                'Resuming upload id {} from part {}'.format(
+                    self._upload_id, self._first_part_number))
+            return True
+        try:
+            if await self._create_upload():
+                self._notify_progress()
+            else:
+                self._state = S3RequestState.FAILED
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._on_request_error(e)
+
+        if self._state != S3RequestState.RUNNING:
+            self._timer.stop()
+            return False
+        return True
+
+    async def _finish_upload(self):
+        """Completes upload if all parts are done, else aborts it."""
+        if self._state == S3RequestState.RUNNING:
+            try:
+                if await self._complete_upload():
+                    self._state = S3RequestState.COMPLETED
+                else:
+                    self._state = S3RequestState.FAILED
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._on_request_error(e)
+
+        if self.can_resume():
+            self._logger.info(
+                fmt_reqid_log(self._request_id) +
+                'Keeping upload id {} with {} parts to resume later'.format(
+                    self._upload_id, len(self._parts)))
+        elif self._state != S3RequestState.COMPLETED:
+            # Release the parts uploaded so far.
+            await self._abort_upload()
+        self._timer.stop()
+
+    async def abort_upload(self):
+        """Aborts upload on target, e.g. upload set by resume_upload().
+
+        Returns:
+            bool: True if upload was aborted or no longer exists.
+        """
+        return await self._abort_upload()
+
+    # data_reader is object with fetch method that can yeild data
+    async def send(self, data_reader, transfer_size):
+        self._data_reader = data_reader
+        if not await self._start_upload():
+            return
+
+        # Limits parts in flight, so at most max_concurrent_parts parts
+        # are being uploaded while next part is being read.
+        part_slots = asyncio.Semaphore(self._max_concurrent_parts)
+        part_tasks = []
+        part_number = self._first_part_number
+        part_buffer = None
+
+        data_chunks = data_reader.fetch(transfer_size)
+        try:
+            async for data_chunk in data_chunks:
+                await self._session.rate_limiter.acquire_write_bytes(
+                    len(data_chunk))
+                chunk_view = memoryview(data_chunk)
+                while len(chunk_view) > 0 and \
+                        self._state == S3RequestState.RUNNING:
+                    if part_buffer is None:
+                        part_buffer = await self._acquire_part_buffer()
+                    copied_size = part_buffer.write(chunk_view)
+                    chunk_view = chunk_view[copied_size:]
+                    if part_buffer.is_full():
+                        await part_slots.acquire()
+                        if self._state != S3RequestState.RUNNING:
+                            # A part upload failed while waiting for slot.
+                            part_slots.release()
+                            break
+                        part_tasks.append(asyncio.ensure_future(
+                            self._upload_part(
+                                part_number, part_buffer, part_slots)))
+                        part_buffer = None
+                        part_number += 1
+                if self._state != S3RequestState.RUNNING:
+                    # Aborted or one of the part uploads failed.
+                    data_reader.abort()
+                    break
+
+            if self._state == S3RequestState.RUNNING and \
+                    data_reader.get_state() == S3RequestState.COMPLETED and \
+                    (part_buffer is not None or not self._parts and
+                     part_number == 1):
+                # Last part can be smaller than part size, part left when
+                # reader failed midway is not uploaded.
+                if part_buffer is None:
+                    part_buffer = await self._acquire_part_buffer()
+                await part_slots.acquire()
+                part_tasks.append(asyncio.ensure_future(self._upload_part(
+                    part_number, part_buffer, part_slots)))
+                part_buffer = None
+        finally:
+            await data_chunks.aclose()
+            if part_buffer is not None:
+                part_buffer.release()
+
+        await asyncio.gather(*part_tasks)
+
+        if self._state == S3RequestState.RUNNING:
+            if data_reader.get_state() != S3RequestState.COMPLETED:
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    "Failed to read source data for multipart upload.")
+                self._retryable = data_reader.is_retryable()
+                self._state = S3RequestState.FAILED
+            elif self._first_part_number == 1 and \
+                    content_md5_header(self._content_md5) is not None and \
+                    content_md5_header(self._content_md5) != \
+                    content_md5_header(data_reader.get_md5()):
+                # When resumed, data read is not whole object, so only
+                # part ETags are validated.
+                self._logger.error(
+                    fmt_reqid_log(self._request_id) +
+                    "MD5 mismatch. Read {}, Expected {}".format(
+                        data_reader.get_md5(), self._content_md5))
+                self._upload_invalid = True
+                self._state = S3RequestState.FAILED
+
+        await self._finish_upload()
+
+    async def copy(self, source_bucket_name, source_object_name):
+        """Creates object from source object on same S3 endpoint."""
+        if not await self._start_upload():
+            return
+
+        copy_source = AWSV4Signer.fmt_s3_request_uri(
+            source_bucket_name, source_object_name)
+        part_slots = asyncio.Semaphore(self._max_concurrent_parts)
+        part_tasks = []
+        part_number = 1
+        for first_byte in range(0, self._object_size, self._part_size):
+            await part_slots.acquire()
+            if self._state != S3RequestState.RUNNING:
+                # Aborted or one of the part copies failed.
+                part_slots.release()
+                break
+            last_byte = min(first_byte + self._part_size,
+                            self._object_size) - 1
+            part_tasks.append(asyncio.ensure_future(self._copy_part(
+                part_number, copy_source, first_byte, last_byte,
+                part_slots)))
+            part_number += 1
+
+        await asyncio.gather(*part_tasks)
+        await self._finish_upload()
+
+    def pause(self):
+        self._state = S3RequestState.PAUSED
+        # XXX Take real pause action
+
+    def resume(self):
+        self._state = S3RequestState.PAUSED
+        # XXX Take real resume action
+
+    def abort(self):
+        self._state = S3RequestState.ABORTED
+        # Abort the reader so that upload can stop.
+        if self._data_reader is not None:
+            self._data_reader.abort()
@@ -0,0 +1,227 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import asyncio
+import hashlib
+import sys
+from xml.sax.saxutils import escape
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import is_retryable_error
+from s3replicationcommon.retry import is_retryable_status
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_common import content_md5_header
+from s3replicationcommon.s3_common import parse_s3_xml
+from s3replicationcommon.timer import Timer
+
+
+class S3AsyncObjectTaggingRequest:
+    """Common part of GetObjectTagging and PutObjectTagging requests."""
+
+    def __init__(self, session, request_id, bucket_name, object_name):
+        """Initialise."""
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+
+        self.remote_down = False
+        self._http_status = None
+        self._retryable = False
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_execution_time(self):
+        """Return total time for request."""
+        return self._timer.elapsed_time_ms()
+
+    def get_http_status(self):
+        """Returns http status of response, None if no response."""
+        return self._http_status
+
+    def is_retryable(self):
+        """Returns True if request failed on a transient error."""
+        return self._retryable
+
+    async def _send(self, http_request, body=""):
+        """Sends tagging request with retries.
+
+        Returns:
+            str: Response body, None on failure.
+        """
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = AWSV4Signer.fmt_s3_query_params({'tagging': ''})
+        url = self._session.endpoint + request_uri + '?' + query_params
+        extra_headers = None
+        if body:
+            extra_headers = {
+                'Content-MD5': content_md5_header(
+                    hashlib.md5(body.encode('utf-8')).hexdigest())}
+
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "{} on {}".format(http_request, url))
+        retrier = new_retrier(self._session.retry_engine,
+                              RetryOperation.OBJECT_TAGGING,
+                              self._logger, self._request_id)
+
+        def send_request():
+            headers = self._session.signer.prepare_signed_header(
+                http_request, request_uri, query_params, body,
+                extra_headers=extra_headers)
+            if (headers['Authorization'] is None):
+                self._logger.error(fmt_reqid_log(self._request_id) +
+                                   "Failed to generate v4 signature")
+                sys.exit(-1)
+            self._logger.debug(fmt_reqid_log(self._request_id) +
+                               "{} with headers {}".format(
+                                   http_request, headers))
+            return self._session.get_client_session().request(
+                http_request, url, headers=headers, data=body or None)
+
+        self._state = S3RequestState.RUNNING
+        self._timer.start()
+        try:
+            resp = await request_with_retries(
+                retrier, send_request, self._session.rate_limiter)
+            async with resp:
+                self._http_status = resp.status
+                response_body = await resp.text()
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self.remote_down = True
+            self._state = S3RequestState.FAILED
+            self._retryable = True
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._state = S3RequestState.FAILED
+            self._retryable = is_retryable_error(e)
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "{} tagging failed: ".format(http_request) +
+                               repr(e))
+            return None
+        finally:
+            self._timer.stop()
+
+        if self._http_status != 200:
+            self._state = S3RequestState.FAILED
+            self._retryable = is_retryable_status(self._http_status)
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                '{} tagging failed with http status: {} '.format(
+                    http_request, self._http_status) +
+                'Error Response: {}'.format(response_body))
+            return None
+        return response_body
+
+    def pause(self):
+        self._state = S3RequestState.PAUSED
+        # XXX Take real pause action
+
+    def resume(self):
+        self._state = S3RequestState.PAUSED
+        # XXX Take real resume action
+
+    def abort(self):
+        self._state = S3RequestState.ABORTED
+        # XXX Take real abort action
+
+
+class S3AsyncGetObjectTagging(S3AsyncObjectTaggingRequest):
+    """Reads tags of an object (GetObjectTagging)."""
+
+    def __init__(self, session, request_id, bucket_name, object_name):
+        """Initialise."""
+        super().__init__(session, request_id, bucket_name, object_name)
+        self._tags = None
+
+    def get_tags(self):
+        """Returns tags as {key: value}, None if get incomplete."""
+        if self._state != S3RequestState.COMPLETED:
+            return None
+        return self._tags
+
+    async def get(self):
+        response_body = await self._send('GET')
+        if response_body is None:
+            return
+
+        root = parse_s3_xml(response_body)
+        if root is None:
+            self._state = S3RequestState.FAILED
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                'GetObjectTagging invalid response: {}'.format(
+                    response_body))
+            return
+        self._tags = {}
+        for tag in root.iter('Tag'):
+            self._tags[tag.findtext('Key')] = tag.findtext('Value') or ""
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            'GetObjectTagging completed with {} tags'.format(
+                len(self._tags)))
+        self._state = S3RequestState.COMPLETED
+
+
+class S3AsyncPutObjectTagging(S3AsyncObjectTaggingRequest):
+    """Replaces tags of an object (PutObjectTagging), empty tags remove
+    all tags of object.
+    """
+
+    def __init__(self, session, request_id, bucket_name, object_name,
+                 tags):
+        """Initialise.
+
+        Args:
+            tags (dict): Tags as {key: value}.
+        """
+        super().__init__(session, request_id, bucket_name, object_name)
+        self._tags = tags
+
+    def _tagging_xml(self):
+        tag_set = "".join(
+            "<Tag><Key>{}</Key><Value>{}</Value></Tag>".format(
+                escape(key), escape(value))
+            for key, value in self._tags.items())
+        return '<?xml version="1.0" encoding="UTF-8"?>' \
+            '<Tagging xmlns="http://s3.amazonaws.com/doc/2006-03-01/">' \
+            '<TagSet>{}</TagSet></Tagging>'.format(tag_set)
+
+    async def put(self):
+        if await self._send('PUT', self._tagging_xml()) is None:
+            return
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            'PutObjectTagging completed with {} tags'.format(
+                len(self._tags)))
+        self._state = S3RequestState.COMPLETED
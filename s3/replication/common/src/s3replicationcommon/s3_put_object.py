@@ -18,18 +18,30 @@
 #
 
 import aiohttp
+import asyncio
+import hashlib
 import sys
 
 from s3replicationcommon.aws_v4_signer import AWSV4Signer
 from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import is_retryable_error
+from s3replicationcommon.retry import is_retryable_status
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
 from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_common import content_md5_header
 from s3replicationcommon.timer import Timer
 
 
 class S3AsyncPutObject:
     def __init__(self, session, request_id,
-                 bucket_name, object_name, object_size):
-        """Initialise."""
+                 bucket_name, object_name, object_size, content_md5=None):
+        """Initialise.
+
+        When content_md5 of object is known, it is sent as Content-MD5
+        so target can reject the object if data received does not match.
+        """
         self._session = session
         # Request id for better logging.
         self._request_id = request_id
@@ -38,9 +50,12 @@ class S3AsyncPutObject:
         self._bucket_name = bucket_name
         self._object_name = object_name
         self._object_size = object_size
+        self._content_md5 = content_md5
+        self._data_reader = None
 
         self.remote_down = False
         self._http_status = None
+        self._retryable = False
 
         self._timer = Timer()
         self._state = S3RequestState.INITIALISED
@@ -63,50 +78,70 @@ class S3AsyncPutObject:
         """Returns ETag for object."""
         return self._response_headers["ETag"].strip("\"")
 
+    def is_retryable(self):
+        """Returns True if PUT failed on a transient error."""
+        return self._retryable
+
     # data_reader is object with fetch method that can yeild data
     async def send(self, data_reader, transfer_size):
-        self._state = S3RequestState.RUNNING
         self._data_reader = data_reader
+        # Read all data from data_reader, data streamed cannot be sent
+        # again, so failures are retried by caller with a new reader.
+        await self._send(self._read_data(data_reader, transfer_size),
+                         data_reader.get_md5, None)
+
+    async def _read_data(self, data_reader, transfer_size):
+        async for data_chunk in data_reader.fetch(transfer_size):
+            await self._session.rate_limiter.acquire_write_bytes(
+                len(data_chunk))
+            yield data_chunk
+        if data_reader.get_state() == S3RequestState.FAILED:
+            # Fail the request, else target waits for rest of the data.
+            raise aiohttp.ClientPayloadError("Failed to read source data")
+
+    async def send_data(self, data):
+        """PUT object with data already in memory, e.g. small objects.
+
+        Args:
+            data (bytes-like): Object data, sent as is without copies.
+        """
+        hash_obj = await self._session.hash_executor.update(
+            hashlib.md5(), data)
+        data_md5 = hash_obj.hexdigest()
+        await self._session.rate_limiter.acquire_write_bytes(len(data))
+        # Data in memory can be sent again on transient failures.
+        await self._send(data, lambda: data_md5, self._session.retry_engine)
+
+    async def _send(self, data, get_data_md5, retry_engine):
+        """PUT data, get_data_md5() returns md5 of data once sent."""
+        self._state = S3RequestState.RUNNING
 
         request_uri = AWSV4Signer.fmt_s3_request_uri(
             self._bucket_name, self._object_name)
 
-        query_params = ""
-        body = ""
-
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
-            'PUT',
-            request_uri,
-            query_params,
-            body)
-
-        if (headers['Authorization'] is None):
-            self._logger.error(fmt_reqid_log(self._request_id) +
-                               "Failed to generate v4 signature")
-            sys.exit(-1)
-
-        headers["Content-Length"] = str(self._object_size)
-
         self._logger.info(fmt_reqid_log(self._request_id) +
                           "PUT on {}".format(
                               self._session.endpoint + request_uri))
-        self._logger.debug(fmt_reqid_log(self._request_id) +
-                           "PUT with headers {}".format(headers))
+        retrier = new_retrier(retry_engine, RetryOperation.PUT_OBJECT,
+                              self._logger, self._request_id)
+
+        def send_request():
+            headers = self._prepare_headers(request_uri)
+            self._logger.debug(fmt_reqid_log(self._request_id) +
+                               "PUT with headers {}".format(headers))
+            return self._session.get_client_session().put(
+                self._session.endpoint + request_uri,
+                headers=headers,
+                data=data)
+
         self._timer.start()
         try:
-            async with self._session.get_client_session().put(
-                    self._session.endpoint + request_uri,
-                    headers=headers,
-                    # Read all data from data_reader
-                    data=data_reader.fetch(transfer_size)) as resp:
+            resp = await request_with_retries(
+                retrier, send_request, self._session.rate_limiter)
+            async with resp:
                 self._timer.stop()
 
-                if data_reader.get_state() != S3RequestState.ABORTED:
+                if self._state != S3RequestState.ABORTED:
                     self._http_status = resp.status
                     self._response_headers = resp.headers
 
@@ -115,30 +150,60 @@ class S3AsyncPutObject:
                         'PUT Object completed with http status: {}'.format(
                             resp.status))
 
-                    # Validate if upload object etag matches.
-                    if self.get_etag() != data_reader.get_etag():
-                        self._state = S3RequestState.FAILED
-                        error_msg = "ETag mismatch."
-                        self._logger.error(
-                            fmt_reqid_log(self._request_id) +
-                            'Error Response: {}'.format(error_msg))
-
                     if resp.status == 200:
-                        self._state = S3RequestState.COMPLETED
+                        # Validate if upload object etag matches md5 of
+                        # data sent.
+                        if self.get_etag() != get_data_md5():
+                            self._state = S3RequestState.FAILED
+                            error_msg = "ETag mismatch."
+                            self._logger.error(
+                                fmt_reqid_log(self._request_id) +
+                                'Error Response: {}'.format(error_msg))
+                        else:
+                            self._state = S3RequestState.COMPLETED
                     else:
                         error_msg = await resp.text()
                         self._logger.error(
                             fmt_reqid_log(self._request_id) +
                             'Error Response: {}'.format(error_msg))
+                        self._retryable = is_retryable_status(resp.status)
                         self._state = S3RequestState.FAILED
         except aiohttp.client_exceptions.ClientConnectorError as e:
             self._timer.stop()
             self.remote_down = True
+            self._retryable = True
             self._state = S3RequestState.FAILED
             self._logger.error(fmt_reqid_log(self._request_id) +
                                "Failed to connect to S3: " + str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._timer.stop()
+            self._retryable = is_retryable_error(e)
+            self._state = S3RequestState.FAILED
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "PUT Object failed: " + repr(e))
         return
 
+    def _prepare_headers(self, request_uri):
+        query_params = ""
+        body = ""
+
+        headers = self._session.signer.prepare_signed_header(
+            'PUT',
+            request_uri,
+            query_params,
+            body)
+
+        if (headers['Authorization'] is None):
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to generate v4 signature")
+            sys.exit(-1)
+
+        headers["Content-Length"] = str(self._object_size)
+        content_md5 = content_md5_header(self._content_md5)
+        if content_md5 is not None:
+            headers["Content-MD5"] = content_md5
+        return headers
+
     def pause(self):
         self._state = S3RequestState.PAUSED
         # XXX Take real pause action
@@ -150,4 +215,5 @@ class S3AsyncPutObject:
     def abort(self):
         self._state = S3RequestState.ABORTED
         # Abort the reader so that PUT can stop.
-        self._data_reader.abort()
+        if self._data_reader is not None:
+            self._data_reader.abort()
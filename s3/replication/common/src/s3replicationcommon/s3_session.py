@@ -18,12 +18,33 @@
 #
 
 import aiohttp
+from s3replicationcommon.aws_v4_signer import AWSV4SigningContext
+from s3replicationcommon.hash_executor import get_default_hash_executor
+from s3replicationcommon.rate_limiter import SiteRateLimiter
 
 
 class S3Session:
     def __init__(self, logger, s3_site, access_key, secret_key,
-                 number_of_connections=100):
-        """Initialise S3 session."""
+                 number_of_connections=100, retry_engine=None,
+                 transport_profile=None, client_session=None,
+                 hash_executor=None, rate_limiter=None):
+        """Initialise S3 session.
+
+        Requests sent using session retry transient failures as per
+        policies of retry_engine, not retried when it is None. When
+        transport_profile is specified, connection pool is set up as per
+        profile and number_of_connections is not used.
+
+        When client_session is specified, requests are sent using it, so
+        sessions of many accounts to a site can share its connection
+        pool. It is then owned by caller and not closed by close().
+
+        Data sent or received using session is hashed using
+        hash_executor, process wide default executor when None.
+
+        Requests and data to site are limited by rate_limiter, shared by
+        sessions to site, no limits when None.
+        """
         self.logger = logger
         self.endpoint = s3_site.endpoint
         self.service_name = s3_site.service_name
@@ -32,11 +53,31 @@ class S3Session:
         self.access_key = access_key
         self.secret_key = secret_key
 
-        connector = aiohttp.TCPConnector(limit=number_of_connections)
-        self._client_session = aiohttp.ClientSession(connector=connector)
+        # Signs all requests sent using this session.
+        self.signer = AWSV4SigningContext(
+            self.endpoint, self.service_name, self.region,
+            access_key, secret_key)
+
+        self.retry_engine = retry_engine
+        self.hash_executor = hash_executor or get_default_hash_executor()
+        self.rate_limiter = rate_limiter or \
+            SiteRateLimiter(s3_site.get_netloc())
+
+        self.transport_profile = transport_profile
+        self._owns_client_session = client_session is None
+        if client_session is not None:
+            self._client_session = client_session
+        elif transport_profile is not None:
+            self._client_session = aiohttp.ClientSession(
+                connector=transport_profile.create_connector(),
+                timeout=transport_profile.create_timeout())
+        else:
+            connector = aiohttp.TCPConnector(limit=number_of_connections)
+            self._client_session = aiohttp.ClientSession(connector=connector)
 
     def get_client_session(self):
         return self._client_session
 
     async def close(self):
-        await self._client_session.close()
+        if self._owns_client_session:
+            await self._client_session.close()
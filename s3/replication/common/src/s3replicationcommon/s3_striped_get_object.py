@@ -0,0 +1,235 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import hashlib
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_get_object import S3AsyncGetObject
+from s3replicationcommon.timer import Timer
+
+
+class S3AsyncStripedGetObject:
+    """Reads an object using parallel range GETs (stripes).
+
+    Object is divided into stripes of stripe_size bytes. Up to
+    max_stripes_in_flight stripes are fetched in parallel, each using a
+    range GET. Data is yielded in object order, so fetch() can be used
+    as a drop-in replacement of S3AsyncGetObject.fetch(). Stripes fetched
+    ahead of the one being yielded are held in a reorder buffer which is
+    bounded by max_stripes_in_flight stripes.
+    """
+
+    def __init__(self, session, request_id,
+                 bucket_name, object_name, object_size,
+                 stripe_size, max_stripes_in_flight=4, range_read_offset=0):
+        """Initialise.
+
+        When range_read_offset is specified, object is read from that
+        offset till end.
+        """
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+        self._object_size = object_size
+        self._range_read_offset = range_read_offset
+
+        self._stripe_size = stripe_size
+        self._max_stripes_in_flight = max_stripes_in_flight
+
+        self.remote_down = False
+        self._retryable = False
+        self._etag = None
+        self._hash = session.hash_executor.stream(hashlib.md5())
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+        # Cleared while paused, no more stripes are read till set.
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_execution_time(self):
+        """Return total time for GET Object operation."""
+        return self._timer.elapsed_time_ms()
+
+    def get_etag(self):
+        """Returns ETag for object."""
+        return self._etag
+
+    def is_retryable(self):
+        """Returns True if fetch failed on a transient error."""
+        return self._retryable
+
+    def get_md5(self):
+        """Returns MD5 computed on data fetched, None if fetch incomplete."""
+        if self._state != S3RequestState.COMPLETED:
+            return None
+        return self._hash.hexdigest()
+
+    async def _fetch_stripe(self, stripe_index, chunk_size):
+        """Fetches a stripe and returns list of data chunks.
+
+        Returns:
+            list[bytes]: Data chunks for stripe, None on failure.
+        """
+        offset = self._range_read_offset + stripe_index * self._stripe_size
+        length = min(self._stripe_size, self._object_size - offset)
+
+        # Stripe is yielded only once fetched completely, so it can be
+        # fetched again when it fails midway. Failures before response
+        # are retried by stripe reader itself.
+        retrier = new_retrier(self._session.retry_engine,
+                              RetryOperation.GET_OBJECT,
+                              self._logger, self._request_id)
+        while True:
+            stripe_reader = S3AsyncGetObject(
+                self._session, self._request_id,
+                self._bucket_name, self._object_name, self._object_size,
+                range_read_offset=offset, range_read_length=length,
+                compute_md5=False)
+
+            data_chunks = []
+            async for data_chunk in stripe_reader.fetch(chunk_size):
+                data_chunks.append(data_chunk)
+
+            if stripe_reader.get_state() == S3RequestState.COMPLETED:
+                break
+            if stripe_reader.is_retryable() and \
+                    stripe_reader.get_http_status() == 206 and \
+                    await retrier.wait_to_retry(
+                        "stripe {} failed midway".format(stripe_index)):
+                continue
+            self.remote_down = self.remote_down or stripe_reader.remote_down
+            self._retryable = stripe_reader.is_retryable()
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                "Failed to fetch stripe {} at offset {}".format(
+                    stripe_index, offset))
+            return None
+
+        # Object should not change while its stripes are being fetched.
+        etag = stripe_reader.get_etag()
+        if self._etag is None:
+            self._etag = etag
+        elif self._etag != etag:
+            self._logger.error(
+                fmt_reqid_log(self._request_id) +
+                "ETag changed from {} to {} while reading stripe {}".format(
+                    self._etag, etag, stripe_index))
+            # Object was overwritten, replicating it again reads the new
+            # version consistently.
+            self._retryable = True
+            return None
+
+        return data_chunks
+
+    # yields data chunk for given size
+    async def fetch(self, chunk_size):
+        stripes_count = max(1, -(-(self._object_size -
+                                   self._range_read_offset) //
+                                 self._stripe_size))
+
+        # Reorder buffer, stripe index to task fetching stripe.
+        stripe_tasks = {}
+        next_stripe_to_schedule = 0
+
+        self._logger.info(
+            fmt_reqid_log(self._request_id) +
+            "Striped GET on {}/{} with {} stripes of size {}".format(
+                self._bucket_name, self._object_name,
+                stripes_count, self._stripe_size))
+
+        self._timer.start()
+        self._state = S3RequestState.RUNNING
+        try:
+            for stripe_index in range(stripes_count):
+                if not self._resumed.is_set():
+                    # Stripes in flight complete into reorder buffer.
+                    self._logger.debug(
+                        fmt_reqid_log(self._request_id) +
+                        "Paused after reading {} stripes.".format(
+                            stripe_index))
+                    await self._resumed.wait()
+                if self._state == S3RequestState.ABORTED:
+                    break
+
+                # Keep the window of stripes in flight full.
+                while next_stripe_to_schedule < stripes_count and \
+                        next_stripe_to_schedule < \
+                        stripe_index + self._max_stripes_in_flight:
+                    stripe_tasks[next_stripe_to_schedule] = \
+                        asyncio.ensure_future(self._fetch_stripe(
+                            next_stripe_to_schedule, chunk_size))
+                    next_stripe_to_schedule += 1
+
+                data_chunks = await stripe_tasks.pop(stripe_index)
+                if data_chunks is None:
+                    self._state = S3RequestState.FAILED
+                    break
+
+                for data_chunk in data_chunks:
+                    # If abort requested, stop and return.
+                    if self._state == S3RequestState.ABORTED:
+                        break
+                    # Stripes are yielded in order, so is the hashing.
+                    await self._hash.update(data_chunk)
+                    yield data_chunk
+
+                if self._state == S3RequestState.ABORTED:
+                    self._logger.debug(
+                        fmt_reqid_log(self._request_id) +
+                        "Aborted after reading {} stripes.".format(
+                            stripe_index))
+                    break
+
+            if self._state in (S3RequestState.RUNNING,
+                               S3RequestState.PAUSED):
+                await self._hash.flush()
+                self._state = S3RequestState.COMPLETED
+        finally:
+            # Stop reading ahead when reader fails, aborts or is closed.
+            for stripe_task in stripe_tasks.values():
+                stripe_task.cancel()
+            self._timer.stop()
+
+    def pause(self):
+        """Pauses fetch before reading next stripe, till resume()."""
+        self._resumed.clear()
+        if self._state == S3RequestState.RUNNING:
+            self._state = S3RequestState.PAUSED
+
+    def resume(self):
+        self._resumed.set()
+        if self._state == S3RequestState.PAUSED:
+            self._state = S3RequestState.RUNNING
+
+    def abort(self):
+        self._state = S3RequestState.ABORTED
+        # Paused fetch wakes up to stop.
+        self._resumed.set()
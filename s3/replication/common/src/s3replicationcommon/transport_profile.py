@@ -0,0 +1,139 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Connection pool and socket settings for sessions to S3 sites."""
+
+import aiohttp
+import socket
+
+
+class TransportTCPConnector(aiohttp.TCPConnector):
+    """TCPConnector that sets socket options on each new connection."""
+
+    def __init__(self, send_buffer_bytes=None, receive_buffer_bytes=None,
+                 tcp_nodelay=None, **kwargs):
+        """Initialise, options that are None are left at system default.
+
+        Other keyword arguments are passed to aiohttp.TCPConnector.
+        """
+        super().__init__(**kwargs)
+        self._send_buffer_bytes = send_buffer_bytes
+        self._receive_buffer_bytes = receive_buffer_bytes
+        self._tcp_nodelay = tcp_nodelay
+
+    def _set_socket_options(self, sock):
+        if self._send_buffer_bytes is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                            self._send_buffer_bytes)
+        if self._receive_buffer_bytes is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                            self._receive_buffer_bytes)
+        if self._tcp_nodelay is not None and \
+                sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY,
+                            int(self._tcp_nodelay))
+
+    async def _wrap_create_connection(self, *args, **kwargs):
+        transport, protocol = await super()._wrap_create_connection(
+            *args, **kwargs)
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            self._set_socket_options(sock)
+        return transport, protocol
+
+
+class TransportProfile:
+    """Named connection settings for sessions to S3 sites.
+
+    Sites are mapped to a profile by endpoint netloc, so e.g. a remote
+    site over WAN can use larger socket buffers, longer keep-alive and
+    larger transfer chunks than a site on local network.
+    """
+
+    def __init__(self, name, max_connections=100,
+                 max_connections_per_host=0, keepalive_timeout_secs=15,
+                 dns_cache_ttl_secs=10, send_buffer_bytes=None,
+                 receive_buffer_bytes=None, tcp_nodelay=True,
+                 connect_timeout_secs=None, read_timeout_secs=None,
+                 chunk_size_bytes=None):
+        """Initialise.
+
+        Args:
+            max_connections_per_host (int): 0 for no limit.
+            send_buffer_bytes (int): SO_SNDBUF, None for system default.
+            receive_buffer_bytes (int): SO_RCVBUF, None for system default.
+            connect_timeout_secs (float): None for no timeout.
+            read_timeout_secs (float): Maximum wait for data on a
+            connection, None for no timeout.
+            chunk_size_bytes (int): Initial transfer chunk size for site,
+            None to use configured transfer chunk size.
+        """
+        self.name = name
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout_secs = keepalive_timeout_secs
+        self.dns_cache_ttl_secs = dns_cache_ttl_secs
+        self.send_buffer_bytes = send_buffer_bytes
+        self.receive_buffer_bytes = receive_buffer_bytes
+        self.tcp_nodelay = tcp_nodelay
+        self.connect_timeout_secs = connect_timeout_secs
+        self.read_timeout_secs = read_timeout_secs
+        self.chunk_size_bytes = chunk_size_bytes
+
+    def create_connector(self, max_connections=None):
+        """Returns new connector (connection pool) using profile.
+
+        Args:
+            max_connections (int): Overrides max_connections of profile,
+            e.g. to keep within a limit across connectors.
+        """
+        if max_connections is None:
+            max_connections = self.max_connections
+        return TransportTCPConnector(
+            send_buffer_bytes=self.send_buffer_bytes,
+            receive_buffer_bytes=self.receive_buffer_bytes,
+            tcp_nodelay=self.tcp_nodelay,
+            limit=max_connections,
+            limit_per_host=self.max_connections_per_host,
+            keepalive_timeout=self.keepalive_timeout_secs,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl_secs)
+
+    def create_timeout(self):
+        """Returns request timeouts using profile."""
+        # No total timeout, large objects can take long.
+        return aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.connect_timeout_secs,
+            sock_read=self.read_timeout_secs)
+
+    def get_dictionary(self):
+        return {
+            "name": self.name,
+            "max_connections": self.max_connections,
+            "max_connections_per_host": self.max_connections_per_host,
+            "keepalive_timeout_secs": self.keepalive_timeout_secs,
+            "dns_cache_ttl_secs": self.dns_cache_ttl_secs,
+            "send_buffer_bytes": self.send_buffer_bytes,
+            "receive_buffer_bytes": self.receive_buffer_bytes,
+            "tcp_nodelay": self.tcp_nodelay,
+            "connect_timeout_secs": self.connect_timeout_secs,
+            "read_timeout_secs": self.read_timeout_secs,
+            "chunk_size_bytes": self.chunk_size_bytes
+        }
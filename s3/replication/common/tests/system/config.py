@@ -55,5 +55,7 @@ class Config:
         self.object_size = self._config["object_size"]
         self.total_objects = self._config["total_objects"]
         self.transfer_chunk_size = self._config["transfer_chunk_size"]
+        self.multipart_part_size = self._config["multipart_part_size"]
+        self.multipart_concurrency = self._config["multipart_concurrency"]
         self.max_s3_connections = self._config["max_s3_connections"]
         self.max_threads_for_boto3 = self._config["max_threads_for_boto3"]
@@ -85,6 +85,9 @@ class FixedObjectDataGenerator:
             return self._md5
         return None
 
+    def get_md5(self):
+        return self.get_etag()
+
     async def fetch(self, chunk_size):
         assert chunk_size == self.object_size, \
             "chunk_size should be same as object_size"
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# Compares per request cost of v4 signing using a new AWSV4Signer per
+# request (as done earlier) and using AWSV4SigningContext of S3Session.
+# Does not need an S3 server.
+
+import datetime
+import time
+from config import Config
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.aws_v4_signer import AWSV4SigningContext
+
+# Request rate the signing cost is reported for.
+REQUESTS_PER_SEC = 10000
+
+
+def sign_with_signer(config, request_uri):
+    return AWSV4Signer(
+        config.endpoint,
+        config.s3_service_name,
+        config.s3_region,
+        config.access_key,
+        config.secret_key).prepare_signed_header(
+        'GET', request_uri, '', '')
+
+
+def sign_with_context(context, request_uri):
+    return context.prepare_signed_header('GET', request_uri, '', '')
+
+
+def measure(sign_func, arg, request_uris):
+    """Returns average time in microseconds to sign a request."""
+    start_time = time.perf_counter()
+    for request_uri in request_uris:
+        sign_func(arg, request_uri)
+    elapsed_secs = time.perf_counter() - start_time
+    return elapsed_secs * 1000000 / len(request_uris)
+
+
+def main():
+    config = Config()
+    context = AWSV4SigningContext(
+        config.endpoint, config.s3_service_name, config.s3_region,
+        config.access_key, config.secret_key)
+
+    # Signatures should be same for same request and time.
+    for method, query_params, body in [
+            ('GET', '', ''),
+            ('PUT', 'partNumber=1&uploadId=abc', ''),
+            ('POST', 'uploadId=abc', '<CompleteMultipartUpload/>')]:
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            config.source_bucket_name, 'object')
+        expected = AWSV4Signer(
+            config.endpoint, config.s3_service_name, config.s3_region,
+            config.access_key, config.secret_key).prepare_signed_header(
+            method, request_uri, query_params, body)
+        # x-amz-date of expected may fall in next second, sign for it.
+        epoch_t = datetime.datetime.strptime(
+            expected['x-amz-date'], '%Y%m%dT%H%M%SZ')
+        actual = context.prepare_signed_header(
+            method, request_uri, query_params, body, epoch_t)
+        assert actual == expected, \
+            "Signature mismatch {} != {}".format(actual, expected)
+    print("Signatures match.")
+
+    request_uris = [
+        AWSV4Signer.fmt_s3_request_uri(
+            config.source_bucket_name, "object-{}".format(i))
+        for i in range(REQUESTS_PER_SEC)]
+
+    # Warm up.
+    measure(sign_with_signer, config, request_uris[:1000])
+    measure(sign_with_context, context, request_uris[:1000])
+
+    signer_usecs = measure(sign_with_signer, config, request_uris)
+    context_usecs = measure(sign_with_context, context, request_uris)
+
+    for label, usecs in [("AWSV4Signer per request", signer_usecs),
+                         ("AWSV4SigningContext", context_usecs)]:
+        # Share of a CPU core spent signing at REQUESTS_PER_SEC.
+        cpu_percent = usecs * REQUESTS_PER_SEC / 10000
+        print("{:<24}: {:8.2f} us per request, {:5.1f}% CPU at {} "
+              "requests/sec".format(label, usecs, cpu_percent,
+                                    REQUESTS_PER_SEC))
+    print("Speedup: {:.2f}x".format(signer_usecs / context_usecs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+
+from s3replicationcommon.buffer_pool import BufferPool
+
+
+def run_pending(event_loop):
+    """Lets scheduled callbacks and woken up waiters run."""
+    event_loop.run_until_complete(asyncio.sleep(0))
+
+
+def test_released_slab_goes_to_waiter_before_new_acquire(event_loop):
+    pool = BufferPool(16, 1)
+    lease = event_loop.run_until_complete(pool.acquire())
+    waiting = asyncio.ensure_future(pool.acquire())
+    run_pending(event_loop)
+
+    async def release_and_acquire():
+        lease.release()
+        # Acquired after release, before waiter runs.
+        return await pool.acquire()
+
+    later = asyncio.ensure_future(release_and_acquire())
+    run_pending(event_loop)
+    run_pending(event_loop)
+
+    assert waiting.done() and not later.done()
+    assert pool.get_stats()["allocated_slabs"] == 1
+
+    waiting.result().release()
+    event_loop.run_until_complete(later)
+    assert pool.get_stats()["allocated_slabs"] == 1
+    later.result().release()
+    assert pool.get_stats()["idle_slabs"] == 1
+
+
+def test_cancelled_waiter_passes_slab_on(event_loop):
+    pool = BufferPool(16, 1)
+    lease = event_loop.run_until_complete(pool.acquire())
+    cancelled = asyncio.ensure_future(pool.acquire())
+    waiting = asyncio.ensure_future(pool.acquire())
+    run_pending(event_loop)
+
+    # Handed slab, and cancelled before it runs.
+    lease.release()
+    cancelled.cancel()
+    event_loop.run_until_complete(waiting)
+
+    assert cancelled.cancelled()
+    assert pool.get_stats()["allocated_slabs"] == 1
+    assert pool.get_stats()["leased_slabs"] == 1
@@ -0,0 +1,85 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import hashlib
+import os
+import pytest
+
+from s3replicationcommon.hash_executor import HashExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = HashExecutor(max_threads=2, max_inline_size=1024,
+                            max_backlog_bytes=8192)
+    yield executor
+    executor.shutdown()
+
+
+def hash_stream(event_loop, executor, chunks):
+    async def run():
+        stream = executor.stream(hashlib.md5())
+        for chunk in chunks:
+            await stream.update(chunk)
+        await stream.flush()
+        return stream.hexdigest()
+    return event_loop.run_until_complete(run())
+
+
+def expected_md5(chunks):
+    return hashlib.md5(b"".join(chunks)).hexdigest()
+
+
+def test_small_chunks_are_hashed_inline(event_loop, executor):
+    chunks = [os.urandom(1000) for _ in range(10)]
+    assert hash_stream(event_loop, executor, chunks) == expected_md5(chunks)
+    stats = executor.get_stats()
+    assert stats["inline_count"] == 10
+    assert stats["offloaded_count"] == 0
+
+
+def test_large_chunks_are_offloaded(event_loop, executor):
+    chunks = [os.urandom(4096) for _ in range(10)]
+    assert hash_stream(event_loop, executor, chunks) == expected_md5(chunks)
+    stats = executor.get_stats()
+    assert stats["offloaded_count"] == 10
+    assert stats["offloaded_bytes"] == 40960
+
+
+def test_mixed_chunks_are_hashed_in_order(event_loop, executor):
+    chunks = [os.urandom(size)
+              for size in (100, 5000, 10, 20000, 1024, 1, 3000, 0, 7)]
+    assert hash_stream(event_loop, executor, chunks) == expected_md5(chunks)
+
+
+def test_update_waits_when_backlog_is_exceeded(event_loop, executor):
+    async def run():
+        stream = executor.stream(hashlib.md5())
+        await stream.update(os.urandom(20000))
+        # Backlog over max_backlog_bytes is hashed before update returns.
+        return stream.hexdigest()
+
+    event_loop.run_until_complete(run())
+
+
+def test_update_of_part_buffer(event_loop, executor):
+    data = os.urandom(5000)
+    hash_obj = event_loop.run_until_complete(
+        executor.update(hashlib.md5(), data))
+    assert hash_obj.hexdigest() == hashlib.md5(data).hexdigest()
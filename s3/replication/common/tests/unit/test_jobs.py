@@ -0,0 +1,192 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+import pytest
+import types
+
+from s3replicationcommon import jobs as jobs_module
+from s3replicationcommon.job import Job
+from s3replicationcommon.jobs import Jobs
+
+
+class FakeClock:
+    """Clock advanced only by tests."""
+
+    def __init__(self):
+        """Initialise."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(jobs_module, "time",
+                        types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def new_job(replication_id, object_name="foo",
+            last_modified="2021-05-21T10:18:50.000Z"):
+    attributes = {
+        "Bucket-Name": "sourcebucket",
+        "Object-Name": object_name,
+        "Content-Length": "1024"
+    }
+    if last_modified is not None:
+        attributes["Last-Modified"] = last_modified
+    return Job({
+        "replication-id": replication_id,
+        "source": {
+            "endpoint": "http://source.s3.seagate.com",
+            "operation": {
+                "type": "replicate_object",
+                "attributes": attributes
+            }
+        },
+        "target": {
+            "endpoint": "http://target.s3.seagate.com",
+            "Bucket-Name": "targetbucket"
+        }
+    })
+
+
+def new_jobs(debounce_secs=0):
+    return Jobs(logging.getLogger("test"), "test", coalesce=True,
+                debounce_secs=debounce_secs)
+
+
+def queued_ids(jobs_list, ready_only=False):
+    return [job.get_replication_id()
+            for job in jobs_list.get_queued(ready_only=ready_only)]
+
+
+def take(jobs_list, replication_id):
+    jobs_list.move_to_inprogress(replication_id)
+
+
+def test_newer_version_replaces_queued(clock):
+    jobs_list = new_jobs()
+    jobs_list.add_job(new_job("a1", last_modified="2021-05-21T10:00:00.000Z"))
+    jobs_list.add_job(new_job("b", object_name="bar"))
+    jobs_list.add_job(new_job("a2", last_modified="2021-05-21T10:00:01.000Z"))
+
+    assert queued_ids(jobs_list) == ["a2", "b"]
+    assert not jobs_list.is_job_present("a1")
+    assert jobs_list.coalesced_count() == 1
+
+
+def test_late_older_version_is_dropped(clock):
+    jobs_list = new_jobs()
+    jobs_list.add_job(new_job("a2", last_modified="2021-05-21T10:00:01.000Z"))
+    jobs_list.add_job(new_job("a1", last_modified="2021-05-21T10:00:00.000Z"))
+
+    assert queued_ids(jobs_list) == ["a2"]
+    assert not jobs_list.is_job_present("a1")
+    assert jobs_list.coalesced_count() == 1
+
+
+def test_unknown_version_order_keeps_last_arrival(clock):
+    jobs_list = new_jobs()
+    jobs_list.add_job(new_job("a1", last_modified="2021-05-21T10:00:01.000Z"))
+    jobs_list.add_job(new_job("a2", last_modified=None))
+
+    assert queued_ids(jobs_list) == ["a2"]
+
+
+def test_debounce_holds_queued_jobs(clock):
+    jobs_list = new_jobs(debounce_secs=5)
+    jobs_list.add_job(new_job("a"))
+    clock.now += 2
+    jobs_list.add_job(new_job("b", object_name="bar"))
+
+    assert queued_ids(jobs_list, ready_only=True) == []
+    assert jobs_list.get_ready_delay() == 3
+    clock.now += 3
+    assert queued_ids(jobs_list, ready_only=True) == ["a"]
+    clock.now += 2
+    assert queued_ids(jobs_list, ready_only=True) == ["a", "b"]
+
+
+def test_requeue_keeps_ready_time_and_goes_to_front(clock):
+    jobs_list = new_jobs(debounce_secs=5)
+    jobs_list.add_job(new_job("a"))
+    clock.now += 5
+    take(jobs_list, "a")
+    jobs_list.add_job(new_job("b", object_name="bar"))
+
+    jobs_list.move_to_queued("a")
+
+    assert queued_ids(jobs_list) == ["a", "b"]
+    assert queued_ids(jobs_list, ready_only=True) == ["a"]
+    assert jobs_list.get_ready_delay() == 0
+
+
+def test_requeue_order_is_kept_when_requeued_in_reverse(clock):
+    jobs_list = new_jobs()
+    for replication_id in ("a", "b", "c"):
+        jobs_list.add_job(new_job(replication_id, object_name=replication_id))
+    take(jobs_list, "a")
+    take(jobs_list, "b")
+
+    jobs_list.move_to_queued("b")
+    jobs_list.move_to_queued("a")
+
+    assert queued_ids(jobs_list) == ["a", "b", "c"]
+
+
+def test_requeue_dropped_when_newer_version_queued(clock):
+    jobs_list = new_jobs()
+    jobs_list.add_job(new_job("a1", last_modified="2021-05-21T10:00:00.000Z"))
+    take(jobs_list, "a1")
+    jobs_list.add_job(new_job("a2", last_modified="2021-05-21T10:00:01.000Z"))
+
+    jobs_list.move_to_queued("a1")
+
+    assert queued_ids(jobs_list) == ["a2"]
+    assert not jobs_list.is_job_present("a1")
+
+
+@pytest.mark.parametrize("last_modified", [
+    "2021-05-21T10:00:00.000Z", None])
+def test_requeue_dropped_when_version_order_not_known(clock, last_modified):
+    jobs_list = new_jobs()
+    jobs_list.add_job(new_job("a1", last_modified=last_modified))
+    take(jobs_list, "a1")
+    jobs_list.add_job(new_job("a2", last_modified=last_modified))
+
+    jobs_list.move_to_queued("a1")
+
+    assert queued_ids(jobs_list) == ["a2"]
+    assert not jobs_list.is_job_present("a1")
+
+
+def test_requeue_replaces_older_version_queued(clock):
+    jobs_list = new_jobs()
+    jobs_list.add_job(new_job("a2", last_modified="2021-05-21T10:00:01.000Z"))
+    take(jobs_list, "a2")
+    jobs_list.add_job(new_job("a1", last_modified="2021-05-21T10:00:00.000Z"))
+
+    jobs_list.move_to_queued("a2")
+
+    assert queued_ids(jobs_list) == ["a2"]
+    assert not jobs_list.is_job_present("a1")
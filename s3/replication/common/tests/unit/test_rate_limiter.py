@@ -0,0 +1,100 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+
+import pytest
+import types
+
+from s3replicationcommon import rate_limiter
+from s3replicationcommon.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Clock advanced only by sleeps, so waits are exact and instant."""
+
+    def __init__(self):
+        """Initialise."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, secs):
+        self.now += secs
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time",
+                        types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_limiter, "asyncio",
+                        types.SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def acquire_all(event_loop, bucket, amounts):
+    for amount in amounts:
+        event_loop.run_until_complete(bucket.acquire(amount))
+
+
+def test_steady_state_rate(event_loop, clock):
+    bucket = TokenBucket(rate=1000, burst_secs=1)
+    start_time = clock.now
+    acquire_all(event_loop, bucket, [100] * 50)
+    # First burst_secs worth is not waited for, rest goes at rate.
+    assert clock.now - start_time == pytest.approx(4.0)
+
+    start_time = clock.now
+    acquire_all(event_loop, bucket, [100] * 50)
+    assert clock.now - start_time == pytest.approx(5.0)
+
+
+def test_burst_after_idle(event_loop, clock):
+    bucket = TokenBucket(rate=1000, burst_secs=1)
+    clock.now += 3
+    start_time = clock.now
+    acquire_all(event_loop, bucket, [1000])
+    # Burst is not accumulated beyond burst_secs while idle.
+    assert clock.now == start_time
+    acquire_all(event_loop, bucket, [1100])
+    assert clock.now - start_time == pytest.approx(1.1)
+
+
+def test_amount_larger_than_burst(event_loop, clock):
+    bucket = TokenBucket(rate=1000, burst_secs=1)
+    start_time = clock.now
+    acquire_all(event_loop, bucket, [3000])
+    assert clock.now - start_time == pytest.approx(2.0)
+
+
+def test_no_limit(event_loop, clock):
+    bucket = TokenBucket(rate=0, burst_secs=1)
+    start_time = clock.now
+    acquire_all(event_loop, bucket, [10 ** 9] * 10)
+    assert clock.now == start_time
+
+
+def test_rate_change_applies(event_loop, clock):
+    bucket = TokenBucket(rate=1000, burst_secs=1)
+    start_time = clock.now
+    acquire_all(event_loop, bucket, [1000])
+    bucket.set_rate(2000)
+    acquire_all(event_loop, bucket, [4000])
+    assert clock.now - start_time == pytest.approx(1.0)
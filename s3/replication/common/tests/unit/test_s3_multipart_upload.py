@@ -0,0 +1,61 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+import types
+
+from s3replicationcommon.buffer_pool import BufferPool
+from s3replicationcommon.s3_multipart_upload import MAX_PARTS_COUNT
+from s3replicationcommon.s3_multipart_upload import MIN_PART_SIZE
+from s3replicationcommon.s3_multipart_upload import S3AsyncMultipartUpload
+from s3replicationcommon.s3_multipart_upload import get_part_size
+
+MB = 1048576
+GB = 1024 * MB
+
+
+def new_upload(object_size, part_size, buffer_pool=None):
+    session = types.SimpleNamespace(logger=logging.getLogger("test"))
+    return S3AsyncMultipartUpload(session, "request-1", "bucket", "object",
+                                  object_size, part_size,
+                                  buffer_pool=buffer_pool)
+
+
+def test_configured_part_size_is_used_within_limits():
+    assert get_part_size(100 * GB, 16 * MB) == 16 * MB
+    assert get_part_size(10 * MB, 7 * MB + 1) == 7 * MB + 1
+
+
+def test_part_size_is_not_below_minimum():
+    assert get_part_size(10 * MB, MB) == MIN_PART_SIZE
+    assert get_part_size(0, MB) == MIN_PART_SIZE
+
+
+def test_part_size_is_raised_for_parts_count_limit():
+    object_size = 200 * GB + 1
+    part_size = get_part_size(object_size, 16 * MB)
+    assert part_size % MB == 0
+    assert -(-object_size // part_size) <= MAX_PARTS_COUNT
+    assert part_size == 21 * MB
+
+
+def test_buffer_pool_is_not_used_for_larger_parts():
+    buffer_pool = BufferPool(16 * MB, 4)
+    assert new_upload(GB, 16 * MB, buffer_pool)._buffer_pool is buffer_pool
+    assert new_upload(200 * GB, 16 * MB, buffer_pool)._buffer_pool is None
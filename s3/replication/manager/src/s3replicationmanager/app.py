@@ -26,6 +26,7 @@ from s3replicationcommon.log import setup_logger
 from .job_routes import routes as job_routes
 from .subscriber_routes import routes as subscriber_routes
 from s3replicationcommon.jobs import Jobs
+from s3replicationcommon.retry import RetryEngine
 from .subscribers import Subscribers
 
 _logger = logging.getLogger("s3replicationmanager")
@@ -61,8 +62,11 @@ class ReplicationManagerApp:
 
         self._config.print_with(self._logger)
 
-        self._jobs = Jobs(self._logger, "all-jobs")
-        self._subscribers = Subscribers()
+        self._jobs = Jobs(self._logger, "all-jobs",
+                          coalesce=self._config.coalescing_enabled,
+                          debounce_secs=self._config.debounce_secs)
+        self._subscribers = Subscribers(
+            self._config.completion_rate_window_secs)
 
     def run(self):
         app = web.Application()
@@ -75,6 +79,11 @@ class ReplicationManagerApp:
         # replicator.
         app['all_jobs'] = self._jobs
         app['subscribers'] = self._subscribers
+        # Retry of transient failures, shared by all requests.
+        app['retry_engine'] = RetryEngine(
+            self._config.retry_policies,
+            self._config.max_retries_per_sec,
+            self._config.retry_burst_size)
 
         # Setup application routes.
         app.add_routes([
@@ -23,6 +23,8 @@
 
 import os
 import yaml
+from s3replicationcommon.retry import RetryPolicy
+from .placement import PlacementPolicy
 
 
 class Config:
@@ -36,6 +38,20 @@ class Config:
 
         self.host = '127.0.0.1'
         self.port = 8080
+        # Jobs arriving within this time after a dispatch event are sent
+        # together.
+        self.dispatch_linger_ms = 0
+        self.max_inflight_posts_per_subscriber = 1
+        self.placement_policy = PlacementPolicy.INSERTION_ORDER
+        self.completion_rate_weight = 1.0
+        self.completion_rate_window_secs = 60
+        # Operations without policy are not retried.
+        self.retry_policies = {}
+        self.max_retries_per_sec = 20
+        self.retry_burst_size = 40
+        # Jobs of older versions of an object still queued are replaced.
+        self.coalescing_enabled = False
+        self.debounce_secs = 0
 
     def load(self):
         """Load the configuration data.
@@ -55,6 +71,39 @@ class Config:
             self.service_name = config_props['manager']['service_name']
             self.job_polling_interval = \
                 config_props['manager']['job_polling_interval']
+            self.dispatch_linger_ms = config_props['manager'].get(
+                'dispatch_linger_ms', self.dispatch_linger_ms)
+            self.max_inflight_posts_per_subscriber = \
+                config_props['manager'].get(
+                    'max_inflight_posts_per_subscriber',
+                    self.max_inflight_posts_per_subscriber)
+
+            placement = config_props.get('placement', None)
+            if placement is not None:
+                self.placement_policy = placement['policy']
+                if self.placement_policy not in PlacementPolicy.ALL:
+                    raise ValueError(
+                        "Invalid placement policy {}, expected one of {}".
+                        format(self.placement_policy, PlacementPolicy.ALL))
+                self.completion_rate_weight = \
+                    placement['completion_rate_weight']
+                self.completion_rate_window_secs = \
+                    placement['completion_rate_window_secs']
+
+            coalescing = config_props.get('coalescing', None)
+            if coalescing is not None:
+                self.coalescing_enabled = coalescing['enabled']
+                self.debounce_secs = coalescing['debounce_secs']
+
+            retry = config_props.get('retry', None)
+            if retry is not None:
+                self.max_retries_per_sec = retry['max_retries_per_sec']
+                self.retry_burst_size = retry['retry_burst_size']
+                for operation, policy in retry['policies'].items():
+                    self.retry_policies[operation] = RetryPolicy(
+                        policy['max_attempts'],
+                        policy['base_delay_ms'],
+                        policy['max_delay_ms'])
         return self
 
     def print_with(self, logger):
@@ -67,3 +116,25 @@ class Config:
             logger.info(
                 "job_polling_interval: {}".format(
                     self.job_polling_interval))
+            logger.info("dispatch_linger_ms: {}".format(
+                self.dispatch_linger_ms))
+            logger.info("max_inflight_posts_per_subscriber: {}".format(
+                self.max_inflight_posts_per_subscriber))
+            logger.info("placement_policy: {}".format(
+                self.placement_policy))
+            logger.info("completion_rate_weight: {}".format(
+                self.completion_rate_weight))
+            logger.info("completion_rate_window_secs: {}".format(
+                self.completion_rate_window_secs))
+            logger.info("coalescing_enabled: {}".format(
+                self.coalescing_enabled))
+            logger.info("debounce_secs: {}".format(self.debounce_secs))
+            logger.info("max_retries_per_sec: {}".format(
+                self.max_retries_per_sec))
+            logger.info("retry_burst_size: {}".format(self.retry_burst_size))
+            for operation, policy in self.retry_policies.items():
+                logger.info(
+                    "retry policy {}: max_attempts: {}, base_delay_ms: {}, "
+                    "max_delay_ms: {}".format(
+                        operation, policy.max_attempts,
+                        policy.base_delay_ms, policy.max_delay_ms))
@@ -19,7 +19,11 @@
 
 import asyncio
 import logging
+import time
+from collections import deque
 from enum import Enum
+from .placement import SubscriberPlacement
+from .placement import job_bytes
 from .replicator_client import ReplicatorClient
 
 
@@ -38,12 +42,255 @@ class DistributorState(Enum):
         return self.name
 
 
+class SubscriberSender:
+    """Posts jobs assigned to a subscriber, independent of other
+    subscribers, so a slow or hung replicator only delays its own jobs.
+
+    Jobs assigned while posts are in flight are posted together by next
+    post, atmost max_inflight_posts posts are in flight at a time.
+    """
+
+    def __init__(self, subscriber, jobs_list, retry_engine,
+                 max_inflight_posts, retry_interval, on_post_failed):
+        """Initialise.
+
+        Args:
+            retry_interval (int): Secs no jobs are assigned to subscriber
+            after a failed post.
+            on_post_failed: Called after jobs of a failed post are queued
+            again, so they can be assigned to other subscribers.
+        """
+        self._subscriber = subscriber
+        self._jobs_list = jobs_list
+        self._retry_engine = retry_engine
+        self._max_inflight_posts = max(1, max_inflight_posts)
+        self._retry_interval = retry_interval
+        self._on_post_failed = on_post_failed
+
+        # Jobs assigned and not yet posted.
+        self._outbox = deque()
+        self._inflight_posts = 0
+        # {post task: jobs posted by it}
+        self._post_tasks = {}
+        self._event = asyncio.Event()
+        self._backoff_until = 0
+        self._task = None
+
+        # Statistics.
+        self._posts_count = 0
+        self._failed_posts_count = 0
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        """Stops sender, jobs not yet posted or being posted are queued
+        again.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Latest assigned jobs first, as jobs are queued again at front.
+        self._return_jobs(list(self._outbox))
+        self._outbox.clear()
+        for post_task in reversed(list(self._post_tasks.keys())):
+            # A post done meanwhile has already handled its jobs.
+            if post_task.cancel():
+                self._return_jobs(self._post_tasks[post_task])
+        self._post_tasks.clear()
+
+    def is_available(self):
+        """Returns False while backing off after a failed post."""
+        return time.monotonic() >= self._backoff_until
+
+    def enqueue(self, jobs):
+        """Assigns jobs to subscriber, job capacity is already taken."""
+        self._outbox.extend(jobs)
+        self._event.set()
+
+    def get_stats(self):
+        return {
+            "outbox_count": len(self._outbox),
+            "inflight_posts": self._inflight_posts,
+            "posts_count": self._posts_count,
+            "failed_posts_count": self._failed_posts_count
+        }
+
+    def _return_jobs(self, jobs):
+        """Gives back capacity and queues jobs again."""
+        self._subscriber.jobs_not_sent(
+            len(jobs), sum(job_bytes(job) for job in jobs))
+        # Jobs are queued again at front, keep their order.
+        for job in reversed(jobs):
+            self._jobs_list.move_to_queued(job.get_replication_id())
+
+    async def _run(self):
+        while True:
+            await self._event.wait()
+            self._event.clear()
+            while self._outbox and \
+                    self._inflight_posts < self._max_inflight_posts:
+                jobs_to_send = list(self._outbox)
+                self._outbox.clear()
+                self._inflight_posts += 1
+                post_task = asyncio.ensure_future(self._post(jobs_to_send))
+                self._post_tasks[post_task] = jobs_to_send
+                post_task.add_done_callback(self._on_post_done)
+
+    def _on_post_done(self, post_task):
+        self._post_tasks.pop(post_task, None)
+
+    def _post_failed(self, jobs):
+        """Backs off subscriber and queues jobs again, to be assigned to
+        other subscribers.
+        """
+        self._failed_posts_count += 1
+        self._backoff_until = time.monotonic() + self._retry_interval
+        self._return_jobs(jobs)
+        self._on_post_failed()
+
+    async def _post(self, jobs_to_send):
+        try:
+            replicator_client = ReplicatorClient(
+                self._subscriber, self._retry_engine)
+            client = await replicator_client.post(jobs_to_send)
+            self._posts_count += 1
+            if client.http_status == 201:
+                # Job was posted successfully.
+                _logger.debug(
+                    "Jobs posted successfully to subscriber id {}".
+                    format(client.get_subscriber_id()))
+            else:
+                # Job post failed, move back to queued.
+                _logger.debug(
+                    "Failed to post jobs to subscriber id {}".
+                    format(client.get_subscriber_id()))
+                self._post_failed(jobs_to_send)
+        except asyncio.CancelledError:
+            # Jobs are queued again by stop().
+            raise
+        except Exception as e:
+            # Unexpected error, jobs must not hold subscriber capacity.
+            _logger.exception(
+                "Failed to post jobs to subscriber id {}: {}".format(
+                    self._subscriber.id, str(e)))
+            self._post_failed(jobs_to_send)
+        finally:
+            self._inflight_posts -= 1
+            # Post jobs assigned meanwhile.
+            self._event.set()
+
+
 class JobDistributor:
     def __init__(self, app):
-        """Initialise."""
+        """Initialise.
+
+        Distributor assigns queued jobs to subscribers as per their
+        capacity and placement policy, and each subscriber's
+        SubscriberSender posts them.
+        """
         self._app = app
         self._polling_interval = app["config"].job_polling_interval
+        self._linger_secs = app["config"].dispatch_linger_ms / 1000
+        self._max_inflight_posts = \
+            app["config"].max_inflight_posts_per_subscriber
+        self._placement = SubscriberPlacement(
+            app["config"].placement_policy,
+            app["config"].completion_rate_weight)
         self._state = DistributorState.INITIAL
+        # Set on events after which jobs may be distributed.
+        self._wakeup_event = asyncio.Event()
+        app['all_jobs'].set_queued_callback(self.wakeup)
+        app['subscribers'].set_capacity_callback(self.wakeup)
+        # {subscriber_id: SubscriberSender}
+        self._senders = {}
+
+    def wakeup(self):
+        """Triggers distribution, on new job or subscriber capacity."""
+        self._wakeup_event.set()
+
+    async def _wait_for_event(self, jobs_list):
+        """Waits for an event, or polling interval. Waits atmost till
+        queued jobs held for debounce can be distributed.
+        """
+        timeout = self._polling_interval
+        ready_delay = jobs_list.get_ready_delay()
+        if ready_delay is not None and ready_delay > 0:
+            timeout = min(timeout, ready_delay)
+        try:
+            await asyncio.wait_for(self._wakeup_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup_event.clear()
+        if self._linger_secs > 0:
+            # Let a burst of jobs arrive, to send them together.
+            await asyncio.sleep(self._linger_secs)
+
+    def _get_sender(self, subscriber_id, subscriber):
+        sender = self._senders.get(subscriber_id, None)
+        if sender is None:
+            sender = SubscriberSender(
+                subscriber, self._app['all_jobs'],
+                self._app['retry_engine'], self._max_inflight_posts,
+                self._polling_interval, self.wakeup)
+            sender.start()
+            self._senders[subscriber_id] = sender
+        return sender
+
+    def _remove_stale_senders(self, subscribers_list):
+        """Stops senders of removed subscribers."""
+        for subscriber_id in list(self._senders.keys()):
+            if subscriber_id not in subscribers_list:
+                self._senders.pop(subscriber_id).stop()
+
+    def _distribute(self, subscribers_list, jobs_list):
+        """Assigns queued jobs to subscribers with capacity."""
+        # Subscribers that can take jobs, in order of registration.
+        candidates = []
+        for subscriber_id, subscriber in subscribers_list.items():
+            _logger.debug("Processing subscriber id {}".format(
+                subscriber_id))
+            if subscriber.pending_capacity() <= 0:
+                # Current subscriber has no more capacity.
+                _logger.debug("Subscriber with id {} is busy.".format(
+                    subscriber_id))
+            elif not self._get_sender(subscriber_id,
+                                      subscriber).is_available():
+                _logger.debug(
+                    "Subscriber with id {} failed recently.".format(
+                        subscriber_id))
+            else:
+                candidates.append(subscriber)
+        if len(candidates) == 0:
+            return
+
+        # Extract as many jobs from queue as subscribers can take.
+        jobs_to_assign = jobs_list.get_queued(
+            sum(subscriber.pending_capacity() for subscriber in candidates),
+            ready_only=True)
+        if len(jobs_to_assign) == 0:
+            # Queued jobs are held for debounce.
+            _logger.debug("No jobs ready to distribute.")
+            return
+
+        # {subscriber_id: [jobs]}
+        assigned_jobs = {}
+        rate_weights = self._placement.get_rate_weights(candidates)
+        for job in jobs_to_assign:
+            size = job_bytes(job)
+            subscriber = self._placement.choose(
+                candidates, size, rate_weights)
+            # Add subscriber ID, so when job is ack'ed, subscriber prefetch
+            # count can be updated.
+            job.set_subscriber_id(subscriber.id)
+            jobs_list.move_to_inprogress(job.get_replication_id())
+            subscriber.jobs_sent(1, size)
+            assigned_jobs.setdefault(subscriber.id, []).append(job)
+            if subscriber.pending_capacity() <= 0:
+                candidates.remove(subscriber)
+
+        for subscriber_id, jobs in assigned_jobs.items():
+            self._senders[subscriber_id].enqueue(jobs)
 
     async def start(self):
         """Starts distributor loop for distributing jobs to subscribers."""
@@ -52,12 +299,13 @@ class JobDistributor:
         subscribers_list = self._app['subscribers']
         jobs_list = self._app['all_jobs']
         while self._state == DistributorState.RUNNING:
-            # Wait for next interval.
-            await asyncio.sleep(self._polling_interval)
+            # Wait for next event.
+            await self._wait_for_event(jobs_list)
 
             if self._state == DistributorState.RUNNING:
-                # Scan jobs list and send to subscribers.
+                # Scan jobs list and assign to subscribers.
                 _logger.debug("Checking jobs for distribution.")
+                self._remove_stale_senders(subscribers_list)
 
                 if len(subscribers_list) == 0:
                     _logger.debug("No subscribers registered.")
@@ -67,86 +315,29 @@ class JobDistributor:
                     _logger.debug("No jobs available to distribute.")
                     continue
 
-                # For each subscriber, check count to send as per prefetch.
-                task_list = []
-                jobs_list_per_task = []  # so we can co-relate with task
-                for subscriber_id, subscriber in subscribers_list.items():
-                    _logger.debug("Processing subscriber id {}".format(
-                        subscriber_id))
-                    # How many more subscriber can accept?
-                    capacity = subscriber.pending_capacity()
-
-                    # Find count of jobs in pending jobs.
-                    available_jobs_count = jobs_list.queued_count()
-
-                    # Identify how many jobs to send to current subscriber.
-                    count_to_send = 0
-                    if available_jobs_count == 0:
-                        # No available jobs, break for subscribers and wait
-                        _logger.debug("No jobs available to distribute.")
-                        break
-                    elif capacity == 0:
-                        # Current subscriber has no more capacity.
-                        _logger.debug("Subscriber with id {} is busy.")
-                        continue
-                    elif available_jobs_count > capacity:
-                        # Send capacity jobs.
-                        count_to_send = capacity
-                    else:
-                        # We dont have enough to fullfill capacity, send all.
-                        count_to_send = available_jobs_count
-
-                    # Extract first count_to_send number of jobs from queue.
-                    jobs_to_send = jobs_list.get_queued(count_to_send)
-                    # For each job, add subscriber ID, so when job is ack'ed,
-                    # subscriber prefetch count can be updated.
-                    for job in jobs_to_send:
-                        job.set_subscriber_id(subscriber_id)
-
-                    replicator_client = ReplicatorClient(subscriber)
-                    # Schedule async job send using http POST.
-                    task = asyncio.ensure_future(replicator_client.post(
-                        jobs_to_send))
-                    task_list.append(task)
-                    jobs_list_per_task.append(jobs_to_send)
-
-                    # Move jobs_to_send to inprogress list.
-                    for job in jobs_to_send:
-                        jobs_list.move_to_inprogress(job.get_replication_id())
-
-                # end of for each subscriber
-
-                post_jobs_response_list = await asyncio.gather(*task_list)
-
-                # Process the job post responses.
-                for client in post_jobs_response_list:
-                    if client.http_status == 201:
-                        # Job was posted successfully.
-                        _logger.debug(
-                            "Jobs posted successfully to subscriber id {}".
-                            format(client.get_subscriber_id()))
-                        subscriber.jobs_sent(len(client.jobs_to_send))
-                    else:
-                        # Job post failed, move back to queued.
-                        _logger.debug(
-                            "Failed to post jobs to subscriber id {}".
-                            format(client.get_subscriber_id()))
-
-                        for job in client.jobs_to_send:
-                            jobs_list.move_to_queued(job.get_replication_id())
+                self._distribute(subscribers_list, jobs_list)
 
             elif self._state == DistributorState.PAUSED:
                 # If paused just loop and do nothing.
                 _logger.debug("Job distributor is paused, do nothing.")
             else:
                 # Either Stopped or aborted, break while loop.
-                _logger.debug("Job distributor {}".str(self._state))
+                _logger.debug("Job distributor {}".format(self._state))
                 break
 
+    def get_stats(self):
+        """Returns post statistics per subscriber."""
+        return {subscriber_id: sender.get_stats()
+                for subscriber_id, sender in self._senders.items()}
+
     def stop(self):
         """Stops the Distributor loop."""
         _logger.debug("Stopping job distribution.")
         self._state = DistributorState.STOPPED
+        for sender in self._senders.values():
+            sender.stop()
+        self._senders.clear()
+        self.wakeup()
 
     def pause(self):
         """Pauses the Distributor loop."""
@@ -157,6 +348,7 @@ class JobDistributor:
         """Resumes the Distributor loop."""
         _logger.debug("Resuming job distribution.")
         self._state = DistributorState.RUNNING
+        self.wakeup()
 
     def on_client_send_done(self, client):
         """Once client send completes, handle success or failure."""
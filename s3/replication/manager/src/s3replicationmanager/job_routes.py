@@ -23,6 +23,7 @@ import json
 from urllib.parse import urlparse, parse_qs
 from s3replicationcommon.job import JobJsonEncoder
 from s3replicationcommon.jobs import Jobs
+from .placement import job_bytes
 from .prepare_job import PrepareReplicationJob
 
 _logger = logging.getLogger('s3replicationmanager')
@@ -92,7 +93,7 @@ async def update_job_attr(request):
     else:
         subscriber_id = job.get_subscriber_id()
         subscriber = request.app['subscribers'].get_subscriber(subscriber_id)
-        subscriber.job_acknowledged(1)
+        subscriber.job_acknowledged(1, job_bytes(job))
 
         if job_record["status"] == "completed":
             job.mark_completed()
@@ -145,6 +146,15 @@ async def get_jobs(request):
         return web.json_response(
             completed_jobs, dumps=Jobs.list_dumps, status=200)
 
+    elif 'stats' in query:
+        # Return jobs count per state and coalesced jobs count.
+        return web.json_response(
+            {'count': all_jobs_list.count(),
+             'queued_count': all_jobs_list.queued_count(),
+             'inprogress_count': all_jobs_list.inprogress_count(),
+             'coalesced_count': all_jobs_list.coalesced_count()},
+            status=200)
+
     elif 'count' in query:
         # Return total jobs count.
         _logger.debug('Returning all jobs count = {}'.format(
@@ -0,0 +1,96 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import random
+from s3replicationcommon.job import ReplicationJobType
+
+
+def job_bytes(job):
+    """Returns bytes transferred by job, 0 for jobs without object data."""
+    if job.get_operation_type() != ReplicationJobType.OBJECT_REPLICATION:
+        return 0
+    return int(job.get_source_object_size())
+
+
+class PlacementPolicy:
+    """Policies to choose subscriber for a job."""
+    # Fill subscribers in order of registration.
+    INSERTION_ORDER = "insertion_order"
+    # Subscriber with least outstanding bytes, weighted by completion rate.
+    LEAST_LOADED = "least_loaded"
+    # Less loaded of two subscribers chosen at random.
+    POWER_OF_TWO_CHOICES = "power_of_two_choices"
+
+    ALL = (INSERTION_ORDER, LEAST_LOADED, POWER_OF_TWO_CHOICES)
+
+
+class SubscriberPlacement:
+    """Chooses subscriber for each job as per PlacementPolicy.
+
+    Load of a subscriber is its outstanding bytes (assigned and not
+    acknowledged) including the job, divided by its recent completion rate
+    raised to completion_rate_weight. So a subscriber completing jobs
+    faster drains its outstanding bytes sooner and takes more jobs. Weight
+    of 0 ignores completion rate. Subscribers without completions yet,
+    e.g. newly registered, are taken to complete at average rate of rest.
+    """
+
+    def __init__(self, policy, completion_rate_weight=1.0):
+        """Initialise."""
+        self._policy = policy
+        self._completion_rate_weight = completion_rate_weight
+
+    def get_rate_weights(self, subscribers):
+        """Returns {subscriber id: completion rate raised to weight}.
+
+        Computed once per dispatch round, completion rates do not change
+        while jobs of the round are placed.
+        """
+        if self._policy == PlacementPolicy.INSERTION_ORDER:
+            return {}
+        rates = [subscriber.get_completion_rate()
+                 for subscriber in subscribers]
+        known_rates = [rate for rate in rates if rate > 0]
+        default_rate = \
+            sum(known_rates) / len(known_rates) if known_rates else 1.0
+        return {
+            subscriber.id:
+            (rate if rate > 0 else default_rate) **
+            self._completion_rate_weight
+            for subscriber, rate in zip(subscribers, rates)
+        }
+
+    def choose(self, subscribers, size, rate_weights):
+        """Returns subscriber for job of size bytes.
+
+        Args:
+            subscribers (list): Subscribers with capacity, in order of
+            registration.
+            rate_weights (dict): Returned by get_rate_weights for the
+            dispatch round.
+        """
+        if self._policy == PlacementPolicy.INSERTION_ORDER or \
+                len(subscribers) == 1:
+            return subscribers[0]
+        if self._policy == PlacementPolicy.POWER_OF_TWO_CHOICES:
+            subscribers = random.sample(subscribers, 2)
+        loads = [(subscriber.get_outstanding_bytes() + size) /
+                 rate_weights[subscriber.id]
+                 for subscriber in subscribers]
+        return subscribers[loads.index(min(loads))]
@@ -18,8 +18,12 @@
 #
 
 import aiohttp
+import asyncio
 import json
 import logging
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
 from s3replicationcommon.s3_common import url_with_resources
 from s3replicationcommon.timer import Timer
 from s3replicationcommon.job import JobJsonEncoder
@@ -28,9 +32,14 @@ _logger = logging.getLogger("s3replicationmanager")
 
 
 class ReplicatorClient:
-    def __init__(self, subscriber):
-        """Initialise."""
+    def __init__(self, subscriber, retry_engine=None):
+        """Initialise.
+
+        Posts failed on transient errors are retried as per policy of
+        retry_engine.
+        """
         self._subscriber = subscriber
+        self._retry_engine = retry_engine
 
         self.http_status = None
         self.response = None
@@ -58,12 +67,17 @@ class ReplicatorClient:
         _logger.info('POST on {}'.format(jobs_url))
         _logger.debug('POST content {}'.format(payload))
 
+        retrier = new_retrier(self._retry_engine,
+                              RetryOperation.REPLICATOR_POST, _logger)
         self._timer.start()
         try:
-            async with self._subscriber.client_session.post(
+            resp = await request_with_retries(
+                retrier,
+                lambda: self._subscriber.client_session.post(
                     jobs_url,
                     headers=headers,
-                    data=payload) as resp:
+                    data=payload))
+            async with resp:
 
                 self._response_headers = resp.headers
 
@@ -77,6 +91,8 @@ class ReplicatorClient:
         except aiohttp.client_exceptions.ClientConnectorError as e:
             self.remote_down = True
             _logger.error('Failed to connect to replicator: ' + str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _logger.error('POST on {} failed: {}'.format(jobs_url, repr(e)))
 
         self._timer.stop()
 
@@ -51,6 +51,21 @@ async def list_subscribers(request):
     _logger.debug('API: GET /subscribers')
     subscribers = request.app['subscribers']
 
+    if 'stats' in request.query:
+        # Return capacity, load, assignment and post statistics per
+        # subscriber.
+        sender_stats = request.app['job_distributor'].get_stats()
+        stats = {}
+        for subscriber_id, subscriber in subscribers.items():
+            stats[subscriber_id] = {
+                "endpoint": subscriber.endpoint,
+                "prefetch_count": subscriber.prefetch_count,
+                "pending_capacity": subscriber.pending_capacity(),
+                **subscriber.get_stats(),
+                **sender_stats.get(subscriber_id, {})
+            }
+        return web.json_response(stats, status=200)
+
     _logger.debug('Number of subscribers {}'.format(subscribers.count()))
     return web.json_response(subscribers, dumps=Subscribers.dumps, status=200)
 
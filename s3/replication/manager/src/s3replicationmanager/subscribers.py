@@ -19,17 +19,37 @@
 
 import aiohttp
 import json
+import time
 import uuid
 from collections import OrderedDict
+from collections import deque
 
 
 class Subscriber:
-    def __init__(self, sub_obj):
-        """Initialise Subscriber object."""
+    def __init__(self, sub_obj, capacity_callback=None,
+                 completion_rate_window_secs=60):
+        """Initialise Subscriber object.
+
+        capacity_callback is called when jobs are acknowledged, so more
+        jobs can be sent to subscriber. Completion rate is measured over
+        last completion_rate_window_secs.
+        """
         self.id = str(uuid.uuid4())
         self.endpoint = sub_obj["endpoint"]
         self.prefetch_count = int(sub_obj["prefetch_count"])
         self._jobs_sent_count = 0
+        self._capacity_callback = capacity_callback
+        # Bytes of jobs sent and not yet acknowledged.
+        self._outstanding_bytes = 0
+        self._completion_rate_window_secs = completion_rate_window_secs
+        # (time, bytes) of acknowledged jobs within rate window.
+        self._completions = deque()
+
+        # Statistics.
+        self._assigned_count = 0
+        self._assigned_bytes = 0
+        self._acknowledged_count = 0
+        self._acknowledged_bytes = 0
         self.client_session = aiohttp.ClientSession()
 
     async def close(self):
@@ -47,11 +67,35 @@ class Subscriber:
         """Returns count of jobs that can be sent to subscriber."""
         return self.prefetch_count - self._jobs_sent_count
 
-    def jobs_sent(self, count):
+    def get_outstanding_bytes(self):
+        """Returns bytes of jobs sent and not yet acknowledged."""
+        return self._outstanding_bytes
+
+    def get_completion_rate(self):
+        """Returns bytes of jobs acknowledged per sec, over rate window."""
+        window_start = time.monotonic() - self._completion_rate_window_secs
+        while self._completions and self._completions[0][0] < window_start:
+            self._completions.popleft()
+        return sum(size for _, size in self._completions) / \
+            self._completion_rate_window_secs
+
+    def get_stats(self):
+        """Returns load and assignment statistics."""
+        return {
+            "outstanding_bytes": self._outstanding_bytes,
+            "completion_rate_bytes_per_sec": self.get_completion_rate(),
+            "assigned_count": self._assigned_count,
+            "assigned_bytes": self._assigned_bytes,
+            "acknowledged_count": self._acknowledged_count,
+            "acknowledged_bytes": self._acknowledged_bytes
+        }
+
+    def jobs_sent(self, count, size_bytes=0):
         """Remember jobs sent to subscriber.
 
         Args:
             count (int): Number of jobs sent to subscriber.
+            size_bytes (int): Bytes of jobs sent.
 
         Returns:
             int: -1 on failure if subscriber does not have enough capacity
@@ -62,12 +106,24 @@ class Subscriber:
             return -1
         else:
             self._jobs_sent_count += count
+            self._outstanding_bytes += size_bytes
+            self._assigned_count += count
+            self._assigned_bytes += size_bytes
+
+    def jobs_not_sent(self, count, size_bytes=0):
+        """Gives back capacity taken by jobs_sent() for jobs that could
+        not be sent, e.g. post failed.
+        """
+        self._jobs_sent_count = max(0, self._jobs_sent_count - count)
+        self._outstanding_bytes = \
+            max(0, self._outstanding_bytes - size_bytes)
 
-    def job_acknowledged(self, count):
+    def job_acknowledged(self, count, size_bytes=0):
         """Update (reduce) the jobs sent to subscriber.
 
         Args:
             count (int): Number of jobs acknowledged by subscriber.
+            size_bytes (int): Bytes of jobs acknowledged.
 
         Returns:
             int: -1 on failure - cannot acknowledged more than we have sent,
@@ -78,6 +134,13 @@ class Subscriber:
             return -1
         else:
             self._jobs_sent_count -= count
+            self._outstanding_bytes = \
+                max(0, self._outstanding_bytes - size_bytes)
+            self._acknowledged_count += count
+            self._acknowledged_bytes += size_bytes
+            self._completions.append((time.monotonic(), size_bytes))
+            if self._capacity_callback is not None:
+                self._capacity_callback()
             return 0
 
 
@@ -94,12 +157,21 @@ class Subscribers(OrderedDict):
         """Helper to format json."""
         return json.dumps(obj, cls=SubscriberJsonEncoder)
 
-    def __init__(self):
+    def __init__(self, completion_rate_window_secs=60):
         """Initialise Subscribers collection."""
         # Dictionary holding subscriber_id and attributes
         # E.g. : subscriber = {'id':'some-uuid','foo':'bar'}
         # subscribers = {some-uuid': Subscriber(subscriber), ...}
         super(Subscribers, self).__init__()
+        # Called when a subscriber is added or acknowledges jobs.
+        self._capacity_callback = None
+        self._completion_rate_window_secs = completion_rate_window_secs
+
+    def set_capacity_callback(self, callback):
+        """Sets callback to be called when capacity to send jobs is
+        available, on new subscriber or jobs acknowledged.
+        """
+        self._capacity_callback = callback
 
     def count(self):
         """Returns total subscribers in collection.
@@ -111,8 +183,11 @@ class Subscribers(OrderedDict):
 
     def add_subscriber(self, subscriber):
         """Adds subscriber to the subscribers dict."""
-        subscriber = Subscriber(subscriber)
+        subscriber = Subscriber(subscriber, self._capacity_callback,
+                                self._completion_rate_window_secs)
         self[subscriber.id] = subscriber
+        if self._capacity_callback is not None:
+            self._capacity_callback()
         return subscriber
 
     def get_subscriber(self, subscriber_id):
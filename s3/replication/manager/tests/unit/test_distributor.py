@@ -0,0 +1,237 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+
+import asyncio
+import logging
+import pytest
+import types
+from collections import OrderedDict
+
+from s3replicationcommon.job import Job
+from s3replicationcommon.jobs import Jobs
+from s3replicationmanager import distributor
+from s3replicationmanager.distributor import JobDistributor
+from s3replicationmanager.distributor import SubscriberSender
+
+
+class FakeJob:
+    def __init__(self, replication_id):
+        """Initialise."""
+        self.replication_id = replication_id
+
+    def get_replication_id(self):
+        return self.replication_id
+
+    def get_operation_type(self):
+        return None
+
+
+class FakeSubscriber:
+    def __init__(self):
+        """Initialise."""
+        self.id = "subscriber-1"
+        self.not_sent_count = 0
+
+    def jobs_not_sent(self, count, size_bytes=0):
+        self.not_sent_count += count
+
+
+class FakeJobsList:
+    def __init__(self):
+        """Initialise."""
+        self.queued = []
+
+    def move_to_queued(self, replication_id):
+        self.queued.append(replication_id)
+
+
+class FailingClient:
+    def __init__(self, subscriber, retry_engine):
+        """Initialise."""
+
+    async def post(self, jobs_to_send):
+        raise RuntimeError("Session is closed")
+
+
+@pytest.fixture
+def sender(monkeypatch):
+    monkeypatch.setattr(distributor, "ReplicatorClient", FailingClient)
+    failed_posts = []
+    sender = SubscriberSender(
+        FakeSubscriber(), FakeJobsList(), None, max_inflight_posts=1,
+        retry_interval=60, on_post_failed=lambda: failed_posts.append(1))
+    sender.failed_posts = failed_posts
+    return sender
+
+
+def test_failed_post_returns_jobs(event_loop, sender):
+    jobs = [FakeJob("job-1"), FakeJob("job-2")]
+    sender._inflight_posts = 1
+    event_loop.run_until_complete(sender._post(jobs))
+
+    assert sender._subscriber.not_sent_count == 2
+    assert sorted(sender._jobs_list.queued) == ["job-1", "job-2"]
+    assert sender.failed_posts == [1]
+    assert sender.get_stats()["failed_posts_count"] == 1
+    assert sender.get_stats()["inflight_posts"] == 0
+    assert not sender.is_available()
+
+
+class HangingClient:
+    def __init__(self, subscriber, retry_engine):
+        """Initialise."""
+
+    async def post(self, jobs_to_send):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.parametrize("run_before_stop", [True, False])
+def test_stop_returns_jobs_being_posted_once(event_loop, monkeypatch,
+                                             run_before_stop):
+    monkeypatch.setattr(distributor, "ReplicatorClient", HangingClient)
+    sender = SubscriberSender(
+        FakeSubscriber(), FakeJobsList(), None, max_inflight_posts=2,
+        retry_interval=60, on_post_failed=lambda: None)
+    sender.start()
+    sender.enqueue([FakeJob("job-1"), FakeJob("job-2")])
+    event_loop.run_until_complete(asyncio.sleep(0))
+    if run_before_stop:
+        # Posts are in flight, else not yet started.
+        event_loop.run_until_complete(asyncio.sleep(0.01))
+    sender.enqueue([FakeJob("job-3")])
+    event_loop.run_until_complete(asyncio.sleep(0))
+
+    sender.stop()
+    event_loop.run_until_complete(asyncio.sleep(0.01))
+
+    assert sender._subscriber.not_sent_count == 3
+    assert sender._jobs_list.queued == ["job-3", "job-2", "job-1"]
+    assert sender._post_tasks == {}
+
+
+class FakeSubscribers(OrderedDict):
+    def set_capacity_callback(self, callback):
+        self.capacity_callback = callback
+
+
+class CapacitySubscriber:
+    """Subscriber taking capacity jobs."""
+
+    def __init__(self, subscriber_id, capacity):
+        """Initialise."""
+        self.id = subscriber_id
+        self.capacity = capacity
+
+    def pending_capacity(self):
+        return self.capacity
+
+    def jobs_sent(self, count, size_bytes=0):
+        self.capacity -= count
+
+
+class RecordingSender:
+    """Records jobs assigned to subscriber instead of posting them."""
+
+    def __init__(self, *args):
+        """Initialise."""
+        self.jobs = []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def is_available(self):
+        return True
+
+    def enqueue(self, jobs):
+        self.jobs.extend(job.get_replication_id() for job in jobs)
+
+
+def new_job(replication_id):
+    return Job({
+        "replication-id": replication_id,
+        "source": {
+            "operation": {
+                "type": "replicate_object_tags",
+                "attributes": {}
+            }
+        }
+    })
+
+
+@pytest.fixture
+def job_distributor(monkeypatch):
+    monkeypatch.setattr(distributor, "SubscriberSender", RecordingSender)
+    config = types.SimpleNamespace(
+        job_polling_interval=60, dispatch_linger_ms=0,
+        max_inflight_posts_per_subscriber=1,
+        placement_policy="insertion_order", completion_rate_weight=1.0)
+    app = {
+        "config": config,
+        "all_jobs": Jobs(logging.getLogger("test"), "all-jobs"),
+        "subscribers": FakeSubscribers(),
+        "retry_engine": None
+    }
+    return JobDistributor(app)
+
+
+def run_for_a_while(event_loop):
+    """Runs loop for much less than polling interval."""
+    event_loop.run_until_complete(asyncio.sleep(0.05))
+
+
+def stop(event_loop, job_distributor, task):
+    job_distributor.stop()
+    event_loop.run_until_complete(task)
+
+
+def test_queued_job_is_distributed_without_polling(event_loop,
+                                                   job_distributor):
+    app = job_distributor._app
+    app["subscribers"]["sub-1"] = CapacitySubscriber("sub-1", 10)
+    task = asyncio.ensure_future(job_distributor.start())
+    run_for_a_while(event_loop)
+
+    app["all_jobs"].add_job(new_job("job-1"))
+    run_for_a_while(event_loop)
+
+    assert job_distributor._senders["sub-1"].jobs == ["job-1"]
+    assert app["all_jobs"].queued_count() == 0
+    stop(event_loop, job_distributor, task)
+
+
+def test_capacity_wakes_up_distribution(event_loop, job_distributor):
+    app = job_distributor._app
+    subscriber = CapacitySubscriber("sub-1", 0)
+    app["subscribers"]["sub-1"] = subscriber
+    task = asyncio.ensure_future(job_distributor.start())
+    app["all_jobs"].add_job(new_job("job-1"))
+    run_for_a_while(event_loop)
+    assert app["all_jobs"].queued_count() == 1
+
+    subscriber.capacity = 1
+    app["subscribers"].capacity_callback()
+    run_for_a_while(event_loop)
+
+    assert job_distributor._senders["sub-1"].jobs == ["job-1"]
+    assert app["all_jobs"].queued_count() == 0
+    stop(event_loop, job_distributor, task)
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+
+import random
+
+from s3replicationmanager.placement import PlacementPolicy
+from s3replicationmanager.placement import SubscriberPlacement
+
+
+class FakeSubscriber:
+    """Subscriber with given outstanding bytes and completion rate."""
+
+    def __init__(self, subscriber_id, outstanding_bytes, completion_rate):
+        """Initialise."""
+        self.id = subscriber_id
+        self.outstanding_bytes = outstanding_bytes
+        self.completion_rate = completion_rate
+        self.rate_queries = 0
+
+    def get_outstanding_bytes(self):
+        return self.outstanding_bytes
+
+    def get_completion_rate(self):
+        self.rate_queries += 1
+        return self.completion_rate
+
+
+def place(placement, subscribers, sizes):
+    """Places jobs of sizes as distributor does, returns chosen ids."""
+    rate_weights = placement.get_rate_weights(subscribers)
+    chosen = []
+    for size in sizes:
+        subscriber = placement.choose(subscribers, size, rate_weights)
+        subscriber.outstanding_bytes += size
+        chosen.append(subscriber.id)
+    return chosen
+
+
+def test_insertion_order_fills_first_subscriber():
+    subscribers = [FakeSubscriber("a", 500, 1), FakeSubscriber("b", 0, 1)]
+    placement = SubscriberPlacement(PlacementPolicy.INSERTION_ORDER)
+    assert place(placement, subscribers, [100] * 3) == ["a"] * 3
+
+
+def test_least_loaded_balances_outstanding_bytes():
+    subscribers = [FakeSubscriber("a", 300, 100),
+                   FakeSubscriber("b", 0, 100)]
+    placement = SubscriberPlacement(PlacementPolicy.LEAST_LOADED)
+    assert place(placement, subscribers, [100] * 5) == \
+        ["b", "b", "b", "a", "b"]
+
+
+def test_least_loaded_weights_completion_rate():
+    # b completes 3 times faster, so it takes 3 times the bytes.
+    subscribers = [FakeSubscriber("a", 0, 100), FakeSubscriber("b", 0, 300)]
+    placement = SubscriberPlacement(PlacementPolicy.LEAST_LOADED)
+    chosen = place(placement, subscribers, [100] * 8)
+    assert chosen.count("a") == 2
+    assert chosen.count("b") == 6
+
+
+def test_zero_weight_ignores_completion_rate():
+    subscribers = [FakeSubscriber("a", 0, 100), FakeSubscriber("b", 0, 300)]
+    placement = SubscriberPlacement(PlacementPolicy.LEAST_LOADED,
+                                    completion_rate_weight=0)
+    chosen = place(placement, subscribers, [100] * 8)
+    assert chosen.count("a") == chosen.count("b") == 4
+
+
+def test_new_subscriber_takes_average_rate():
+    subscribers = [FakeSubscriber("a", 0, 100), FakeSubscriber("b", 0, 300),
+                   FakeSubscriber("new", 0, 0)]
+    placement = SubscriberPlacement(PlacementPolicy.LEAST_LOADED)
+    rate_weights = placement.get_rate_weights(subscribers)
+    assert rate_weights == {"a": 100, "b": 300, "new": 200}
+
+
+def test_power_of_two_choices_picks_less_loaded_of_sample():
+    random.seed(7)
+    subscribers = [FakeSubscriber("a", 1000, 1), FakeSubscriber("b", 0, 1),
+                   FakeSubscriber("c", 2000, 1)]
+    placement = SubscriberPlacement(PlacementPolicy.POWER_OF_TWO_CHOICES)
+    chosen = place(placement, subscribers, [10] * 20)
+    # Most loaded subscriber is never less loaded than the other sampled.
+    assert "c" not in chosen
+    assert "b" in chosen
+
+
+def test_rates_computed_once_per_round():
+    subscribers = [FakeSubscriber("a", 0, 100), FakeSubscriber("b", 0, 100)]
+    placement = SubscriberPlacement(PlacementPolicy.LEAST_LOADED)
+    place(placement, subscribers, [100] * 50)
+    assert [subscriber.rate_queries for subscriber in subscribers] == [1, 1]
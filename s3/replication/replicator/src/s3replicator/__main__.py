@@ -20,6 +20,8 @@
 import argparse
 import os
 from s3replicator.app import ReplicatorApp
+from s3replicator.config import Config
+from s3replicator.supervisor import ReplicatorSupervisor
 
 
 def setup_args(parser):
@@ -55,4 +57,7 @@ if __name__ == '__main__':
 
     print("Using Configuration from {}".format(args.logconfig))
     print("Using log configuration from {}".format(args.logconfig))
-    ReplicatorApp(args.configfile, args.logconfig).run()
+    if Config(args.configfile).load().workers_count > 1:
+        ReplicatorSupervisor(args.configfile, args.logconfig).run()
+    else:
+        ReplicatorApp(args.configfile, args.logconfig).run()
@@ -19,6 +19,7 @@
 
 import asyncio
 import sys
+from urllib.parse import urlparse
 from aiohttp import web
 import logging
 from .config import Config
@@ -28,18 +29,121 @@ from .replicator_routes import routes
 from .replication_manager import ReplicationManager
 from .replication_managers import ReplicationManagers
 from .session_manager import close_all_sessions
+from .session_manager import find_session
+from .session_manager import get_session
+from .session_manager import release_session
+from .session_manager import SessionManager
+from .supervisor import bind_socket
+from .connection_warmer import ConnectionWarmer
+from .checkpoint_journal import CheckpointJournal
+from .checkpoint_journal import abort_checkpoint_upload
+from .checkpoint_journal import load_target_credentials
+from .chunk_size_tuner import ChunkSizeTuner
+from .transfer_budget import TransferBudget
+from .transfer_scheduler import TransferScheduler
+from .site_concurrency import SiteConcurrencyLimits
+from s3replicationcommon.buffer_pool import BufferPool
+from s3replicationcommon.hash_executor import HashExecutor
+from s3replicationcommon.rate_limiter import SiteRateLimits
+from s3replicationcommon.retry import RetryEngine
+from s3replicationcommon.s3_site import S3Site
 
 _logger = logging.getLogger('s3replicator')
 
 
+async def get_checkpoint_session(app, checkpoint):
+    """Returns session for target account of checkpoint, None if its
+    secret key is unknown. Credentials are not saved in checkpoint, so a
+    session of a running job is used, else one is created using
+    configured target credentials.
+    """
+    session = find_session(
+        app, urlparse(checkpoint["target_endpoint"]).netloc,
+        checkpoint["target_access_key"])
+    if session is not None:
+        return session
+
+    config = app["config"]
+    credentials = await asyncio.get_event_loop().run_in_executor(
+        None, load_target_credentials, config.target_credentials_files)
+    secret_key = credentials.get(checkpoint["target_access_key"], None)
+    if secret_key is None or \
+            checkpoint.get("target_service_name") is None:
+        # Checkpoints saved by older versions have no site details.
+        _logger.warning(
+            "No credentials to abort stale upload of replication-id {}".
+            format(checkpoint["replication-id"]))
+        return None
+    return get_session(
+        app,
+        S3Site(checkpoint["target_endpoint"],
+               checkpoint["target_service_name"],
+               checkpoint["target_region"]),
+        checkpoint["target_access_key"],
+        secret_key,
+        config.max_connections_per_s3_session)
+
+
+async def sweep_stale_uploads(app):
+    """Periodically aborts uploads of checkpoints not resumed in time."""
+    config = app["config"]
+    checkpoint_journal = app['checkpoint_journal']
+    while True:
+        await asyncio.sleep(config.checkpoint_sweep_interval_secs)
+        for checkpoint in await checkpoint_journal.get_stale_checkpoints(
+                config.stale_upload_timeout_secs):
+            session = await get_checkpoint_session(app, checkpoint)
+            if session is None:
+                continue
+            try:
+                aborted = await abort_checkpoint_upload(session, checkpoint)
+            finally:
+                release_session(app, session)
+            if aborted:
+                checkpoint_journal.remove(checkpoint["replication-id"])
+            else:
+                # Checkpoint is kept, so abort is tried on next sweep.
+                _logger.warning(
+                    "Failed to abort stale upload of replication-id {}".
+                    format(checkpoint["replication-id"]))
+
+
+async def evict_idle_sessions(app):
+    """Periodically evicts sessions not used within idle timeout."""
+    config = app["config"]
+    while True:
+        await asyncio.sleep(config.session_idle_timeout_secs)
+        app["sessions"].evict_idle_sessions()
+
+
+async def warm_connections(app):
+    """Periodically refreshes warm connections before keep-alive expiry."""
+    config = app["config"]
+    while True:
+        await asyncio.sleep(config.warm_refresh_interval_secs)
+        await app['connection_warmer'].warm_sites()
+
+
 async def on_startup(app):
     _logger.debug("Starting server...")
+    app['idle_session_evictor'] = asyncio.ensure_future(
+        evict_idle_sessions(app))
+    if app['connection_warmer'] is not None:
+        # Connections to configured sites are ready for first jobs.
+        await app['connection_warmer'].warm_sites()
+        app['connection_refresher'] = asyncio.ensure_future(
+            warm_connections(app))
+    if app['checkpoint_journal'] is not None:
+        app['stale_upload_sweeper'] = asyncio.ensure_future(
+            sweep_stale_uploads(app))
+
     # Currently only one replication manager is registered.
     config = app["config"]
     managers_list = app['replication-managers']
 
     remote_endpoint = config.get_replication_manager_endpoint()
-    replication_manager = ReplicationManager(remote_endpoint)
+    replication_manager = ReplicationManager(remote_endpoint,
+                                             app['retry_engine'])
     connected = await replication_manager.subscribe(
         config.get_replicator_endpoint(), config.max_replications)
     if connected:
@@ -54,17 +158,36 @@ async def on_startup(app):
 
 async def on_shutdown(app):
     _logger.debug("Performing cleanup on shutdown...")
+    if app.get('stale_upload_sweeper', None) is not None:
+        app['stale_upload_sweeper'].cancel()
+    app['idle_session_evictor'].cancel()
+    if app.get('connection_refresher', None) is not None:
+        app['connection_refresher'].cancel()
     await close_all_sessions(app)
     await app['replication-managers'].close()
+    app['hash_executor'].shutdown()
+    if app['checkpoint_journal'] is not None:
+        app['checkpoint_journal'].close()
 
 
 class ReplicatorApp:
-    def __init__(self, config_file, log_config_file):
-        """Initialise logger and configuration."""
+    def __init__(self, config_file, log_config_file, worker_index=None,
+                 sock=None):
+        """Initialise logger and configuration.
+
+        Args:
+            worker_index (int): Index when running as one of worker
+            processes, see ReplicatorSupervisor.
+            sock (socket): Listening socket shared by workers, None for
+            worker to bind replicator port with SO_REUSEPORT.
+        """
         self._config = Config(config_file)
         if self._config.load() is None:
             print("Failed to load configuration.\n")
             sys.exit(-1)
+        if worker_index is not None:
+            self._config.set_worker(worker_index)
+        self._sock = sock
 
         # Setup logging.
         self._logger = setup_logger('s3replicator', log_config_file)
@@ -90,12 +213,6 @@ class ReplicatorApp:
         # Setup the global context store.
         # https://docs.aiohttp.org/en/stable/web_advanced.html#application-s-config
 
-        # Each site (source or target) for given account/user will have one
-        # session instance which will be reused for each request for that site.
-        # Example {"src.s3.seagate.com|access_key": aiohttp.ClientSession(),
-        # "tgt.s3.seagate.com|access_key": aiohttp.ClientSession()}
-        # See session_manager.py
-        app["sessions"] = {}
         app["config"] = self._config
 
         # All scheduled jobs
@@ -104,9 +221,94 @@ class ReplicatorApp:
         app['completed_jobs'] = self._completed_jobs
         app['replication-managers'] = self._replication_managers
 
-        # Throttle:  Allow only Max replications to run at a moment.
-        # Alternative design option is to use queued requests.
-        app['semaphore'] = asyncio.Semaphore(self._config.max_replications)
+        # Throttle:  Allow only Max replications to run at a moment, in
+        # small and large object lanes.
+        app['scheduler'] = TransferScheduler(
+            self._config.max_replications,
+            self._config.small_lane_max_bytes,
+            self._config.reserved_small_slots,
+            self._config.preemption_enabled,
+            self._config.min_running_large,
+            self._config.max_pause_secs,
+            self._config.metadata_slots)
+
+        # Throttle: Replications per source and target site, so a slow
+        # site does not hold all of max_replications.
+        app['site_concurrency'] = SiteConcurrencyLimits(
+            self._config.max_per_source_site,
+            self._config.max_per_target_site,
+            self._config.site_concurrency_limits)
+
+        # Throttle: Bytes held in transfer buffers across all replications.
+        app['transfer_budget'] = TransferBudget(
+            self._config.total_in_flight_bytes)
+
+        # Reusable multipart upload part buffers, bounded by the budget.
+        app['buffer_pool'] = BufferPool(
+            self._config.multipart_part_size_bytes,
+            max(1, self._config.total_in_flight_bytes //
+                self._config.multipart_part_size_bytes),
+            self._config.buffer_pool_max_idle_slabs)
+
+        # Small objects are read in full into a buffer, one per replication.
+        app['small_object_buffer_pool'] = BufferPool(
+            self._config.small_object_threshold_bytes,
+            self._config.max_replications)
+
+        # Multipart upload progress, to resume uploads.
+        app['checkpoint_journal'] = None
+        if self._config.checkpoint_enabled:
+            app['checkpoint_journal'] = CheckpointJournal(
+                self._config.checkpoint_directory)
+
+        # Retry of transient failures, shared by all requests.
+        app['retry_engine'] = RetryEngine(
+            self._config.retry_policies,
+            self._config.max_retries_per_sec,
+            self._config.retry_burst_size)
+
+        # Hashing of transfer data, shared by all sessions.
+        app['hash_executor'] = HashExecutor(
+            self._config.hash_threads,
+            self._config.max_inline_hash_bytes,
+            self._config.max_hash_backlog_bytes)
+
+        # Bandwidth and request rate limits per site, adjustable at runtime.
+        app['rate_limits'] = SiteRateLimits(
+            self._config.site_rate_limits,
+            self._config.rate_limit_burst_secs)
+
+        # Each site (source or target) for given account/user will have one
+        # session instance which will be reused for each request for that site.
+        # Sessions to a site share its connection pool.
+        # See session_manager.py
+        app["sessions"] = SessionManager(
+            self._config.max_sessions,
+            self._config.session_idle_timeout_secs,
+            self._config.max_total_connections,
+            self._config.get_transport_profile,
+            app['retry_engine'],
+            app['hash_executor'],
+            app['rate_limits'])
+
+        # Keeps connections to sites open ahead of requests.
+        app['connection_warmer'] = None
+        if self._config.connection_warming_enabled:
+            app['connection_warmer'] = ConnectionWarmer(
+                app["sessions"],
+                self._config.warm_site_endpoints,
+                self._config.warm_min_connections,
+                self._config.warm_recent_site_secs,
+                self._config.warm_request_timeout_secs,
+                self._config.max_connections_per_s3_session)
+
+        # Transfer chunk size per source/target site pair.
+        app['chunk_size_tuner'] = ChunkSizeTuner(
+            self._config.transfer_chunk_size_bytes,
+            self._config.min_chunk_size_bytes,
+            self._config.max_chunk_size_bytes,
+            self._config.target_chunk_latency_ms,
+            self._config.adaptive_chunk_size_enabled)
 
         # Setup application routes.
         app.add_routes(routes)
@@ -116,4 +318,13 @@ class ReplicatorApp:
         app.on_shutdown.append(on_shutdown)
 
         # Start the REST server.
-        web.run_app(app, host=self._config.host, port=self._config.port)
+        if self._config.worker_index is None:
+            web.run_app(app, host=self._config.host, port=self._config.port)
+        else:
+            sock = self._sock
+            if sock is None:
+                sock = bind_socket(self._config.host, self._config.port,
+                                   reuse_port=True)
+            worker_sock = bind_socket(
+                self._config.host, self._config.get_worker_port())
+            web.run_app(app, sock=[sock, worker_sock])
@@ -0,0 +1,275 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from s3replicationcommon.s3_multipart_upload import S3AsyncMultipartUpload
+
+_logger = logging.getLogger('s3replicator')
+
+
+class CheckpointJournal:
+    """Local journal of multipart upload progress per replication.
+
+    Checkpoint of a replication is saved in its own json file, replaced
+    atomically on every update, so a crash leaves either the previous or
+    the new checkpoint. Files are written and removed by a journal thread
+    in order of requests, so fsync does not stall event loop. Updates of
+    a checkpoint made while its earlier write is pending are written
+    once, as latest checkpoint. Checkpoints are keyed on replication id, which
+    is same when a replication is retried or resent after restart.
+    Credentials are never saved, only access key is saved to identify
+    the target account.
+
+    Checkpoint e.g.
+    {
+        "replication-id": "...",
+        "target_endpoint": "http://s3.seagate.com",
+        "target_service_name": "s3",
+        "target_region": "us-west2",
+        "target_access_key": "...",
+        "target_bucket": "...",
+        "object_name": "...",
+        "object_size": 1073741824,
+        "content_md5": "...",
+        "part_size": 16777216,
+        "upload_id": "...",
+        "parts": {"1": "etag1", "2": "etag2"},
+        "update_time": 1626000000.0
+    }
+    """
+
+    def __init__(self, directory):
+        """Initialise journal in directory, created if not present."""
+        self._directory = directory
+        os.makedirs(self._directory, exist_ok=True)
+        # Replication ids with transfer running in this process.
+        self._active_ids = set()
+        # Checkpoints not yet written, {replication_id: json}, kept till
+        # written so load() finds them meanwhile.
+        self._pending_writes = {}
+        # Replication ids with a write submitted and not started.
+        self._queued_ids = set()
+        # {replication_id: count} of removes not yet done, so load() does
+        # not find removed checkpoint meanwhile.
+        self._pending_removes = {}
+        # Guards above, shared with journal thread.
+        self._lock = threading.Lock()
+        # Single thread, so file operations are done in order.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="checkpoint")
+
+    def _get_path(self, replication_id):
+        # Replication id can have any characters, so name file on hash.
+        file_name = hashlib.sha256(
+            replication_id.encode('utf-8')).hexdigest() + ".json"
+        return os.path.join(self._directory, file_name)
+
+    def mark_active(self, replication_id):
+        """Marks checkpoint in use, so it is not treated as stale."""
+        self._active_ids.add(replication_id)
+
+    def mark_inactive(self, replication_id):
+        self._active_ids.discard(replication_id)
+
+    def load(self, replication_id):
+        """Returns checkpoint for replication, None if not present."""
+        with self._lock:
+            pending_json = self._pending_writes.get(replication_id, None)
+            remove_pending = replication_id in self._pending_removes
+        if pending_json is not None:
+            return json.loads(pending_json)
+        if remove_pending:
+            return None
+        path = self._get_path(replication_id)
+        try:
+            with open(path, 'r') as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            _logger.error("Ignoring unreadable checkpoint {}: {}".format(
+                path, str(e)))
+            return None
+        if checkpoint.get("replication-id") != replication_id:
+            return None
+        return checkpoint
+
+    def save(self, checkpoint):
+        """Saves checkpoint durably in background, replacing earlier one."""
+        checkpoint["update_time"] = time.time()
+        self._queue_write(checkpoint)
+
+    def save_abandoned(self, checkpoint):
+        """Saves checkpoint of an upload replaced by a new upload of the
+        replication, whose abort failed.
+
+        It is saved under its own key with its update time, as the new
+        upload's checkpoint replaces it, so stale upload sweeper aborts it
+        once stale.
+        """
+        abandoned_checkpoint = dict(checkpoint)
+        abandoned_checkpoint["replication-id"] = "{}#abandoned-{}".format(
+            checkpoint["replication-id"], checkpoint["upload_id"])
+        abandoned_checkpoint.setdefault("update_time", 0)
+        self._queue_write(abandoned_checkpoint)
+
+    def _queue_write(self, checkpoint):
+        replication_id = checkpoint["replication-id"]
+        # Serialised now, so later changes to checkpoint are not written.
+        checkpoint_json = json.dumps(checkpoint)
+        with self._lock:
+            self._pending_writes[replication_id] = checkpoint_json
+            write_queued = replication_id in self._queued_ids
+            self._queued_ids.add(replication_id)
+        if not write_queued:
+            self._executor.submit(self._write, replication_id)
+
+    def _write(self, replication_id):
+        """Writes pending checkpoint, runs in journal thread."""
+        with self._lock:
+            self._queued_ids.discard(replication_id)
+            checkpoint_json = self._pending_writes.get(replication_id, None)
+        if checkpoint_json is None:
+            # Removed since.
+            return
+        path = self._get_path(replication_id)
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'w') as checkpoint_file:
+                checkpoint_file.write(checkpoint_json)
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+            os.replace(temp_path, path)
+        except OSError as e:
+            _logger.error("Failed to save checkpoint {}: {}".format(
+                path, str(e)))
+        with self._lock:
+            if self._pending_writes.get(replication_id) is checkpoint_json:
+                del self._pending_writes[replication_id]
+
+    def remove(self, replication_id):
+        """Removes checkpoint of replication if present."""
+        with self._lock:
+            self._pending_writes.pop(replication_id, None)
+            self._pending_removes[replication_id] = \
+                self._pending_removes.get(replication_id, 0) + 1
+        self._executor.submit(self._remove, replication_id)
+
+    def _remove(self, replication_id):
+        """Removes checkpoint file, runs in journal thread."""
+        try:
+            os.remove(self._get_path(replication_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            _logger.error("Failed to remove checkpoint of {}: {}".format(
+                replication_id, str(e)))
+        with self._lock:
+            self._pending_removes[replication_id] -= 1
+            if self._pending_removes[replication_id] == 0:
+                del self._pending_removes[replication_id]
+
+    def close(self):
+        """Waits for pending writes."""
+        self._executor.shutdown(wait=True)
+
+    async def get_stale_checkpoints(self, timeout_secs):
+        """Returns checkpoints of inactive replications not updated within
+        timeout_secs.
+        """
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._find_stale_checkpoints, timeout_secs)
+
+    def _find_stale_checkpoints(self, timeout_secs):
+        """Reads checkpoints, runs in journal thread."""
+        stale_checkpoints = []
+        now = time.time()
+        for file_name in os.listdir(self._directory):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(self._directory, file_name)
+            try:
+                with open(path, 'r') as checkpoint_file:
+                    checkpoint = json.load(checkpoint_file)
+            except (OSError, ValueError):
+                continue
+            if checkpoint.get("replication-id") in self._active_ids:
+                continue
+            if now - checkpoint.get("update_time", 0) > timeout_secs:
+                stale_checkpoints.append(checkpoint)
+        return stale_checkpoints
+
+
+async def abort_checkpoint_upload(session, checkpoint):
+    """Aborts multipart upload saved in checkpoint.
+
+    Args:
+        session (S3Session): Session for target endpoint and account of
+        checkpoint.
+
+    Returns:
+        bool: True if upload was aborted or no longer exists, False if
+        abort failed or session is not for target of checkpoint.
+    """
+    if session.endpoint != checkpoint["target_endpoint"] or \
+            session.access_key != checkpoint["target_access_key"]:
+        _logger.error(
+            "Session is not for target of replication-id {}".format(
+                checkpoint["replication-id"]))
+        return False
+    _logger.info("Aborting upload id {} of replication-id {}".format(
+        checkpoint["upload_id"], checkpoint["replication-id"]))
+    upload = S3AsyncMultipartUpload(
+        session, checkpoint["replication-id"],
+        checkpoint["target_bucket"], checkpoint["object_name"],
+        checkpoint["object_size"], checkpoint["part_size"])
+    upload.resume_upload(checkpoint["upload_id"], {})
+    return await upload.abort_upload()
+
+
+def load_target_credentials(credentials_files):
+    """Loads secret keys of target accounts, to abort stale uploads
+    without a job for the account, e.g. after restart.
+
+    Args:
+        credentials_files (list): Yaml files with access_key and
+        secret_key, e.g. ~/.cortxs3/credentials.yaml.
+
+    Returns:
+        dict: {access_key: secret_key}
+    """
+    credentials = {}
+    for credentials_file in credentials_files:
+        path = os.path.expanduser(credentials_file)
+        try:
+            with open(path, 'r') as file_credentials:
+                account = yaml.safe_load(file_credentials)
+            credentials[account['access_key']] = account['secret_key']
+        except (OSError, yaml.YAMLError, KeyError, TypeError) as e:
+            _logger.error("Ignoring credentials file {}: {}".format(
+                path, repr(e)))
+    return credentials
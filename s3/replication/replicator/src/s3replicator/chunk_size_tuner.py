@@ -0,0 +1,166 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+
+_logger = logging.getLogger('s3replicator')
+
+# Weight of latest sample in moving averages.
+_EWMA_WEIGHT = 0.2
+
+
+class SiteChunkSize:
+    """Chunk size and observed throughput for a source/target site pair."""
+
+    def __init__(self, source_netloc, target_netloc, chunk_size):
+        """Initialise."""
+        self.source_netloc = source_netloc
+        self.target_netloc = target_netloc
+        self.chunk_size = chunk_size
+
+        # Moving averages of observed throughput and of average time taken
+        # per chunk, derived from time taken by transfers.
+        self.bytes_per_ms = None
+        self.chunk_latency_ms = None
+        self.samples_count = 0
+
+    def get_dictionary(self):
+        throughput = None
+        if self.bytes_per_ms is not None:
+            throughput = int(self.bytes_per_ms * 1000)
+        return {
+            "source": self.source_netloc,
+            "target": self.target_netloc,
+            "chunk_size_bytes": self.chunk_size,
+            "throughput_bytes_per_sec": throughput,
+            "chunk_latency_ms": self.chunk_latency_ms,
+            "samples_count": self.samples_count
+        }
+
+
+class ChunkSizeTuner:
+    """Chooses transfer chunk size per source/target site pair.
+
+    Throughput and average time per chunk of completed transfers, read
+    and written a chunk at a time, are tracked as moving averages per site
+    pair. Chunk size is set so a chunk takes about target_chunk_latency_ms
+    at observed throughput, changed by atmost a factor of 2 per sample and
+    kept within min_chunk_size and max_chunk_size. This amortises per
+    chunk overhead on fast links without growing buffers on slow ones.
+    """
+
+    def __init__(self, initial_chunk_size, min_chunk_size, max_chunk_size,
+                 target_chunk_latency_ms, enabled=True):
+        """Initialise."""
+        self._min_chunk_size = min_chunk_size
+        self._max_chunk_size = max_chunk_size
+        self._initial_chunk_size = self._clamp(initial_chunk_size)
+        self._target_chunk_latency_ms = target_chunk_latency_ms
+        self._enabled = enabled
+
+        # {"source_netloc|target_netloc": SiteChunkSize}
+        self._sites = {}
+
+    def _clamp(self, chunk_size):
+        return max(self._min_chunk_size,
+                   min(self._max_chunk_size, chunk_size))
+
+    def _get_site(self, source_netloc, target_netloc,
+                  initial_chunk_size=None):
+        site_key = source_netloc + "|" + target_netloc
+        site = self._sites.get(site_key, None)
+        if site is None:
+            if initial_chunk_size is None:
+                chunk_size = self._initial_chunk_size
+            else:
+                chunk_size = self._clamp(initial_chunk_size)
+            site = SiteChunkSize(source_netloc, target_netloc, chunk_size)
+            self._sites[site_key] = site
+        return site
+
+    def get_chunk_size(self, source_netloc, target_netloc,
+                       initial_chunk_size=None):
+        """Returns chunk size to be used for transfer between sites.
+
+        Args:
+            initial_chunk_size (int): Chunk size for site pair until it is
+            tuned, e.g. as per site transport profiles. Default is
+            initial chunk size of tuner.
+        """
+        if not self._enabled:
+            if initial_chunk_size is None:
+                return self._initial_chunk_size
+            return self._clamp(initial_chunk_size)
+        return self._get_site(source_netloc, target_netloc,
+                              initial_chunk_size).chunk_size
+
+    def record_transfer(self, source_netloc, target_netloc, chunk_size,
+                        transferred_bytes, elapsed_time_ms):
+        """Update site pair throughput using a completed transfer.
+
+        Args:
+            chunk_size (int): Chunk size used for transfer.
+            transferred_bytes (int): Size of object transferred.
+            elapsed_time_ms (int): Time taken for transfer, excluding time
+            it was paused. Only transfers of a single stream of chunks are
+            recorded, as throughput of parallel parts or stripes does not
+            depend on chunk size.
+        """
+        if not self._enabled:
+            return
+        # Transfers of only a chunk or two mostly measure request latency.
+        if transferred_bytes < 2 * chunk_size or elapsed_time_ms <= 0:
+            return
+
+        site = self._get_site(source_netloc, target_netloc)
+        chunks_count = -(-transferred_bytes // chunk_size)
+        bytes_per_ms = transferred_bytes / elapsed_time_ms
+        chunk_latency_ms = elapsed_time_ms / chunks_count
+        if site.bytes_per_ms is None:
+            site.bytes_per_ms = bytes_per_ms
+            site.chunk_latency_ms = chunk_latency_ms
+        else:
+            site.bytes_per_ms += \
+                _EWMA_WEIGHT * (bytes_per_ms - site.bytes_per_ms)
+            site.chunk_latency_ms += \
+                _EWMA_WEIGHT * (chunk_latency_ms - site.chunk_latency_ms)
+        site.samples_count += 1
+
+        # Bytes that can be moved in target latency, rounded down to a power
+        # of 2 and within a factor of 2 of current size to avoid oscillation.
+        wanted_size = int(site.bytes_per_ms * self._target_chunk_latency_ms)
+        new_size = site.chunk_size
+        while new_size * 2 <= wanted_size and \
+                new_size < site.chunk_size * 2:
+            new_size *= 2
+        while new_size > wanted_size and new_size > site.chunk_size // 2:
+            new_size //= 2
+        new_size = self._clamp(new_size)
+
+        if new_size != site.chunk_size:
+            _logger.debug(
+                "Chunk size for {} -> {} changed from {} to {} bytes, "
+                "throughput {} bytes/ms.".format(
+                    source_netloc, target_netloc, site.chunk_size,
+                    new_size, int(site.bytes_per_ms)))
+            site.chunk_size = new_size
+
+    def get_stats(self):
+        """Returns chunk sizes and throughput per site pair."""
+        return [site.get_dictionary() for site in self._sites.values()]
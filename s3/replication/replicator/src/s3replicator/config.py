@@ -26,7 +26,10 @@
 
 import os
 import yaml
+from s3replicationcommon.rate_limiter import SiteRateLimiter
+from s3replicationcommon.retry import RetryPolicy
 from s3replicationcommon.s3_common import make_baseurl
+from s3replicationcommon.transport_profile import TransportProfile
 
 
 class Config:
@@ -43,7 +46,70 @@ class Config:
 
         self.host = '127.0.0.1'
         self.port = 8081
+        self.workers_count = 1
+        self.workers_reuse_port = True
+        self.supervisor_port = 8091
+        self.worker_base_port = 8100
+        # Index of worker process, None when not running as worker.
+        self.worker_index = None
         self.max_connections_per_s3_session = 100
+        # Scheduler defaults keep all slots shared in FIFO order.
+        self.small_lane_max_bytes = 16777216
+        self.reserved_small_slots = 0
+        self.preemption_enabled = False
+        self.min_running_large = 1
+        self.max_pause_secs = 30
+        self.metadata_slots = 100
+        # Replications per site in each role, 0 for no limit.
+        self.max_per_source_site = 0
+        self.max_per_target_site = 0
+        # {endpoint netloc: {"source": limit, "target": limit}}
+        self.site_concurrency_limits = {}
+        self.total_in_flight_bytes = 1073741824
+        self.small_object_threshold_bytes = 65536
+        self.server_side_copy_enabled = True
+        self.preflight_check_enabled = False
+        self.multipart_threshold_bytes = 67108864
+        self.multipart_part_size_bytes = 16777216
+        self.multipart_concurrency = 4
+        self.buffer_pool_max_idle_slabs = 16
+        self.range_read_stripe_size_bytes = 8388608
+        self.range_read_max_stripes = 4
+        self.hash_threads = 4
+        self.max_inline_hash_bytes = 262144
+        self.max_hash_backlog_bytes = 16777216
+        self.adaptive_chunk_size_enabled = False
+        self.min_chunk_size_bytes = 4096
+        self.max_chunk_size_bytes = 1048576
+        self.target_chunk_latency_ms = 10
+        # {endpoint netloc: {limit: value}}
+        self.site_rate_limits = {}
+        self.rate_limit_burst_secs = 1
+        self.max_sessions = 1000
+        self.session_idle_timeout_secs = 300
+        self.max_total_connections = 2000
+        self.connection_warming_enabled = False
+        self.warm_min_connections = 4
+        self.warm_refresh_interval_secs = 10
+        self.warm_recent_site_secs = 900
+        self.warm_request_timeout_secs = 5
+        self.warm_site_endpoints = []
+        self.checkpoint_enabled = False
+        self.checkpoint_directory = \
+            '/var/lib/seagate/s3/replication/replicator/checkpoints'
+        self.stale_upload_timeout_secs = 86400
+        self.checkpoint_sweep_interval_secs = 3600
+        # Yaml files with access_key and secret_key of target accounts.
+        self.target_credentials_files = []
+        # {profile name: TransportProfile}, sites not mapped to a profile
+        # use "default" profile if present.
+        self.transport_profiles = {}
+        # {endpoint netloc: profile name}
+        self.site_transport_profiles = {}
+        # Operations without policy are not retried.
+        self.retry_policies = {}
+        self.max_retries_per_sec = 100
+        self.retry_burst_size = 200
 
     def load(self):
         """Load the configuration data."""
@@ -56,12 +122,164 @@ class Config:
             self.service_name = config_props['replicator']['service_name']
             self.max_payload = config_props['replicator']['max_payload']
 
+            workers = config_props.get('workers', None)
+            if workers is not None:
+                self.workers_count = workers['count']
+                self.workers_reuse_port = workers['reuse_port']
+                self.supervisor_port = workers['supervisor_port']
+                self.worker_base_port = workers['worker_base_port']
+
             self.max_replications = \
                 config_props['transfer']["max_replications"]
             self.transfer_chunk_size_bytes = \
                 config_props['transfer']["transfer_chunk_size_bytes"]
+            self.total_in_flight_bytes = config_props['transfer'].get(
+                'total_in_flight_bytes', self.total_in_flight_bytes)
             self.max_connections_per_s3_session = \
                 config_props['transfer']['max_connections_per_s3_session']
+            self.small_object_threshold_bytes = config_props['transfer'].get(
+                'small_object_threshold_bytes',
+                self.small_object_threshold_bytes)
+            self.server_side_copy_enabled = config_props['transfer'].get(
+                'server_side_copy_enabled', self.server_side_copy_enabled)
+            self.preflight_check_enabled = config_props['transfer'].get(
+                'preflight_check_enabled', self.preflight_check_enabled)
+            self.multipart_threshold_bytes = config_props['transfer'].get(
+                'multipart_threshold_bytes', self.multipart_threshold_bytes)
+            self.multipart_part_size_bytes = config_props['transfer'].get(
+                'multipart_part_size_bytes', self.multipart_part_size_bytes)
+            self.multipart_concurrency = config_props['transfer'].get(
+                'multipart_concurrency', self.multipart_concurrency)
+            self.buffer_pool_max_idle_slabs = config_props['transfer'].get(
+                'buffer_pool_max_idle_slabs', self.buffer_pool_max_idle_slabs)
+            self.range_read_stripe_size_bytes = config_props['transfer'].get(
+                'range_read_stripe_size_bytes',
+                self.range_read_stripe_size_bytes)
+            self.range_read_max_stripes = config_props['transfer'].get(
+                'range_read_max_stripes', self.range_read_max_stripes)
+
+            self.hash_threads = config_props['transfer'].get(
+                'hash_threads', self.hash_threads)
+            self.max_inline_hash_bytes = config_props['transfer'].get(
+                'max_inline_hash_bytes', self.max_inline_hash_bytes)
+            self.max_hash_backlog_bytes = config_props['transfer'].get(
+                'max_hash_backlog_bytes', self.max_hash_backlog_bytes)
+
+            adaptive_chunk_size = config_props['transfer'].get(
+                'adaptive_chunk_size', None)
+            if adaptive_chunk_size is not None:
+                self.adaptive_chunk_size_enabled = \
+                    adaptive_chunk_size['enabled']
+                self.min_chunk_size_bytes = \
+                    adaptive_chunk_size['min_chunk_size_bytes']
+                self.max_chunk_size_bytes = \
+                    adaptive_chunk_size['max_chunk_size_bytes']
+                self.target_chunk_latency_ms = \
+                    adaptive_chunk_size['target_chunk_latency_ms']
+
+            scheduler = config_props.get('scheduler', None)
+            if scheduler is not None:
+                self.small_lane_max_bytes = scheduler['small_lane_max_bytes']
+                self.reserved_small_slots = scheduler['reserved_small_slots']
+                self.preemption_enabled = scheduler['preemption_enabled']
+                self.min_running_large = scheduler['min_running_large']
+                self.max_pause_secs = scheduler['max_pause_secs']
+                self.metadata_slots = scheduler['metadata_slots']
+
+            site_concurrency = config_props.get('site_concurrency', None)
+            if site_concurrency is not None:
+                self.max_per_source_site = \
+                    site_concurrency['max_per_source_site']
+                self.max_per_target_site = \
+                    site_concurrency['max_per_target_site']
+                self.site_concurrency_limits = \
+                    site_concurrency.get('sites', None) or {}
+                for netloc, limits in self.site_concurrency_limits.items():
+                    for role in limits:
+                        if role not in ("source", "target"):
+                            raise ValueError(
+                                "Unknown concurrency limit {} for site {}".
+                                format(role, netloc))
+
+            transport_profiles = config_props.get('transport_profiles', None)
+            if transport_profiles is not None:
+                for name, profile in transport_profiles.items():
+                    # 0 stands for system default or no limit.
+                    self.transport_profiles[name] = TransportProfile(
+                        name,
+                        profile['max_connections'],
+                        profile['max_connections_per_host'],
+                        profile['keepalive_timeout_secs'],
+                        profile['dns_cache_ttl_secs'],
+                        profile['send_buffer_bytes'] or None,
+                        profile['receive_buffer_bytes'] or None,
+                        profile['tcp_nodelay'],
+                        profile['connect_timeout_secs'] or None,
+                        profile['read_timeout_secs'] or None,
+                        profile['chunk_size_bytes'] or None)
+            self.site_transport_profiles = \
+                config_props.get('site_transport_profiles', None) or {}
+            for netloc, name in self.site_transport_profiles.items():
+                if name not in self.transport_profiles:
+                    raise ValueError(
+                        "Unknown transport profile {} for site {}".format(
+                            name, netloc))
+
+            rate_limits = config_props.get('rate_limits', None)
+            if rate_limits is not None:
+                self.rate_limit_burst_secs = rate_limits['burst_secs']
+                self.site_rate_limits = rate_limits.get('sites', None) or {}
+                for netloc, limits in self.site_rate_limits.items():
+                    for limit in limits:
+                        if limit not in SiteRateLimiter.LIMITS:
+                            raise ValueError(
+                                "Unknown rate limit {} for site {}".format(
+                                    limit, netloc))
+
+            sessions = config_props.get('sessions', None)
+            if sessions is not None:
+                self.max_sessions = sessions['max_sessions']
+                self.session_idle_timeout_secs = \
+                    sessions['idle_timeout_secs']
+                self.max_total_connections = \
+                    sessions['max_total_connections']
+
+            connection_warming = config_props.get('connection_warming',
+                                                  None)
+            if connection_warming is not None:
+                self.connection_warming_enabled = \
+                    connection_warming['enabled']
+                self.warm_min_connections = \
+                    connection_warming['min_connections']
+                self.warm_refresh_interval_secs = \
+                    connection_warming['refresh_interval_secs']
+                self.warm_recent_site_secs = \
+                    connection_warming['recent_site_secs']
+                self.warm_request_timeout_secs = \
+                    connection_warming['request_timeout_secs']
+                self.warm_site_endpoints = \
+                    connection_warming.get('sites', None) or []
+
+            checkpoint = config_props.get('checkpoint', None)
+            if checkpoint is not None:
+                self.checkpoint_enabled = checkpoint['enabled']
+                self.checkpoint_directory = checkpoint['directory']
+                self.stale_upload_timeout_secs = \
+                    checkpoint['stale_upload_timeout_secs']
+                self.checkpoint_sweep_interval_secs = \
+                    checkpoint['sweep_interval_secs']
+                self.target_credentials_files = \
+                    checkpoint.get('target_credentials_files', None) or []
+
+            retry = config_props.get('retry', None)
+            if retry is not None:
+                self.max_retries_per_sec = retry['max_retries_per_sec']
+                self.retry_burst_size = retry['retry_burst_size']
+                for operation, policy in retry['policies'].items():
+                    self.retry_policies[operation] = RetryPolicy(
+                        policy['max_attempts'],
+                        policy['base_delay_ms'],
+                        policy['max_delay_ms'])
 
             self.job_cache_enabled = config_props['jobs']['enable_cache']
             self.job_cache_timeout_secs = config_props['jobs']['cache_timeout']
@@ -72,13 +290,81 @@ class Config:
             self.manager_service_name = config_props['manager']['service_name']
         return self
 
+    def _get_worker_share(self, total):
+        share = total // self.workers_count
+        if self.worker_index < total % self.workers_count:
+            share += 1
+        return max(1, share)
+
+    def set_worker(self, worker_index):
+        """Configures replicator as one of workers_count workers.
+
+        Limits of process resources, i.e. replications, transfer buffers
+        and connections, and site rate limits are split across workers.
+        """
+        self.worker_index = worker_index
+        self.max_replications = self._get_worker_share(self.max_replications)
+        self.reserved_small_slots = self._get_worker_share(
+            self.reserved_small_slots) if self.reserved_small_slots else 0
+        self.metadata_slots = self._get_worker_share(self.metadata_slots)
+        self.total_in_flight_bytes = self._get_worker_share(
+            self.total_in_flight_bytes)
+        self.max_total_connections = self._get_worker_share(
+            self.max_total_connections)
+        self.max_per_source_site = self._get_worker_share(
+            self.max_per_source_site) if self.max_per_source_site else 0
+        self.max_per_target_site = self._get_worker_share(
+            self.max_per_target_site) if self.max_per_target_site else 0
+        self.site_concurrency_limits = {
+            netloc: {role: self._get_worker_share(limit) if limit else 0
+                     for role, limit in limits.items()}
+            for netloc, limits in self.site_concurrency_limits.items()}
+        self.site_rate_limits = {
+            netloc: {limit: value / self.workers_count
+                     for limit, value in limits.items()}
+            for netloc, limits in self.site_rate_limits.items()}
+
+    def get_worker_port(self, worker_index=None):
+        """Returns port only served by worker, this worker by default.
+
+        Replication manager posts jobs of worker and queries their status
+        on this port, supervisor queries worker stats.
+        """
+        if worker_index is None:
+            worker_index = self.worker_index
+        return self.worker_base_port + worker_index
+
+    def get_transport_profile(self, netloc):
+        """Returns TransportProfile for site, None if not configured."""
+        name = self.site_transport_profiles.get(netloc, "default")
+        return self.transport_profiles.get(name, None)
+
+    def get_initial_chunk_size(self, source_netloc, target_netloc):
+        """Returns transfer chunk size to start with for site pair.
+
+        Smaller of chunk sizes of source and target transport profiles
+        is used, transfer_chunk_size_bytes when neither sets it.
+        """
+        chunk_sizes = []
+        for netloc in (source_netloc, target_netloc):
+            profile = self.get_transport_profile(netloc)
+            if profile is not None and profile.chunk_size_bytes is not None:
+                chunk_sizes.append(profile.chunk_size_bytes)
+        if not chunk_sizes:
+            return self.transfer_chunk_size_bytes
+        return min(chunk_sizes)
+
     def get_replicator_endpoint(self):
         """Returns replicator endpoint."""
         scheme = "http"
         if self.ssl:
             scheme = "https"
+        port = self.port
+        if self.worker_index is not None:
+            # Jobs of worker must reach the worker that runs them.
+            port = self.get_worker_port()
         # example http://localhost:8080
-        return make_baseurl(scheme, self.host, self.port)
+        return make_baseurl(scheme, self.host, port)
 
     def get_replication_manager_endpoint(self):
         """Returns replication manager endpoint."""
@@ -95,12 +381,119 @@ class Config:
             logger.info("Port: {}".format(self.port))
             logger.info("ssl: {}".format(self.ssl))
             logger.info("service_name: {}".format(self.service_name))
+            logger.info("workers_count: {}".format(self.workers_count))
+            logger.info("workers_reuse_port: {}".format(
+                self.workers_reuse_port))
+            logger.info("supervisor_port: {}".format(self.supervisor_port))
+            logger.info("worker_base_port: {}".format(self.worker_base_port))
+            logger.info("worker_index: {}".format(self.worker_index))
 
             logger.info("transfer_chunk_size_bytes: {}".format(
                 self.transfer_chunk_size_bytes))
             logger.info("max_replications: {}".format(self.max_replications))
+            logger.info("total_in_flight_bytes: {}".format(
+                self.total_in_flight_bytes))
             logger.info("max_connections_per_s3_session: {}".format(
                 self.max_connections_per_s3_session))
+            logger.info("small_object_threshold_bytes: {}".format(
+                self.small_object_threshold_bytes))
+            logger.info("server_side_copy_enabled: {}".format(
+                self.server_side_copy_enabled))
+            logger.info("preflight_check_enabled: {}".format(
+                self.preflight_check_enabled))
+            logger.info("multipart_threshold_bytes: {}".format(
+                self.multipart_threshold_bytes))
+            logger.info("multipart_part_size_bytes: {}".format(
+                self.multipart_part_size_bytes))
+            logger.info("multipart_concurrency: {}".format(
+                self.multipart_concurrency))
+            logger.info("buffer_pool_max_idle_slabs: {}".format(
+                self.buffer_pool_max_idle_slabs))
+            logger.info("range_read_stripe_size_bytes: {}".format(
+                self.range_read_stripe_size_bytes))
+            logger.info("range_read_max_stripes: {}".format(
+                self.range_read_max_stripes))
+            logger.info("hash_threads: {}".format(self.hash_threads))
+            logger.info("max_inline_hash_bytes: {}".format(
+                self.max_inline_hash_bytes))
+            logger.info("max_hash_backlog_bytes: {}".format(
+                self.max_hash_backlog_bytes))
+            logger.info("adaptive_chunk_size_enabled: {}".format(
+                self.adaptive_chunk_size_enabled))
+            logger.info("min_chunk_size_bytes: {}".format(
+                self.min_chunk_size_bytes))
+            logger.info("max_chunk_size_bytes: {}".format(
+                self.max_chunk_size_bytes))
+            logger.info("target_chunk_latency_ms: {}".format(
+                self.target_chunk_latency_ms))
+
+            logger.info("small_lane_max_bytes: {}".format(
+                self.small_lane_max_bytes))
+            logger.info("reserved_small_slots: {}".format(
+                self.reserved_small_slots))
+            logger.info("preemption_enabled: {}".format(
+                self.preemption_enabled))
+            logger.info("min_running_large: {}".format(
+                self.min_running_large))
+            logger.info("max_pause_secs: {}".format(self.max_pause_secs))
+            logger.info("metadata_slots: {}".format(self.metadata_slots))
+
+            logger.info("max_per_source_site: {}".format(
+                self.max_per_source_site))
+            logger.info("max_per_target_site: {}".format(
+                self.max_per_target_site))
+            logger.info("site_concurrency_limits: {}".format(
+                self.site_concurrency_limits))
+
+            for profile in self.transport_profiles.values():
+                logger.info("transport profile {}: {}".format(
+                    profile.name, profile.get_dictionary()))
+            logger.info("site_transport_profiles: {}".format(
+                self.site_transport_profiles))
+
+            logger.info("rate_limit_burst_secs: {}".format(
+                self.rate_limit_burst_secs))
+            logger.info("site_rate_limits: {}".format(self.site_rate_limits))
+
+            logger.info("max_sessions: {}".format(self.max_sessions))
+            logger.info("session_idle_timeout_secs: {}".format(
+                self.session_idle_timeout_secs))
+            logger.info("max_total_connections: {}".format(
+                self.max_total_connections))
+
+            logger.info("connection_warming_enabled: {}".format(
+                self.connection_warming_enabled))
+            logger.info("warm_min_connections: {}".format(
+                self.warm_min_connections))
+            logger.info("warm_refresh_interval_secs: {}".format(
+                self.warm_refresh_interval_secs))
+            logger.info("warm_recent_site_secs: {}".format(
+                self.warm_recent_site_secs))
+            logger.info("warm_request_timeout_secs: {}".format(
+                self.warm_request_timeout_secs))
+            logger.info("warm_site_endpoints: {}".format(
+                self.warm_site_endpoints))
+
+            logger.info("checkpoint_enabled: {}".format(
+                self.checkpoint_enabled))
+            logger.info("checkpoint_directory: {}".format(
+                self.checkpoint_directory))
+            logger.info("stale_upload_timeout_secs: {}".format(
+                self.stale_upload_timeout_secs))
+            logger.info("checkpoint_sweep_interval_secs: {}".format(
+                self.checkpoint_sweep_interval_secs))
+            logger.info("target_credentials_files: {}".format(
+                self.target_credentials_files))
+
+            logger.info("max_retries_per_sec: {}".format(
+                self.max_retries_per_sec))
+            logger.info("retry_burst_size: {}".format(self.retry_burst_size))
+            for operation, policy in self.retry_policies.items():
+                logger.info(
+                    "retry policy {}: max_attempts: {}, base_delay_ms: {}, "
+                    "max_delay_ms: {}".format(
+                        operation, policy.max_attempts,
+                        policy.base_delay_ms, policy.max_delay_ms))
 
             logger.info("manager_host: {}".format(self.manager_host))
             logger.info("manager_port: {}".format(self.manager_port))
@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+_logger = logging.getLogger('s3replicator')
+
+
+class ConnectionWarmer:
+    """Keeps connections to S3 sites open ahead of requests.
+
+    A burst of jobs to a site with no open connections waits on TCP (and
+    TLS) setup of every connection at once. Configured sites, and sites
+    of jobs within recent_site_secs, are kept with atleast
+    min_connections open by sending as many concurrent HEAD requests on
+    site root. Requests are unsigned, any response leaves the connection
+    open in the pool. Sites are warmed every refresh_interval_secs, which
+    should be less than keep-alive timeout of sites, so warm connections
+    are reused and not closed as idle.
+    """
+
+    def __init__(self, session_manager, site_endpoints, min_connections,
+                 recent_site_secs, request_timeout_secs, max_connections):
+        """Initialise.
+
+        Args:
+            session_manager (SessionManager): Holds site connection pools.
+            site_endpoints (list): Endpoints of sites always kept warm.
+            max_connections (int): Connections of sites without transport
+            profile.
+        """
+        self._session_manager = session_manager
+        self._site_endpoints = site_endpoints
+        self._min_connections = min_connections
+        self._recent_site_secs = recent_site_secs
+        self._request_timeout = aiohttp.ClientTimeout(
+            total=request_timeout_secs)
+        self._max_connections = max_connections
+
+        # Statistics.
+        self._warm_sites_count = 0
+        self._warm_requests_count = 0
+        self._failed_requests_count = 0
+
+    async def _open_connection(self, transport):
+        try:
+            async with transport.client_session.head(
+                    transport.endpoint + "/",
+                    timeout=self._request_timeout):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._failed_requests_count += 1
+            _logger.debug("Failed to warm connection to site {}: {}".format(
+                transport.netloc, str(e)))
+            return
+        self._warm_requests_count += 1
+
+    async def warm_site(self, transport):
+        """Opens or refreshes min_connections connections to site."""
+        connections_count = min(self._min_connections,
+                                transport.max_connections)
+        await asyncio.gather(*[self._open_connection(transport)
+                               for _ in range(connections_count)])
+
+    async def warm_sites(self):
+        """Warms configured and recently used sites.
+
+        Sites not used recently are no longer kept open, their pools
+        close along with their last session.
+        """
+        configured_netlocs = set()
+        for endpoint in self._site_endpoints:
+            self._session_manager.keep_site_open(endpoint,
+                                                 self._max_connections)
+            configured_netlocs.add(urlparse(endpoint).netloc)
+
+        now = time.monotonic()
+        warm_transports = []
+        for transport in self._session_manager.get_site_transports():
+            if transport.netloc in configured_netlocs or \
+                    now - transport.last_used_time <= self._recent_site_secs:
+                transport.keep_open = True
+                warm_transports.append(transport)
+            elif transport.keep_open:
+                _logger.debug("Site {} not used recently, not kept warm".
+                              format(transport.netloc))
+                self._session_manager.release_site(transport.netloc)
+
+        self._warm_sites_count = len(warm_transports)
+        await asyncio.gather(*[self.warm_site(transport)
+                               for transport in warm_transports])
+
+    def get_stats(self):
+        """Returns warming statistics."""
+        return {
+            "warm_sites_count": self._warm_sites_count,
+            "warm_requests_count": self._warm_requests_count,
+            "failed_requests_count": self._failed_requests_count
+        }
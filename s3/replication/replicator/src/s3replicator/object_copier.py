@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+from s3replicationcommon.job import JobEvents
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_copy_object import S3AsyncCopyObject
+from s3replicationcommon.s3_multipart_upload import S3AsyncMultipartUpload
+from s3replicationcommon.timer import Timer
+
+_logger = logging.getLogger('s3replicator')
+
+
+class ObjectCopier:
+    """Replicates object within an S3 endpoint using server side copy.
+
+    Used in place of ObjectReplicator when source and target are on the
+    same endpoint, so object data does not pass through replicator.
+    """
+
+    def __init__(self, job, session, multipart_threshold_bytes=None,
+                 multipart_part_size_bytes=None,
+                 multipart_concurrency=1) -> None:
+        """Initialise.
+
+        Objects larger than multipart_threshold_bytes are copied using
+        UploadPartCopy with parts of multipart_part_size_bytes, others
+        using CopyObject.
+        """
+        self._job_id = job.get_job_id()
+        self._request_id = self._job_id
+        self._timer = Timer()
+
+        # A set of observers to watch for varius notifications.
+        # To start with job completed (success/failure)
+        self._observers = {}
+
+        self._source_bucket_name = job.get_source_bucket_name()
+        self._source_object_name = job.get_source_object_name()
+
+        object_size = int(job.get_source_object_size())
+        if multipart_threshold_bytes is not None and \
+                object_size > multipart_threshold_bytes:
+            _logger.debug(
+                "Using UploadPartCopy for job_id {}, object size {}".
+                format(self._job_id, object_size))
+            self._object_copier = S3AsyncMultipartUpload(
+                session,
+                self._request_id,
+                job.get_target_bucket_name(),
+                job.get_source_object_name(),
+                object_size,
+                multipart_part_size_bytes,
+                multipart_concurrency)
+        else:
+            self._object_copier = S3AsyncCopyObject(
+                session,
+                self._request_id,
+                self._source_bucket_name,
+                self._source_object_name,
+                job.get_target_bucket_name(),
+                job.get_source_object_name(),
+                object_size,
+                job.get_source_object_md5())
+
+    def get_state(self):
+        """Returns state of object copy."""
+        return self._object_copier.get_state()
+
+    def get_execution_time(self):
+        """Return total time for Object replication."""
+        return self._timer.elapsed_time_ms()
+
+    def setup_observers(self, label, observer):
+        self._observers[label] = observer
+
+    async def start(self):
+        # Start copy
+        self._timer.start()
+        if isinstance(self._object_copier, S3AsyncMultipartUpload):
+            await self._object_copier.copy(self._source_bucket_name,
+                                           self._source_object_name)
+        else:
+            await self._object_copier.copy()
+        self._timer.stop()
+        _logger.info(
+            "Replication using server side copy completed in {}ms "
+            "for job_id {}".format(self._timer.elapsed_time_ms(),
+                                   self._job_id))
+        # notify job state events
+        for label, observer in self._observers.items():
+            _logger.debug(
+                "Notify completion to observer with label[{}]".format(label))
+            if self.get_state() == S3RequestState.PAUSED:
+                await observer.notify(JobEvents.STOPPED, self._job_id)
+            elif self.get_state() == S3RequestState.ABORTED:
+                await observer.notify(JobEvents.ABORTED, self._job_id)
+            else:
+                await observer.notify(JobEvents.COMPLETED, self._job_id)
+
+    def pause(self):
+        """Pause the running object copy."""
+        pass  # XXX
+
+    def resume(self):
+        """Resume the running object copy."""
+        pass  # XXX
+
+    def abort(self):
+        """Abort the running object copy."""
+        self._object_copier.abort()
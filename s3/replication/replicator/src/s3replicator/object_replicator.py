@@ -17,83 +17,524 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
+import asyncio
 import logging
+import time
 from s3replicationcommon.job import JobEvents
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import new_retrier
 from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_common import content_md5_header
 from s3replicationcommon.s3_get_object import S3AsyncGetObject
+from s3replicationcommon.s3_head_object import S3AsyncHeadObject
+from s3replicationcommon.s3_multipart_upload import S3AsyncMultipartUpload
+from s3replicationcommon.s3_multipart_upload import get_part_size
 from s3replicationcommon.s3_put_object import S3AsyncPutObject
+from s3replicationcommon.s3_striped_get_object import S3AsyncStripedGetObject
 from s3replicationcommon.timer import Timer
+from .checkpoint_journal import abort_checkpoint_upload
 
 _logger = logging.getLogger('s3replicator')
 
 
 class ObjectReplicator:
     def __init__(self, job, transfer_chunk_size_bytes, source_session,
-                 target_session) -> None:
-        """Initialise."""
+                 target_session, multipart_threshold_bytes=None,
+                 multipart_part_size_bytes=None,
+                 multipart_concurrency=1, range_read_stripe_size_bytes=None,
+                 range_read_max_stripes=1, transfer_budget=None,
+                 buffer_pool=None, small_object_buffer_pool=None,
+                 checkpoint_journal=None, retry_engine=None) -> None:
+        """Initialise.
+
+        Objects larger than multipart_threshold_bytes are uploaded using
+        multipart upload with parts of multipart_part_size_bytes. Objects
+        larger than range_read_stripe_size_bytes are read using upto
+        range_read_max_stripes parallel range GETs. When transfer_budget
+        is specified, buffers are reserved from it before transfer starts.
+        Multipart upload parts are filled in buffers leased from
+        buffer_pool when specified. Objects that fit in a buffer of
+        small_object_buffer_pool are read in one GET into a buffer and
+        written in one PUT from it, zero byte objects are not read. When
+        checkpoint_journal is specified, multipart upload progress is
+        saved in it and an upload saved earlier for the replication is
+        continued from its last completed part. When retry_engine is
+        specified, transfers failed on transient errors are retried with
+        new reader and writer, multipart uploads resume from checkpoint.
+        """
         self._transfer_chunk_size_bytes = transfer_chunk_size_bytes
+        self._job = job
         self._job_id = job.get_job_id()
         self._request_id = self._job_id
         self._timer = Timer()
+        self._transfer_budget = transfer_budget
+        # Bytes reserved from transfer_budget, released while paused.
+        self._reserved_bytes = 0
+        self._budget_lent = False
+        # Reserves budget again before a paused transfer resumes.
+        self._resume_task = None
+        self._small_object_buffer_pool = None
+        self._read_failed = False
+        self._replication_id = job.get_replication_id()
+        self._checkpoint_journal = None
+        self._checkpoint = None
+        # Checkpoint of an earlier upload that cannot be resumed.
+        self._stale_checkpoint = None
+        self._retry_engine = retry_engine
+        self._aborted = False
+        self._paused = False
+        # Time reader was paused in current transfer attempt, and when it
+        # was paused if not yet resumed.
+        self._paused_secs = 0.0
+        self._pause_start_time = None
+        # Time of last transfer attempt excluding time paused, when it is
+        # a single stream of chunks, see get_chunk_transfer_time().
+        self._chunk_transfer_time_ms = None
+        # Target already has identical object, nothing transferred.
+        self._skipped = False
 
         # A set of observers to watch for varius notifications.
         # To start with job completed (success/failure)
         self._observers = {}
 
         self._s3_source_session = source_session
+        self._s3_target_session = target_session
 
-        self._object_reader = S3AsyncGetObject(
-            self._s3_source_session,
-            self._request_id,
-            job.get_source_bucket_name(),
-            job.get_source_object_name(),
-            int(job.get_source_object_size()))
+        object_size = int(job.get_source_object_size())
+        self._object_size = object_size
+        self._use_small_object_transfer = \
+            small_object_buffer_pool is not None and \
+            object_size <= small_object_buffer_pool.get_slab_size()
+        self._use_multipart_upload = \
+            not self._use_small_object_transfer and \
+            multipart_threshold_bytes is not None and \
+            object_size > multipart_threshold_bytes
+        if self._use_small_object_transfer:
+            self._small_object_buffer_pool = small_object_buffer_pool
+        if self._use_multipart_upload:
+            self._checkpoint_journal = checkpoint_journal
 
-        # Setup target site info
-        self._s3_target_session = target_session
+        self._multipart_part_size_bytes = multipart_part_size_bytes
+        if self._use_multipart_upload:
+            # Part size used by upload, for checkpoint and resume offset.
+            self._multipart_part_size_bytes = get_part_size(
+                object_size, multipart_part_size_bytes)
+        self._multipart_concurrency = multipart_concurrency
+        self._range_read_stripe_size_bytes = range_read_stripe_size_bytes
+        self._range_read_max_stripes = range_read_max_stripes
+        self._buffer_pool = buffer_pool
 
-        self._object_writer = S3AsyncPutObject(
-            self._s3_target_session,
-            self._request_id,
-            job.get_target_bucket_name(),
-            job.get_source_object_name(),
-            int(job.get_source_object_size()))
+        self._setup_transfer()
+
+    def _setup_transfer(self):
+        """Creates object reader and writer for a transfer attempt."""
+        job = self._job
+        object_size = self._object_size
+        multipart_part_size_bytes = self._multipart_part_size_bytes
+        range_read_stripe_size_bytes = self._range_read_stripe_size_bytes
+        range_read_max_stripes = self._range_read_max_stripes
+        self._read_failed = False
+
+        # Parts completed earlier when resuming multipart upload.
+        resume_parts = {}
+        if self._checkpoint_journal is not None:
+            resume_parts = self._load_checkpoint(
+                job, multipart_part_size_bytes)
+        read_offset = len(resume_parts) * multipart_part_size_bytes \
+            if resume_parts else 0
+
+        # Bytes held in buffers by reader and writer during transfer.
+        reader_buffer_size = self._transfer_chunk_size_bytes
+        writer_buffer_size = 0
+        # Object is read and written in chunks one at a time, so
+        # throughput depends on chunk size.
+        self._single_stream = not self._use_small_object_transfer and \
+            not self._use_multipart_upload
+        if self._use_small_object_transfer:
+            _logger.debug(
+                "Using small object transfer for job_id {}, object size {}".
+                format(self._job_id, object_size))
+            self._object_reader = None
+            if object_size > 0:
+                # Writer hashes data it sends, reader need not.
+                self._object_reader = S3AsyncGetObject(
+                    self._s3_source_session,
+                    self._request_id,
+                    job.get_source_bucket_name(),
+                    job.get_source_object_name(),
+                    object_size,
+                    compute_md5=False)
+        elif range_read_stripe_size_bytes is not None and \
+                range_read_max_stripes > 1 and \
+                object_size - read_offset > range_read_stripe_size_bytes:
+            _logger.debug(
+                "Using striped range reads for job_id {}, object size {}".
+                format(self._job_id, object_size))
+            self._single_stream = False
+            self._object_reader = S3AsyncStripedGetObject(
+                self._s3_source_session,
+                self._request_id,
+                job.get_source_bucket_name(),
+                job.get_source_object_name(),
+                object_size,
+                range_read_stripe_size_bytes,
+                range_read_max_stripes,
+                read_offset)
+            reader_buffer_size = \
+                range_read_stripe_size_bytes * range_read_max_stripes
+        elif read_offset > 0:
+            self._object_reader = S3AsyncGetObject(
+                self._s3_source_session,
+                self._request_id,
+                job.get_source_bucket_name(),
+                job.get_source_object_name(),
+                object_size,
+                range_read_offset=read_offset,
+                range_read_length=object_size - read_offset)
+        else:
+            self._object_reader = S3AsyncGetObject(
+                self._s3_source_session,
+                self._request_id,
+                job.get_source_bucket_name(),
+                job.get_source_object_name(),
+                object_size)
+
+        if self._use_multipart_upload:
+            _logger.debug(
+                "Using multipart upload for job_id {}, object size {}".
+                format(self._job_id, object_size))
+            self._object_writer = S3AsyncMultipartUpload(
+                self._s3_target_session,
+                self._request_id,
+                job.get_target_bucket_name(),
+                job.get_source_object_name(),
+                object_size,
+                multipart_part_size_bytes,
+                self._multipart_concurrency,
+                job.get_source_object_md5(),
+                self._buffer_pool)
+            if self._checkpoint_journal is not None:
+                if resume_parts:
+                    self._object_writer.resume_upload(
+                        self._checkpoint["upload_id"], resume_parts)
+                self._object_writer.enable_resume(self._save_checkpoint)
+            # Parts being uploaded and the one being filled.
+            writer_buffer_size = \
+                multipart_part_size_bytes * (self._multipart_concurrency + 1)
+        else:
+            self._object_writer = S3AsyncPutObject(
+                self._s3_target_session,
+                self._request_id,
+                job.get_target_bucket_name(),
+                job.get_source_object_name(),
+                object_size,
+                job.get_source_object_md5())
+
+        self._buffer_size = min(
+            reader_buffer_size + writer_buffer_size, object_size)
+
+        if self._paused and self._object_reader is not None:
+            # Retry attempt of a paused transfer stays paused.
+            self._object_reader.pause()
+
+    def _load_checkpoint(self, job, part_size):
+        """Loads checkpoint of earlier upload for this replication.
+
+        Returns:
+            dict: Parts that can be resumed {part_number: etag}.
+        """
+        checkpoint = {
+            "replication-id": self._replication_id,
+            "target_endpoint": job.get_target_endpoint(),
+            "target_service_name": job.get_target_s3_service_name(),
+            "target_region": job.get_target_s3_region(),
+            "target_access_key": job.get_target_access_key(),
+            "target_bucket": job.get_target_bucket_name(),
+            "object_name": job.get_source_object_name(),
+            "object_size": self._object_size,
+            "content_md5": job.get_source_object_md5(),
+            "part_size": part_size,
+            "upload_id": None,
+            "parts": {}
+        }
+        self._checkpoint = checkpoint
+
+        saved_checkpoint = self._checkpoint_journal.load(self._replication_id)
+        if saved_checkpoint is None or \
+                saved_checkpoint.get("upload_id") is None:
+            return {}
+        for key in checkpoint:
+            if key not in ("upload_id", "parts") and \
+                    saved_checkpoint.get(key) != checkpoint[key]:
+                # Object or target changed since, upload is of no use.
+                _logger.info(
+                    "Discarding checkpoint for job_id {}, {} changed".format(
+                        self._job_id, key))
+                self._stale_checkpoint = saved_checkpoint
+                return {}
+
+        # Resume after parts completed in order, at least one part is left
+        # to be uploaded so reader has data to read.
+        saved_parts = saved_checkpoint["parts"]
+        parts_count = -(-self._object_size // part_size)
+        resume_parts = {}
+        while len(resume_parts) + 1 < parts_count and \
+                str(len(resume_parts) + 1) in saved_parts:
+            part_number = len(resume_parts) + 1
+            resume_parts[part_number] = saved_parts[str(part_number)]
+
+        checkpoint["upload_id"] = saved_checkpoint["upload_id"]
+        checkpoint["parts"] = {str(part_number): etag
+                               for part_number, etag in resume_parts.items()}
+        _logger.info(
+            "Resuming upload id {} for job_id {} after {} parts".format(
+                checkpoint["upload_id"], self._job_id, len(resume_parts)))
+        return resume_parts
+
+    def _save_checkpoint(self, upload_id, parts):
+        """Saves multipart upload progress, called by writer."""
+        self._checkpoint["upload_id"] = upload_id
+        self._checkpoint["parts"] = {
+            str(part_number): etag for part_number, etag in parts.items()}
+        self._checkpoint_journal.save(self._checkpoint)
+
+    def get_state(self):
+        """Returns state of object transfer."""
+        if self._aborted:
+            return S3RequestState.ABORTED
+        if self._skipped:
+            return S3RequestState.COMPLETED
+        if self._read_failed:
+            return S3RequestState.FAILED
+        return self._object_writer.get_state()
 
     def get_execution_time(self):
         """Return total time for Object replication."""
         return self._timer.elapsed_time_ms()
 
+    def get_chunk_transfer_time(self):
+        """Returns ms taken by last transfer attempt excluding time paused,
+        None if object was not transferred as a single stream of chunks,
+        e.g. multipart upload or striped reads, whose throughput depends
+        on parts and stripes in parallel rather than chunk size.
+        """
+        return self._chunk_transfer_time_ms
+
     def setup_observers(self, label, observer):
         self._observers[label] = observer
 
+    async def skip_if_replicated(self):
+        """Completes replication without transfer when target object is
+        identical to source, same size and ETag matching Content-MD5 of
+        source. Objects without Content-MD5 cannot be compared and are
+        transferred, as are objects uploaded to target using multipart
+        upload, as their ETag is not md5 of object.
+
+        Only a HEAD is sent to target, so it is done before waiting for
+        transfer slots.
+
+        Returns:
+            bool: True if replication completed without transfer.
+        """
+        source_md5 = content_md5_header(self._job.get_source_object_md5())
+        if source_md5 is None:
+            return False
+
+        object_head = S3AsyncHeadObject(
+            self._s3_target_session,
+            self._request_id,
+            self._job.get_target_bucket_name(),
+            self._job.get_source_object_name())
+        await object_head.head()
+        if object_head.get_state() != S3RequestState.COMPLETED or \
+                not object_head.exists() or \
+                object_head.get_object_size() != self._object_size or \
+                content_md5_header(object_head.get_etag()) != source_md5:
+            return False
+
+        self._skipped = True
+        _logger.info(
+            "Target has identical object, skipped transfer for job_id {}".
+            format(self._job_id))
+        await self._notify_observers()
+        return True
+
     async def start(self):
+        if self._transfer_budget is not None:
+            self._reserved_bytes = await self._transfer_budget.reserve(
+                self._buffer_size)
+            if self._paused:
+                # Paused while waiting for budget.
+                self._lend_budget()
+        if self._checkpoint_journal is not None:
+            self._checkpoint_journal.mark_active(self._replication_id)
+            if self._stale_checkpoint is not None:
+                if not await abort_checkpoint_upload(
+                        self._s3_target_session, self._stale_checkpoint):
+                    # New upload's checkpoint replaces it, keep upload id
+                    # so abort is retried by stale upload sweeper.
+                    self._checkpoint_journal.save_abandoned(
+                        self._stale_checkpoint)
+                self._stale_checkpoint = None
+        retrier = new_retrier(self._retry_engine,
+                              RetryOperation.OBJECT_TRANSFER,
+                              _logger, self._request_id)
+        if self._retry_engine is not None:
+            # Count retries of all requests of this job.
+            self._retry_engine.track_retries(self._request_id)
         # Start transfer
         self._timer.start()
-        await self._object_writer.send(self._object_reader,
-                                       self._transfer_chunk_size_bytes)
+        try:
+            while True:
+                attempt_start_time = time.perf_counter()
+                self._paused_secs = 0.0
+                if self._pause_start_time is not None:
+                    # Still paused, count only time paused in this attempt.
+                    self._pause_start_time = attempt_start_time
+                if self._small_object_buffer_pool is not None:
+                    await self._transfer_small_object()
+                else:
+                    await self._object_writer.send(
+                        self._object_reader,
+                        self._transfer_chunk_size_bytes)
+                self._record_attempt_time(attempt_start_time)
+                if self._checkpoint_journal is not None and \
+                        not self._object_writer.can_resume():
+                    self._checkpoint_journal.remove(self._replication_id)
+                if not self._is_retryable() or \
+                        not await retrier.wait_to_retry(
+                            "transfer failed for job_id {}".format(
+                                self._job_id)) or \
+                        self._aborted:
+                    break
+                self._setup_transfer()
+        finally:
+            if self._resume_task is not None:
+                self._resume_task.cancel()
+            if self._transfer_budget is not None:
+                self._transfer_budget.release(self._reserved_bytes)
+                self._reserved_bytes = 0
+            if self._checkpoint_journal is not None:
+                self._checkpoint_journal.mark_inactive(self._replication_id)
+            if self._retry_engine is not None:
+                self._job.set_retry_count(
+                    self._retry_engine.untrack_retries(self._request_id))
         self._timer.stop()
         _logger.info(
             "Replication completed in {}ms for job_id {}".format(
                 self._timer.elapsed_time_ms(), self._job_id))
-        # notify job state events
+        await self._notify_observers()
+
+    async def _notify_observers(self):
+        """Notifies job state event to observers."""
         for label, observer in self._observers.items():
             _logger.debug(
                 "Notify completion to observer with label[{}]".format(label))
-            if self._object_writer.get_state() == S3RequestState.PAUSED:
+            if self.get_state() == S3RequestState.PAUSED:
                 await observer.notify(JobEvents.STOPPED, self._job_id)
-            elif self._object_writer.get_state() == S3RequestState.ABORTED:
+            elif self.get_state() == S3RequestState.ABORTED:
                 await observer.notify(JobEvents.ABORTED, self._job_id)
             else:
                 await observer.notify(JobEvents.COMPLETED, self._job_id)
 
+    def _is_retryable(self):
+        """Returns True if transfer failed on a transient error."""
+        if self.get_state() != S3RequestState.FAILED:
+            return False
+        if self._object_reader is not None and \
+                self._object_reader.get_state() == S3RequestState.FAILED and \
+                self._object_reader.is_retryable():
+            return True
+        return self._object_writer.is_retryable()
+
+    async def _transfer_small_object(self):
+        """Reads object in one GET into a pooled buffer and PUTs it."""
+        data_buffer = await self._small_object_buffer_pool.acquire()
+        try:
+            if self._object_reader is not None:
+                await self._object_reader.fetch_into(data_buffer)
+                if self._object_writer.get_state() == \
+                        S3RequestState.ABORTED:
+                    return
+                if self._object_reader.get_state() != \
+                        S3RequestState.COMPLETED:
+                    _logger.error(
+                        "Failed to read source object for job_id {}".format(
+                            self._job_id))
+                    self._read_failed = True
+                    return
+            await self._object_writer.send_data(data_buffer.view())
+        finally:
+            data_buffer.release()
+
+    def _record_attempt_time(self, attempt_start_time):
+        """Records time of transfer attempt, excluding time paused."""
+        now = time.perf_counter()
+        paused_secs = self._paused_secs
+        if self._pause_start_time is not None:
+            # Paused after last chunk was read.
+            paused_secs += now - self._pause_start_time
+        self._chunk_transfer_time_ms = None
+        if self._single_stream:
+            self._chunk_transfer_time_ms = int(round(
+                (now - attempt_start_time - paused_secs) * 1000))
+
+    def _resume_reader(self):
+        if self._pause_start_time is not None:
+            self._paused_secs += time.perf_counter() - self._pause_start_time
+            self._pause_start_time = None
+        if self._object_reader is not None:
+            self._object_reader.resume()
+
+    def _lend_budget(self):
+        """Releases budget of paused transfer, e.g. for transfer that
+        preempted it. Data already read is still written, so buffers in
+        use are briefly beyond budget.
+        """
+        if self._transfer_budget is not None and self._reserved_bytes > 0:
+            self._transfer_budget.release(self._reserved_bytes)
+            self._reserved_bytes = 0
+            self._budget_lent = True
+
+    async def _reserve_and_resume(self):
+        """Resumes reader once budget released on pause is reserved."""
+        self._reserved_bytes = await self._transfer_budget.reserve(
+            self._buffer_size)
+        self._budget_lent = False
+        self._resume_task = None
+        self._resume_reader()
+
     def pause(self):
-        """Pause the running object tranfer."""
-        pass  # XXX
+        """Pause the running object tranfer.
+
+        Reader stops at next chunk boundary and drops its connection, data
+        already read is still written. Transfer budget is released till
+        resume().
+        """
+        self._paused = True
+        if self._pause_start_time is None:
+            self._pause_start_time = time.perf_counter()
+        if self._resume_task is not None:
+            # Paused again before budget was reserved.
+            self._resume_task.cancel()
+            self._resume_task = None
+        if self._object_reader is not None:
+            self._object_reader.pause()
+        self._lend_budget()
 
     def resume(self):
-        """Resume the running object tranfer."""
-        pass  # XXX
+        """Resume the running object tranfer, once budget is reserved."""
+        self._paused = False
+        if self._budget_lent and not self._aborted:
+            self._resume_task = asyncio.ensure_future(
+                self._reserve_and_resume())
+        else:
+            self._resume_reader()
 
     def abort(self):
         """Abort the running object tranfer."""
+        self._aborted = True
+        if self._small_object_buffer_pool is not None and \
+                self._object_reader is not None:
+            self._object_reader.abort()
         self._object_writer.abort()
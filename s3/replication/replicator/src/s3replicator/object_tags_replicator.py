@@ -0,0 +1,114 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+from s3replicationcommon.job import JobEvents
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_object_tagging import S3AsyncGetObjectTagging
+from s3replicationcommon.s3_object_tagging import S3AsyncPutObjectTagging
+from s3replicationcommon.timer import Timer
+
+_logger = logging.getLogger('s3replicator')
+
+
+class ObjectTagsReplicator:
+    """Replicates tags of an object, object data is not transferred.
+
+    Tags are read from source object and replace tags of target object,
+    so tags removed at source are removed at target too.
+    """
+
+    def __init__(self, job, source_session, target_session) -> None:
+        """Initialise."""
+        self._job_id = job.get_job_id()
+        self._request_id = self._job_id
+        self._timer = Timer()
+        self._aborted = False
+
+        # A set of observers to watch for varius notifications.
+        # To start with job completed (success/failure)
+        self._observers = {}
+
+        self._target_session = target_session
+        self._target_bucket_name = job.get_target_bucket_name()
+        self._object_name = job.get_source_object_name()
+
+        self._tags_reader = S3AsyncGetObjectTagging(
+            source_session,
+            self._request_id,
+            job.get_source_bucket_name(),
+            job.get_source_object_name())
+        self._tags_writer = None
+
+    def get_state(self):
+        """Returns state of tags replication."""
+        if self._aborted:
+            return S3RequestState.ABORTED
+        if self._tags_writer is None:
+            if self._tags_reader.get_state() == S3RequestState.COMPLETED:
+                return S3RequestState.RUNNING
+            return self._tags_reader.get_state()
+        return self._tags_writer.get_state()
+
+    def get_execution_time(self):
+        """Return total time for tags replication."""
+        return self._timer.elapsed_time_ms()
+
+    def setup_observers(self, label, observer):
+        self._observers[label] = observer
+
+    async def start(self):
+        self._timer.start()
+        await self._tags_reader.get()
+        if self._tags_reader.get_state() == S3RequestState.COMPLETED and \
+                not self._aborted:
+            self._tags_writer = S3AsyncPutObjectTagging(
+                self._target_session,
+                self._request_id,
+                self._target_bucket_name,
+                self._object_name,
+                self._tags_reader.get_tags())
+            await self._tags_writer.put()
+        elif not self._aborted:
+            _logger.error("Failed to read source object tags for job_id {}".
+                          format(self._job_id))
+        self._timer.stop()
+        _logger.info(
+            "Tags replication completed in {}ms for job_id {}".format(
+                self._timer.elapsed_time_ms(), self._job_id))
+        # notify job state events
+        for label, observer in self._observers.items():
+            _logger.debug(
+                "Notify completion to observer with label[{}]".format(label))
+            if self.get_state() == S3RequestState.ABORTED:
+                await observer.notify(JobEvents.ABORTED, self._job_id)
+            else:
+                await observer.notify(JobEvents.COMPLETED, self._job_id)
+
+    def pause(self):
+        """Pause the running tags replication."""
+        pass  # XXX
+
+    def resume(self):
+        """Resume the running tags replication."""
+        pass  # XXX
+
+    def abort(self):
+        """Abort the running tags replication."""
+        self._aborted = True
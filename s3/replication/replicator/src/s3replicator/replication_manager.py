@@ -18,10 +18,14 @@
 #
 
 import aiohttp
+import asyncio
 import json
 import logging
 import uuid
 from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.retry import RetryOperation
+from s3replicationcommon.retry import new_retrier
+from s3replicationcommon.retry import request_with_retries
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.s3_common import url_with_resources
 from s3replicationcommon.templates import subscribe_payload_template
@@ -31,14 +35,19 @@ _logger = logging.getLogger('s3replicator')
 
 
 class ReplicationManager:
-    def __init__(self, manager_endpoint):
-        """Initialise ReplicationManager object."""
+    def __init__(self, manager_endpoint, retry_engine=None):
+        """Initialise ReplicationManager object.
+
+        Job status updates failed on transient errors are retried as per
+        policy of retry_engine.
+        """
         # Id generated locally.
         self.id = str(uuid.uuid4())
         self.endpoint = manager_endpoint
         # Id returned for remote replication manager after subscribe.
         self.subscriber_id = None
         self.client_session = aiohttp.ClientSession()
+        self._retry_engine = retry_engine
 
         self._timer = Timer()
         self._state = S3RequestState.INITIALISED
@@ -138,11 +147,16 @@ class ReplicationManager:
                       "PUT with headers {}".format(headers))
         _logger.debug(fmt_reqid_log(req_id) + "PUT content {}".format(payload))
 
+        retrier = new_retrier(self._retry_engine,
+                              RetryOperation.MANAGER_UPDATE, _logger, req_id)
         self._timer.start()
         try:
             self._state = S3RequestState.RUNNING
-            async with self.client_session.put(resource_url, headers=headers,
-                                               json=payload) as resp:
+            resp = await request_with_retries(
+                retrier,
+                lambda: self.client_session.put(
+                    resource_url, headers=headers, json=payload))
+            async with resp:
                 self._timer.stop()
 
                 self._response_headers = resp.headers
@@ -171,6 +185,11 @@ class ReplicationManager:
             self.remote_down = True
             _logger.error(
                 'Failed to connect to Replication manager: ' + str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._timer.stop()
+            self._state = S3RequestState.FAILED
+            _logger.error(fmt_reqid_log(req_id) +
+                          'PUT on {} failed: {}'.format(resource_url, repr(e)))
 
         if self._state == S3RequestState.COMPLETED:
             return True
@@ -148,6 +148,62 @@ async def add_job(request):
         status=response_status)
 
 
+@routes.get('/stats')  # noqa: E302
+async def get_stats(request):
+    """Get transfer resource usage statistics."""
+    _logger.debug('API: GET /stats')
+    stats = {
+        "jobs": {
+            "inprogress_count": request.app['all_jobs'].count(),
+            "completed_count": request.app['completed_jobs'].count()
+        },
+        "scheduler": request.app['scheduler'].get_stats(),
+        "site_concurrency": request.app['site_concurrency'].get_stats(),
+        "transfer_budget": request.app['transfer_budget'].get_stats(),
+        "buffer_pool": request.app['buffer_pool'].get_stats(),
+        "small_object_buffer_pool":
+            request.app['small_object_buffer_pool'].get_stats(),
+        "chunk_sizes": request.app['chunk_size_tuner'].get_stats(),
+        "retries": request.app['retry_engine'].get_stats(),
+        "sessions": request.app['sessions'].get_stats(),
+        "hashing": request.app['hash_executor'].get_stats(),
+        "rate_limits": request.app['rate_limits'].get_stats()
+    }
+    if request.app['connection_warmer'] is not None:
+        stats["connection_warming"] = \
+            request.app['connection_warmer'].get_stats()
+    return web.json_response(stats, status=200)
+
+
+@routes.get('/rate-limits')  # noqa: E302
+async def list_rate_limits(request):
+    """Get allowed and observed rates per site."""
+    _logger.debug('API: GET /rate-limits')
+    return web.json_response(request.app['rate_limits'].get_stats(),
+                             status=200)
+
+
+@routes.put('/rate-limits/{site}')  # noqa: E302
+async def set_rate_limits(request):
+    """Change rate limits of site (endpoint netloc)."""
+    site = request.match_info['site']
+    _logger.debug('API: PUT /rate-limits/{}'.format(site))
+    try:
+        limits = await request.json()
+        if not isinstance(limits, dict):
+            raise ValueError("Rate limits should be a json object")
+        request.app['rate_limits'].set_site_limits(site, limits)
+    except ValueError as e:
+        _logger.error('Invalid rate limits for site {}: {}'.format(
+            site, str(e)))
+        return web.json_response({'ErrorResponse': str(e)}, status=400)
+    _logger.info('Rate limits of site {} changed to {}'.format(
+        site, request.app['rate_limits'].get_site_limiter(site).get_limits()))
+    return web.json_response(
+        request.app['rate_limits'].get_site_limiter(site).get_stats(),
+        status=200)
+
+
 @routes.delete('/jobs/{job_id}')  # noqa: E302
 async def abort_job(request):
     """Abort a job with given job_id."""
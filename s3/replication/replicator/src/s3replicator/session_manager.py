@@ -17,8 +17,14 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
+import aiohttp
+import asyncio
 import logging
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
 from s3replicationcommon.s3_session import S3Session
+from s3replicationcommon.transport_profile import TransportProfile
 
 _logger = logging.getLogger('s3replicator')
 
@@ -26,33 +32,314 @@ _logger = logging.getLogger('s3replicator')
 # access key to uniquely identify each session for an IAM account/user.
 
 
+class SiteTransport:
+    """Connection pool to an S3 site, shared by sessions of all accounts."""
+
+    def __init__(self, endpoint, transport_profile, max_connections):
+        """Initialise."""
+        self.endpoint = endpoint
+        self.netloc = urlparse(endpoint).netloc
+        self.max_connections = max_connections
+        self.client_session = aiohttp.ClientSession(
+            connector=transport_profile.create_connector(max_connections),
+            timeout=transport_profile.create_timeout())
+        # Count of sessions using the pool.
+        self.sessions_count = 0
+        self.last_used_time = time.monotonic()
+        # Pool is kept open without sessions, e.g. to keep connections warm.
+        self.keep_open = False
+
+
+class SessionEntry:
+    """Cached session with count of its users."""
+
+    def __init__(self, session, transport):
+        """Initialise."""
+        self.session = session
+        self.transport = transport
+        self.refs_count = 0
+        self.last_used_time = time.monotonic()
+
+
+class SessionManager:
+    """Cache of S3 sessions, one per site and access key.
+
+    Sessions hold credentials and sign requests. Connections are held by
+    one SiteTransport per site netloc, shared by sessions of all accounts
+    to the site. Sessions not in use are evicted in LRU order when more
+    than max_sessions are cached, and when idle for idle_timeout_secs.
+    Site transport is closed along with last session using it, unless
+    it is kept open using keep_site_open().
+    Connection limits of all site transports together are kept within
+    max_total_connections, idle sessions are evicted to make room for a
+    new site, else it gets the connections left (atleast one).
+    """
+
+    def __init__(self, max_sessions, idle_timeout_secs,
+                 max_total_connections, get_transport_profile,
+                 retry_engine=None, hash_executor=None, rate_limits=None):
+        """Initialise.
+
+        Args:
+            get_transport_profile (function): Returns TransportProfile for
+            site netloc, None if site has no profile.
+            retry_engine (RetryEngine): Used by sessions for retries.
+            hash_executor (HashExecutor): Used by sessions for hashing.
+            rate_limits (SiteRateLimits): Rate limits of sites.
+        """
+        self._max_sessions = max_sessions
+        self._idle_timeout_secs = idle_timeout_secs
+        self._max_total_connections = max_total_connections
+        self._get_transport_profile = get_transport_profile
+        self._retry_engine = retry_engine
+        self._hash_executor = hash_executor
+        self._rate_limits = rate_limits
+
+        # {"s3.seagate.com|access_key": SessionEntry} in LRU order.
+        self._entries = OrderedDict()
+        # {"s3.seagate.com": SiteTransport}
+        self._transports = {}
+
+        # Statistics.
+        self._hits_count = 0
+        self._misses_count = 0
+        self._evictions_count = 0
+        self._limited_transports_count = 0
+
+    @staticmethod
+    def _session_key(netloc, access_key):
+        # example "s3.seagate.com|someaccesskey"
+        return netloc + "|" + access_key
+
+    def _connections_limit_total(self):
+        return sum(transport.max_connections
+                   for transport in self._transports.values())
+
+    def _get_transport(self, endpoint, max_connections):
+        netloc = urlparse(endpoint).netloc
+        transport = self._transports.get(netloc, None)
+        if transport is not None:
+            return transport
+
+        transport_profile = self._get_transport_profile(netloc)
+        if transport_profile is None:
+            transport_profile = TransportProfile("default", max_connections)
+        wanted_connections = transport_profile.max_connections
+        if self._connections_limit_total() + wanted_connections > \
+                self._max_total_connections:
+            self._evict_idle_transports(wanted_connections)
+        available_connections = \
+            self._max_total_connections - self._connections_limit_total()
+        if available_connections < wanted_connections:
+            self._limited_transports_count += 1
+            _logger.warning(
+                "Connections for site {} limited to {} of {}, "
+                "max_total_connections {} reached.".format(
+                    netloc, max(1, available_connections),
+                    wanted_connections, self._max_total_connections))
+            wanted_connections = max(1, available_connections)
+
+        _logger.debug("Creating connection pool of {} for site {}".format(
+            wanted_connections, netloc))
+        transport = SiteTransport(endpoint, transport_profile,
+                                  wanted_connections)
+        self._transports[netloc] = transport
+        return transport
+
+    def get_session(self, s3_site, access_key, secret_key, max_connections):
+        """Returns session for site and access key, creates if missing.
+
+        Session is in use till release_session() is called. Connections
+        are set up as per transport profile of site, max_connections is
+        used when site has no profile.
+        """
+        session_key = self._session_key(s3_site.get_netloc(), access_key)
+        entry = self._entries.get(session_key, None)
+        if entry is None:
+            self._misses_count += 1
+            _logger.debug("Creating new session for session_key {}".
+                          format(session_key))
+            transport_profile = self._get_transport_profile(
+                s3_site.get_netloc())
+            transport = self._get_transport(s3_site.endpoint,
+                                            max_connections)
+            rate_limiter = None
+            if self._rate_limits is not None:
+                rate_limiter = self._rate_limits.get_site_limiter(
+                    s3_site.get_netloc())
+            session = S3Session(
+                _logger,
+                s3_site,
+                access_key,
+                secret_key,
+                max_connections,
+                self._retry_engine,
+                transport_profile,
+                transport.client_session,
+                self._hash_executor,
+                rate_limiter)
+            entry = SessionEntry(session, transport)
+            entry.refs_count += 1
+            transport.sessions_count += 1
+            # Cache it
+            self._entries[session_key] = entry
+            self._evict_lru()
+        else:
+            self._hits_count += 1
+            _logger.debug("Reusing session for session_key {}".
+                          format(session_key))
+            self._entries.move_to_end(session_key)
+            entry.refs_count += 1
+            entry.last_used_time = time.monotonic()
+
+        entry.transport.last_used_time = entry.last_used_time
+        return entry.session
+
+    def find_session(self, netloc, access_key):
+        """Returns cached session for site and access key, None if not
+        present. Session is in use till release_session() is called.
+        """
+        entry = self._entries.get(self._session_key(netloc, access_key),
+                                  None)
+        if entry is None:
+            return None
+        entry.refs_count += 1
+        entry.last_used_time = time.monotonic()
+        return entry.session
+
+    def release_session(self, session):
+        """Marks session returned by get_session() no longer in use."""
+        session_key = self._session_key(
+            urlparse(session.endpoint).netloc, session.access_key)
+        entry = self._entries.get(session_key, None)
+        if entry is None or entry.session is not session:
+            return
+        entry.refs_count -= 1
+        entry.last_used_time = time.monotonic()
+        entry.transport.last_used_time = entry.last_used_time
+
+    def get_site_transports(self):
+        """Returns list of SiteTransport of sites with open pools."""
+        return list(self._transports.values())
+
+    def keep_site_open(self, endpoint, max_connections):
+        """Opens connection pool to site if not open, and keeps it open
+        without sessions till release_site().
+
+        Args:
+            max_connections (int): Used when site has no transport profile.
+
+        Returns:
+            SiteTransport: Site connection pool.
+        """
+        transport = self._get_transport(endpoint, max_connections)
+        transport.keep_open = True
+        return transport
+
+    def release_site(self, netloc):
+        """Closes site connection pool kept open, once sessions using it
+        are evicted.
+        """
+        transport = self._transports.get(netloc, None)
+        if transport is None:
+            return
+        transport.keep_open = False
+        if transport.sessions_count == 0:
+            self._close_transport(transport)
+
+    def _close_transport(self, transport):
+        _logger.debug("Closing connection pool for site {}".format(
+            transport.netloc))
+        del self._transports[transport.netloc]
+        asyncio.ensure_future(transport.client_session.close())
+
+    def _evict(self, session_key):
+        entry = self._entries.pop(session_key)
+        self._evictions_count += 1
+        _logger.debug("Evicting session for session_key {}".format(
+            session_key))
+        transport = entry.transport
+        transport.sessions_count -= 1
+        if transport.sessions_count == 0 and not transport.keep_open:
+            self._close_transport(transport)
+
+    def _evict_lru(self):
+        """Evicts least recently used sessions not in use, till within
+        max_sessions.
+        """
+        for session_key in list(self._entries.keys()):
+            if len(self._entries) <= self._max_sessions:
+                break
+            if self._entries[session_key].refs_count == 0:
+                self._evict(session_key)
+
+    def _evict_idle_transports(self, connections_count):
+        """Evicts sessions not in use in LRU order, till connections_count
+        connections are available within max_total_connections.
+        """
+        for session_key in list(self._entries.keys()):
+            if self._connections_limit_total() + connections_count <= \
+                    self._max_total_connections:
+                break
+            if self._entries[session_key].refs_count == 0:
+                self._evict(session_key)
+
+    def evict_idle_sessions(self):
+        """Evicts sessions not used for idle_timeout_secs."""
+        now = time.monotonic()
+        for session_key, entry in list(self._entries.items()):
+            if entry.refs_count == 0 and \
+                    now - entry.last_used_time > self._idle_timeout_secs:
+                self._evict(session_key)
+
+    async def close(self):
+        """Closes all sessions and connection pools."""
+        for session_key, entry in self._entries.items():
+            _logger.debug("Closing session for session_key {}".format(
+                session_key))
+            await entry.session.close()
+        for transport in self._transports.values():
+            await transport.client_session.close()
+        self._entries.clear()
+        self._transports.clear()
+
+    def get_stats(self):
+        """Returns cache occupancy and hit/miss statistics."""
+        return {
+            "sessions_count": len(self._entries),
+            "sessions_in_use_count": sum(
+                1 for entry in self._entries.values()
+                if entry.refs_count > 0),
+            "max_sessions": self._max_sessions,
+            "sites_count": len(self._transports),
+            "connections_limit_total": self._connections_limit_total(),
+            "max_total_connections": self._max_total_connections,
+            "hits_count": self._hits_count,
+            "misses_count": self._misses_count,
+            "evictions_count": self._evictions_count,
+            "limited_sites_count": self._limited_transports_count
+        }
+
+
 def get_session(app, s3_site, access_key, secret_key, max_connections):
+    """Returns session for site and access key, release_session() once
+    done.
+    """
+    return app["sessions"].get_session(
+        s3_site, access_key, secret_key, max_connections)
+
 
-    # example "s3.seagate.com|someaccesskey"
-    session_key = s3_site.get_netloc() + "|" + access_key
+def find_session(app, netloc, access_key):
+    """Returns cached session for site and access key, None if not present.
 
-    session = app["sessions"].get(session_key, None)
-    if session is None:
-        _logger.debug("Creating new session for session_key {}".
-                      format(session_key))
-        # Create New session
-        session = S3Session(
-            _logger,
-            s3_site,
-            access_key,
-            secret_key,
-            max_connections)
+    release_session() once done.
+    """
+    return app["sessions"].find_session(netloc, access_key)
 
-        # Cache it
-        app["sessions"][session_key] = session
-    else:
-        _logger.debug("Reusing session for session_key {}".
-                      format(session_key))
 
-    return app["sessions"][session_key]
+def release_session(app, session):
+    app["sessions"].release_session(session)
 
 
 async def close_all_sessions(app):
-    for session_key, session in app["sessions"].items():
-        _logger.debug("Closing session for session_key {}".format(session_key))
-        await session.close()
+    await app["sessions"].close()
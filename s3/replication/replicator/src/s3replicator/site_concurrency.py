@@ -0,0 +1,240 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import logging
+from collections import deque
+
+_logger = logging.getLogger('s3replicator')
+
+
+class SiteSlots:
+    """Replications running with a site in one role, source or target.
+
+    Slots are granted in FIFO order, priority requests before others.
+    Limit of 0 is no limit.
+    """
+
+    def __init__(self, netloc, limit):
+        """Initialise."""
+        self.netloc = netloc
+        self._limit = limit
+        self._running_count = 0
+        # Pending requests in arrival order.
+        self._waiters = deque()
+        self._priority_waiters = deque()
+
+        # Statistics.
+        self._granted_count = 0
+        self._waited_count = 0
+
+    def _has_free_slot(self):
+        return self._limit == 0 or self._running_count < self._limit
+
+    def _grant(self):
+        self._running_count += 1
+        self._granted_count += 1
+
+    def _wakeup_waiters(self):
+        for waiters in (self._priority_waiters, self._waiters):
+            while waiters and self._has_free_slot():
+                waiter = waiters.popleft()
+                if waiter.done():
+                    # Cancelled while waiting.
+                    continue
+                self._grant()
+                waiter.set_result(True)
+
+    def try_acquire(self, priority=False):
+        """Takes a slot if free, returns False if not."""
+        if self._priority_waiters or (self._waiters and not priority) or \
+                not self._has_free_slot():
+            return False
+        self._grant()
+        return True
+
+    async def acquire(self, priority=False):
+        """Waits for a free slot."""
+        if self.try_acquire(priority):
+            return
+
+        _logger.debug("Waiting for slot of site {}, {} of {} running".format(
+            self.netloc, self._running_count, self._limit))
+        waiter = asyncio.get_event_loop().create_future()
+        if priority:
+            self._priority_waiters.append(waiter)
+        else:
+            self._waiters.append(waiter)
+        self._waited_count += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancel, give it back.
+                self.release()
+            raise
+
+    def release(self):
+        self._running_count -= 1
+        assert self._running_count >= 0, "Bug: Released more than granted."
+        self._wakeup_waiters()
+
+    def get_stats(self):
+        return {
+            "limit": self._limit,
+            "running_count": self._running_count,
+            "waiting_count": sum(
+                1 for waiters in (self._priority_waiters, self._waiters)
+                for waiter in waiters if not waiter.done()),
+            "granted_count": self._granted_count,
+            "waited_count": self._waited_count
+        }
+
+
+class SiteConcurrencyLimits:
+    """Limits on replications running per source site and per target site.
+
+    A replication holds a slot of its source site and of its target
+    site while it runs, on top of a slot of the global TransferScheduler.
+    Large replications take site slots first, so ones queued behind a
+    slow site do not hold global slots needed by other sites. Small
+    replications take global slot first, so they can preempt large ones,
+    and are granted site slots before large ones. See PausableSiteSlots.
+    """
+
+    SOURCE = "source"
+    TARGET = "target"
+
+    def __init__(self, max_per_source_site=0, max_per_target_site=0,
+                 site_limits=None):
+        """Initialise, limit of 0 is no limit.
+
+        Args:
+            site_limits (dict): {netloc: {"source": limit, "target": limit}},
+            overrides per site max_per_source_site and max_per_target_site.
+        """
+        self._default_limits = {
+            SiteConcurrencyLimits.SOURCE: max_per_source_site,
+            SiteConcurrencyLimits.TARGET: max_per_target_site
+        }
+        self._site_limits = site_limits or {}
+        # {role: {netloc: SiteSlots}}
+        self._slots = {SiteConcurrencyLimits.SOURCE: {},
+                       SiteConcurrencyLimits.TARGET: {}}
+
+    def _get_slots(self, role, netloc):
+        site_slots = self._slots[role].get(netloc, None)
+        if site_slots is None:
+            limit = self._site_limits.get(netloc, {}).get(
+                role, self._default_limits[role])
+            site_slots = SiteSlots(netloc, limit)
+            self._slots[role][netloc] = site_slots
+        return site_slots
+
+    async def acquire(self, source_netloc, target_netloc, priority=False):
+        """Waits for slots of source site and target site.
+
+        Args:
+            priority (bool): Granted before requests without priority.
+
+        Returns:
+            tuple: Slots held, to be passed to release().
+        """
+        source_slots = self._get_slots(SiteConcurrencyLimits.SOURCE,
+                                       source_netloc)
+        target_slots = self._get_slots(SiteConcurrencyLimits.TARGET,
+                                       target_netloc)
+        # Slot of one site is not held while waiting on other, else
+        # replications waiting on a slow target would hold slots of their
+        # source needed by replications to other targets.
+        first_slots, second_slots = source_slots, target_slots
+        while True:
+            await first_slots.acquire(priority)
+            if second_slots.try_acquire(priority):
+                return (source_slots, target_slots)
+            first_slots.release()
+            first_slots, second_slots = second_slots, first_slots
+
+    def release(self, held_slots):
+        """Releases slots returned by acquire()."""
+        for site_slots in held_slots:
+            site_slots.release()
+
+    def get_stats(self):
+        """Returns slot usage and queue depth per site and role."""
+        return {
+            role: {netloc: site_slots.get_stats()
+                   for netloc, site_slots in slots.items()}
+            for role, slots in self._slots.items()
+        }
+
+
+class PausableSiteSlots:
+    """Site slots of a transfer that can be paused by TransferScheduler.
+
+    Passed to scheduler in place of transfer. Slots are given up while
+    transfer is paused, so transfers with same sites, e.g. small ones it
+    was paused for, can run meanwhile, and taken again before transfer
+    is resumed.
+    """
+
+    def __init__(self, site_concurrency, source_netloc, target_netloc,
+                 transfer=None, priority=False):
+        """Initialise.
+
+        Args:
+            transfer: Object with pause() and resume(), None if not
+            pausable.
+            priority (bool): Slots are granted before requests without
+            priority, e.g. for small transfers.
+        """
+        self._site_concurrency = site_concurrency
+        self._source_netloc = source_netloc
+        self._target_netloc = target_netloc
+        self._transfer = transfer
+        self._priority = priority
+        self._held_slots = None
+        self._resume_task = None
+
+    async def acquire(self):
+        """Waits for site slots, if not held."""
+        if self._held_slots is None:
+            self._held_slots = await self._site_concurrency.acquire(
+                self._source_netloc, self._target_netloc, self._priority)
+
+    def release(self):
+        """Releases site slots if held, once transfer is done."""
+        if self._resume_task is not None:
+            self._resume_task.cancel()
+            self._resume_task = None
+        if self._held_slots is not None:
+            self._site_concurrency.release(self._held_slots)
+            self._held_slots = None
+
+    def pause(self):
+        self._transfer.pause()
+        self.release()
+
+    def resume(self):
+        self._resume_task = asyncio.ensure_future(self._acquire_and_resume())
+
+    async def _acquire_and_resume(self):
+        await self.acquire()
+        self._resume_task = None
+        self._transfer.resume()
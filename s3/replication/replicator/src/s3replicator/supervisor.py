@@ -0,0 +1,344 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import asyncio
+import functools
+import os
+import signal
+import socket
+import sys
+from aiohttp import web
+import logging
+from .config import Config
+from s3replicationcommon.log import setup_logger
+from s3replicationcommon.s3_common import make_baseurl
+
+_logger = logging.getLogger('s3replicator')
+
+# Route table declaration
+routes = web.RouteTableDef()
+
+# Stats that are not summed across workers.
+_NON_ADDITIVE_STATS = frozenset(["slab_size", "max_wait_time_ms"])
+
+# Interval to check for exited workers and start them again.
+_WORKER_CHECK_INTERVAL_SECS = 5
+
+
+def bind_socket(host, port, reuse_port=False):
+    """Returns listening TCP socket bound to host and port.
+
+    Args:
+        reuse_port (bool): Set SO_REUSEPORT, so other processes can bind
+        same port and kernel spreads connections across them.
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(socket.SOMAXCONN)
+    sock.set_inheritable(True)
+    return sock
+
+
+def sum_stats(total, stats):
+    """Adds numeric values of stats dictionary into total, recursively.
+
+    Lists, e.g. per site pair values, are specific to a worker and not
+    summed.
+    """
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            sum_stats(total.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and \
+                not isinstance(value, bool) and \
+                key not in _NON_ADDITIVE_STATS:
+            total[key] = total.get(key, 0) + value
+
+
+class Worker:
+    """Replicator worker process."""
+
+    def __init__(self, index, pid, control_endpoint):
+        """Initialise."""
+        self.index = index
+        self.pid = pid
+        # Worker only endpoint to query worker stats, also its subscriber
+        # endpoint.
+        self.control_endpoint = control_endpoint
+        self.exit_status = None
+
+    def is_alive(self):
+        """Returns False once worker process has exited."""
+        if self.exit_status is None:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid != 0:
+                self.exit_status = status
+                _logger.error("Worker {} pid {} exited with status {}".format(
+                    self.index, self.pid, status))
+        return self.exit_status is None
+
+    def get_dictionary(self):
+        return {
+            "index": self.index,
+            "pid": self.pid,
+            "alive": self.is_alive()
+        }
+
+
+async def get_worker_stats(app, worker):
+    """Returns stats of worker, None if worker did not respond."""
+    if not worker.is_alive():
+        return None
+    try:
+        async with app['client_session'].get(
+                worker.control_endpoint + "/stats") as resp:
+            if resp.status == 200:
+                return await resp.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _logger.warning("Failed to get stats of worker {}: {}".format(
+            worker.index, str(e)))
+    return None
+
+
+@routes.get('/health')  # noqa: E302
+async def get_health(request):
+    """Get health of workers, 503 if any worker is not serving."""
+    _logger.debug('API: GET /health')
+    workers = request.app['workers']
+    all_stats = await asyncio.gather(
+        *[get_worker_stats(request.app, worker) for worker in workers])
+    health = []
+    for worker, stats in zip(workers, all_stats):
+        worker_health = worker.get_dictionary()
+        worker_health["healthy"] = stats is not None
+        health.append(worker_health)
+    healthy_count = sum(1 for stats in all_stats if stats is not None)
+    status = 200 if healthy_count == len(workers) else 503
+    return web.json_response(
+        {"healthy_count": healthy_count, "workers": health}, status=status)
+
+
+@routes.get('/stats')  # noqa: E302
+async def get_stats(request):
+    """Get stats of workers and their totals."""
+    _logger.debug('API: GET /stats')
+    workers = request.app['workers']
+    all_stats = await asyncio.gather(
+        *[get_worker_stats(request.app, worker) for worker in workers])
+    total = {}
+    workers_stats = []
+    for worker, stats in zip(workers, all_stats):
+        worker_stats = worker.get_dictionary()
+        worker_stats["stats"] = stats
+        workers_stats.append(worker_stats)
+        if stats is not None:
+            sum_stats(total, stats)
+    return web.json_response(
+        {"total": total, "workers": workers_stats}, status=200)
+
+
+@routes.get('/rate-limits')  # noqa: E302
+async def list_rate_limits(request):
+    """Get allowed and observed rates per site, across workers."""
+    _logger.debug('API: GET /rate-limits')
+    all_stats = await asyncio.gather(
+        *[get_worker_stats(request.app, worker)
+          for worker in request.app['workers']])
+    total = {}
+    for stats in all_stats:
+        if stats is not None:
+            sum_stats(total, stats["rate_limits"])
+    return web.json_response(total, status=200)
+
+
+async def apply_rate_limits(app, site, limits):
+    """Splits rate limits of site across live workers.
+
+    Returns:
+        int: 200 if all live workers applied their share, else failed
+        status.
+    """
+    workers = [worker for worker in app['workers'] if worker.is_alive()]
+    if not workers:
+        return 503
+    worker_limits = {limit: value / len(workers)
+                     for limit, value in limits.items()}
+    status = 200
+    for worker in workers:
+        try:
+            async with app['client_session'].put(
+                    worker.control_endpoint + "/rate-limits/" + site,
+                    json=worker_limits) as resp:
+                if resp.status != 200:
+                    status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _logger.error("Failed to set rate limits of worker {}: {}".format(
+                worker.index, str(e)))
+            status = 503
+    return status
+
+
+@routes.put('/rate-limits/{site}')  # noqa: E302
+async def set_rate_limits(request):
+    """Change rate limits of site, split across live workers."""
+    site = request.match_info['site']
+    _logger.debug('API: PUT /rate-limits/{}'.format(site))
+    try:
+        limits = await request.json()
+        valid = all(isinstance(value, (int, float))
+                    for value in limits.values())
+    except (ValueError, AttributeError):
+        valid = False
+    if not valid:
+        return web.json_response(
+            {'ErrorResponse': 'Invalid rate limits'}, status=400)
+
+    # Kept to split again when set of live workers changes.
+    request.app['rate_limits'][site] = limits
+    status = await apply_rate_limits(request.app, site, limits)
+    return web.json_response({site: limits}, status=status)
+
+
+async def monitor_workers(app):
+    """Starts exited workers again.
+
+    Rate limits set through supervisor are split again across live
+    workers, retried until the started worker serves them.
+    """
+    workers = app['workers']
+    split_pending = False
+    while True:
+        await asyncio.sleep(_WORKER_CHECK_INTERVAL_SECS)
+        if split_pending:
+            statuses = [
+                await apply_rate_limits(app, site, limits)
+                for site, limits in app['rate_limits'].items()]
+            split_pending = any(status != 200 for status in statuses)
+        for position, worker in enumerate(workers):
+            if not worker.is_alive():
+                _logger.info("Restarting worker {}".format(worker.index))
+                workers[position] = app['start_worker'](worker.index)
+                split_pending = True
+
+
+async def on_startup(app):
+    app['client_session'] = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=5))
+    app['worker_monitor'] = asyncio.ensure_future(monitor_workers(app))
+
+
+async def on_shutdown(app):
+    _logger.debug("Stopping workers...")
+    app['worker_monitor'].cancel()
+    for worker in app['workers']:
+        if worker.is_alive():
+            os.kill(worker.pid, signal.SIGTERM)
+    for worker in app['workers']:
+        if worker.exit_status is None:
+            _, worker.exit_status = os.waitpid(worker.pid, 0)
+    if app['worker_socket'] is not None:
+        app['worker_socket'].close()
+    await app['client_session'].close()
+
+
+class ReplicatorSupervisor:
+    """Runs replicator as worker processes sharing replicator port.
+
+    Each worker runs its own event loop, so signing, hashing and json
+    work is spread across cores. Workers bind replicator port with
+    SO_REUSEPORT, or share a socket bound by supervisor before fork, and
+    kernel spreads incoming connections across them. Each worker
+    subscribes to replication manager for its share of max_replications
+    with its own endpoint on worker_base_port + index, so that jobs are
+    posted to and queried from the worker that runs them. Supervisor
+    serves health and stats of workers on supervisor_port and starts
+    exited workers again.
+    """
+
+    def __init__(self, config_file, log_config_file):
+        """Initialise logger and configuration."""
+        self._config_file = config_file
+        self._log_config_file = log_config_file
+        self._config = Config(config_file)
+        if self._config.load() is None:
+            print("Failed to load configuration.\n")
+            sys.exit(-1)
+
+        # Setup logging.
+        self._logger = setup_logger('s3replicator', log_config_file)
+        if self._logger is None:
+            print("Failed to configure logging.\n")
+            sys.exit(-1)
+
+        self._config.print_with(self._logger)
+
+    def _start_worker(self, index, sock):
+        pid = os.fork()
+        if pid == 0:
+            # Worker process, started again from within supervisor loop
+            # when a worker exits. Do not share its loop or signal wakeup.
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            asyncio.set_event_loop(asyncio.new_event_loop())
+            from .app import ReplicatorApp
+            exit_code = 0
+            try:
+                ReplicatorApp(self._config_file, self._log_config_file,
+                              index, sock).run()
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                _logger.exception("Worker {} failed".format(index))
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        _logger.info("Started worker {} pid {}".format(index, pid))
+        control_endpoint = make_baseurl(
+            "http", self._config.host, self._config.get_worker_port(index))
+        return Worker(index, pid, control_endpoint)
+
+    def run(self):
+        """Start workers and supervisor."""
+        sock = None
+        if not self._config.workers_reuse_port:
+            # Workers accept connections on socket inherited across fork.
+            sock = bind_socket(self._config.host, self._config.port)
+
+        workers = [self._start_worker(index, sock)
+                   for index in range(self._config.workers_count)]
+
+        app = web.Application()
+        app['config'] = self._config
+        app['workers'] = workers
+        # Shared socket is kept open for workers started again.
+        app['worker_socket'] = sock
+        app['start_worker'] = functools.partial(self._start_worker, sock=sock)
+        app['rate_limits'] = {}
+        app.add_routes(routes)
+        app.on_startup.append(on_startup)
+        app.on_shutdown.append(on_shutdown)
+
+        web.run_app(app, host=self._config.host,
+                    port=self._config.supervisor_port)
@@ -0,0 +1,131 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+_logger = logging.getLogger('s3replicator')
+
+
+class TransferBudget:
+    """Process wide budget for bytes held in transfer buffers.
+
+    Each replication reserves bytes for its buffers before transfer
+    starts and releases them once done. When budget is exhausted,
+    reservations wait and are granted in FIFO order, so a large
+    reservation is not starved by a stream of smaller ones.
+    """
+
+    def __init__(self, total_bytes):
+        """Initialise budget of total_bytes."""
+        self._total_bytes = total_bytes
+        self._used_bytes = 0
+
+        # Pending reservations in arrival order, (nbytes, future).
+        self._waiters = deque()
+
+        # Statistics.
+        self._max_used_bytes = 0
+        self._reservations_count = 0
+        self._waited_count = 0
+        self._total_wait_time_ms = 0
+
+    def get_total_bytes(self):
+        """Returns total bytes in budget."""
+        return self._total_bytes
+
+    def get_used_bytes(self):
+        """Returns bytes currently reserved."""
+        return self._used_bytes
+
+    def _grant(self, nbytes):
+        self._used_bytes += nbytes
+        self._reservations_count += 1
+        self._max_used_bytes = max(self._max_used_bytes, self._used_bytes)
+
+    def _wakeup_waiters(self):
+        """Grant pending reservations in FIFO order while budget allows."""
+        while self._waiters:
+            nbytes, waiter = self._waiters[0]
+            if waiter.done():
+                # Cancelled while waiting.
+                self._waiters.popleft()
+                continue
+            if self._used_bytes + nbytes > self._total_bytes:
+                break
+            self._waiters.popleft()
+            self._grant(nbytes)
+            waiter.set_result(nbytes)
+
+    async def reserve(self, nbytes):
+        """Reserve bytes, waits until enough bytes are available.
+
+        Args:
+            nbytes (int): Bytes required. A request larger than the budget
+            is reduced to total budget, so it can run when alone.
+
+        Returns:
+            int: Bytes reserved, to be passed to release().
+        """
+        nbytes = min(nbytes, self._total_bytes)
+        if not self._waiters and \
+                self._used_bytes + nbytes <= self._total_bytes:
+            self._grant(nbytes)
+            return nbytes
+
+        _logger.debug("Waiting to reserve {} bytes, used {} of {}".format(
+            nbytes, self._used_bytes, self._total_bytes))
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append((nbytes, waiter))
+        self._waited_count += 1
+        start_time = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancel, give it back.
+                self.release(nbytes)
+            else:
+                # Reservations queued behind may fit now.
+                self._wakeup_waiters()
+            raise
+        finally:
+            self._total_wait_time_ms += int(
+                round((time.perf_counter() - start_time) * 1000))
+        return nbytes
+
+    def release(self, nbytes):
+        """Release bytes reserved earlier using reserve()."""
+        self._used_bytes -= nbytes
+        assert self._used_bytes >= 0, "Bug: Released more than reserved."
+        self._wakeup_waiters()
+
+    def get_stats(self):
+        """Returns budget usage statistics as dictionary."""
+        return {
+            "total_bytes": self._total_bytes,
+            "used_bytes": self._used_bytes,
+            "max_used_bytes": self._max_used_bytes,
+            "waiting_count": len(self._waiters),
+            "reservations_count": self._reservations_count,
+            "waited_count": self._waited_count,
+            "total_wait_time_ms": self._total_wait_time_ms
+        }
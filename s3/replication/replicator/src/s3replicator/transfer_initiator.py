@@ -20,8 +20,14 @@
 import logging
 from s3replicationcommon.job import ReplicationJobType
 from s3replicationcommon.job import JobEvents
+from s3replicationcommon.s3_common import S3RequestState
+from .object_copier import ObjectCopier
 from .object_replicator import ObjectReplicator
+from .object_tags_replicator import ObjectTagsReplicator
+from .site_concurrency import PausableSiteSlots
 from .session_manager import get_session
+from .session_manager import release_session
+from .transfer_scheduler import TransferLane
 
 _logger = logging.getLogger('s3replicator')
 
@@ -88,20 +94,136 @@ class TransferInitiator:
             job.get_target_secret_key(),
             app_config.max_connections_per_s3_session)
 
-        if operation_type == ReplicationJobType.OBJECT_REPLICATION:
+        try:
+            await TransferInitiator._start(
+                job, app, operation_type, source_session, target_session)
+        finally:
+            release_session(app, source_session)
+            release_session(app, target_session)
+
+    async def _run(job, app, transfer, pausable_transfer=None):
+        """Starts transfer once granted slots of its source and target
+        sites and a scheduler slot.
+
+        Small transfers take scheduler slot first, so they can preempt
+        large ones. Paused transfer gives up its site slots till resumed.
+        """
+        scheduler = app['scheduler']
+        object_size = int(job.get_source_object_size())
+        small = scheduler.get_lane(object_size) == TransferLane.SMALL
+        site_slots = PausableSiteSlots(
+            app['site_concurrency'],
+            job.get_source_endpoint_netloc(),
+            job.get_target_endpoint_netloc(),
+            pausable_transfer, priority=small)
+        try:
+            if not small:
+                await site_slots.acquire()
+            slot = await scheduler.acquire(
+                object_size,
+                site_slots if pausable_transfer is not None else None)
+            try:
+                if small:
+                    await site_slots.acquire()
+                await transfer.start()
+            finally:
+                scheduler.release(slot)
+        finally:
+            site_slots.release()
+
+    async def _start(job, app, operation_type, source_session,
+                     target_session):
+        app_config = app["config"]
+
+        # Source and target on same endpoint and account, target can read
+        # the source object, so S3 server can copy data.
+        server_side_copy = app_config.server_side_copy_enabled and \
+            job.get_source_endpoint_netloc() == \
+            job.get_target_endpoint_netloc() and \
+            job.get_source_access_key() == job.get_target_access_key()
+
+        if operation_type == ReplicationJobType.OBJECT_REPLICATION and \
+                server_side_copy:
+            object_copier = ObjectCopier(
+                job, target_session,
+                app_config.multipart_threshold_bytes,
+                app_config.multipart_part_size_bytes,
+                app_config.multipart_concurrency)
+            object_copier.setup_observers(
+                "all_events", TranferEventHandler(app))
+
+            job.set_replicator(object_copier)
+            job.mark_started()
+
+            # Start the replication, data is copied by S3 server so copy
+            # is not paused for small objects.
+            await TransferInitiator._run(job, app, object_copier)
+        elif operation_type == ReplicationJobType.OBJECT_REPLICATION:
+            chunk_size_tuner = app['chunk_size_tuner']
+            transfer_chunk_size_bytes = chunk_size_tuner.get_chunk_size(
+                job.get_source_endpoint_netloc(),
+                job.get_target_endpoint_netloc(),
+                app_config.get_initial_chunk_size(
+                    job.get_source_endpoint_netloc(),
+                    job.get_target_endpoint_netloc()))
+
             object_replicator = ObjectReplicator(
-                job, app["config"].transfer_chunk_size_bytes,
-                source_session, target_session)
+                job, transfer_chunk_size_bytes,
+                source_session, target_session,
+                app_config.multipart_threshold_bytes,
+                app_config.multipart_part_size_bytes,
+                app_config.multipart_concurrency,
+                app_config.range_read_stripe_size_bytes,
+                app_config.range_read_max_stripes,
+                app['transfer_budget'],
+                app['buffer_pool'],
+                app['small_object_buffer_pool'],
+                app['checkpoint_journal'],
+                app['retry_engine'])
             object_replicator.setup_observers(
                 "all_events", TranferEventHandler(app))
 
             job.set_replicator(object_replicator)
             job.mark_started()
 
+            if app_config.preflight_check_enabled and \
+                    await object_replicator.skip_if_replicated():
+                # Target already has object, e.g. replayed job.
+                return
+
             # Start the replication.
-            semaphore = app['semaphore']
-            async with semaphore:
-                await object_replicator.start()
+            await TransferInitiator._run(job, app, object_replicator,
+                                         object_replicator)
+
+            # Only transfers whose throughput depends on chunk size, timed
+            # without pauses, retries and waits for budget.
+            chunk_transfer_time_ms = \
+                object_replicator.get_chunk_transfer_time()
+            if object_replicator.get_state() == S3RequestState.COMPLETED and \
+                    chunk_transfer_time_ms is not None:
+                chunk_size_tuner.record_transfer(
+                    job.get_source_endpoint_netloc(),
+                    job.get_target_endpoint_netloc(),
+                    transfer_chunk_size_bytes,
+                    int(job.get_source_object_size()),
+                    chunk_transfer_time_ms)
+        elif operation_type == ReplicationJobType.OBJECT_TAGS_REPLICATION:
+            object_tags_replicator = ObjectTagsReplicator(
+                job, source_session, target_session)
+            object_tags_replicator.setup_observers(
+                "all_events", TranferEventHandler(app))
+
+            job.set_replicator(object_tags_replicator)
+            job.mark_started()
+
+            # Start the replication, only tags are read and written so it
+            # runs in metadata lane and not limited per site.
+            scheduler = app['scheduler']
+            slot = await scheduler.acquire(0, lane=TransferLane.METADATA)
+            try:
+                await object_tags_replicator.start()
+            finally:
+                scheduler.release(slot)
         else:
             _logger.error(
                 "Operation type [{}] not supported.".format(operation_type))
@@ -0,0 +1,307 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+_logger = logging.getLogger('s3replicator')
+
+
+class TransferLane:
+    """Scheduling lanes, by object size."""
+    SMALL = "small"
+    LARGE = "large"
+    # Replication of object metadata, e.g. tags, without object data.
+    METADATA = "metadata"
+
+
+class ScheduledTransfer:
+    """Slot granted to a transfer by TransferScheduler."""
+
+    def __init__(self, lane, transfer):
+        """Initialise."""
+        self.lane = lane
+        # Object with pause() and resume(), None if not pausable.
+        self.transfer = transfer
+        self.paused = False
+        self.pause_start_time = None
+        self.paused_secs = 0.0
+        # Resumes transfer once paused for max_pause_secs.
+        self.pause_timer = None
+
+
+class TransferScheduler:
+    """Schedules replications on max_slots slots in two lanes.
+
+    Objects upto small_max_bytes are in small lane, rest in large lane.
+    Large transfers run on atmost max_slots - reserved_small_slots slots,
+    so a few large objects cannot hold all slots. Small transfers can
+    use any free slot and are granted before large ones.
+
+    When preemption is enabled and a small transfer finds no free slot,
+    most recently started large transfer is paused at its next chunk
+    boundary and its slot is given to the small transfer. Paused
+    transfers are resumed, oldest first, once no small transfers are
+    waiting. Atleast min_running_large large transfers are never paused,
+    so large objects keep moving under a steady stream of small ones,
+    and a transfer is paused for atmost max_pause_secs in all, so it is
+    not starved. Paused transfer drops its source connection and its
+    transfer budget, both are taken again on resume.
+
+    Metadata replications, e.g. of tags, move no object data and run on
+    their own metadata_slots, so they neither wait behind data transfers
+    nor take their slots.
+    """
+
+    def __init__(self, max_slots, small_max_bytes, reserved_small_slots=0,
+                 preemption_enabled=False, min_running_large=1,
+                 max_pause_secs=30, metadata_slots=100):
+        """Initialise."""
+        self._max_slots = max_slots
+        self._small_max_bytes = small_max_bytes
+        # Large lane keeps atleast one slot.
+        self._max_large_slots = max(1, max_slots - reserved_small_slots)
+        self._preemption_enabled = preemption_enabled
+        self._min_running_large = max(1, min_running_large)
+        self._max_pause_secs = max_pause_secs
+        self._metadata_slots = metadata_slots
+
+        lanes = (TransferLane.SMALL, TransferLane.LARGE,
+                 TransferLane.METADATA)
+        self._running = {lane: 0 for lane in lanes}
+        # Pending transfers in arrival order, (ScheduledTransfer, future).
+        self._waiters = {lane: deque() for lane in lanes}
+        # Running pausable large transfers in start order.
+        self._pausable = []
+        # Paused large transfers in pause order.
+        self._paused = deque()
+
+        # Statistics.
+        self._granted_count = {lane: 0 for lane in lanes}
+        self._waited_count = {lane: 0 for lane in lanes}
+        self._total_wait_time_ms = {lane: 0 for lane in lanes}
+        self._max_wait_time_ms = {lane: 0 for lane in lanes}
+        self._preemptions_count = 0
+
+    def get_lane(self, object_size):
+        """Returns TransferLane for object of object_size bytes."""
+        if object_size <= self._small_max_bytes:
+            return TransferLane.SMALL
+        return TransferLane.LARGE
+
+    def _running_count(self):
+        return self._running[TransferLane.SMALL] + \
+            self._running[TransferLane.LARGE]
+
+    def _has_free_slot(self):
+        return self._running_count() < self._max_slots
+
+    def _can_run_large(self):
+        return self._has_free_slot() and \
+            self._running[TransferLane.LARGE] < self._max_large_slots
+
+    def _grant(self, entry):
+        self._running[entry.lane] += 1
+        self._granted_count[entry.lane] += 1
+        if entry.lane == TransferLane.LARGE and entry.transfer is not None:
+            self._pausable.append(entry)
+
+    def _pause(self, entry):
+        _logger.debug("Pausing large transfer for waiting small transfers")
+        self._pausable.remove(entry)
+        self._running[TransferLane.LARGE] -= 1
+        entry.paused = True
+        entry.pause_start_time = time.monotonic()
+        entry.pause_timer = asyncio.get_event_loop().call_later(
+            self._max_pause_secs - entry.paused_secs,
+            self._resume_overdue, entry)
+        self._paused.append(entry)
+        self._preemptions_count += 1
+        entry.transfer.pause()
+
+    def _resume(self, entry):
+        self._paused.remove(entry)
+        entry.pause_timer.cancel()
+        entry.paused = False
+        entry.paused_secs += time.monotonic() - entry.pause_start_time
+        self._running[TransferLane.LARGE] += 1
+        self._pausable.append(entry)
+        entry.transfer.resume()
+
+    def _resume_overdue(self, entry):
+        """Resumes transfer paused for max_pause_secs, even when it
+        takes running transfers beyond max_slots till one completes.
+        """
+        if entry.paused:
+            _logger.debug("Resuming large transfer paused for {} secs".format(
+                self._max_pause_secs))
+            self._resume(entry)
+
+    def _find_preemptible(self):
+        """Returns most recently started large transfer that can be
+        paused, None if none.
+        """
+        if len(self._pausable) <= self._min_running_large:
+            return None
+        for entry in reversed(self._pausable):
+            if entry.paused_secs < self._max_pause_secs:
+                return entry
+        return None
+
+    def _next_waiter(self, lane):
+        """Returns first waiter of lane not cancelled, None if none."""
+        waiters = self._waiters[lane]
+        while waiters and waiters[0][1].done():
+            # Cancelled while waiting.
+            waiters.popleft()
+        return waiters[0] if waiters else None
+
+    def _schedule_metadata(self):
+        while self._running[TransferLane.METADATA] < self._metadata_slots:
+            waiter = self._next_waiter(TransferLane.METADATA)
+            if waiter is None:
+                break
+            entry, future = self._waiters[TransferLane.METADATA].popleft()
+            self._grant(entry)
+            future.set_result(entry)
+
+    def _schedule(self):
+        """Grants slots to waiting transfers, small ones first."""
+        # Keep large transfers moving, e.g. after running ones complete.
+        while self._paused and self._has_free_slot() and \
+                self._running[TransferLane.LARGE] < self._min_running_large:
+            self._resume(self._paused[0])
+
+        while True:
+            waiter = self._next_waiter(TransferLane.SMALL)
+            if waiter is None:
+                break
+            if not self._has_free_slot():
+                if not self._preemption_enabled:
+                    return
+                victim = self._find_preemptible()
+                if victim is None:
+                    return
+                self._pause(victim)
+            entry, future = self._waiters[TransferLane.SMALL].popleft()
+            self._grant(entry)
+            future.set_result(entry)
+
+        while self._paused and self._can_run_large():
+            self._resume(self._paused[0])
+
+        while self._can_run_large():
+            waiter = self._next_waiter(TransferLane.LARGE)
+            if waiter is None:
+                break
+            entry, future = self._waiters[TransferLane.LARGE].popleft()
+            self._grant(entry)
+            future.set_result(entry)
+
+    def _can_grant(self, lane):
+        if lane == TransferLane.METADATA:
+            return self._running[lane] < self._metadata_slots
+        if lane == TransferLane.SMALL:
+            return self._has_free_slot()
+        return not self._paused and self._can_run_large()
+
+    async def acquire(self, object_size, transfer=None, lane=None):
+        """Waits for a slot for transfer of object_size bytes.
+
+        Args:
+            transfer: Object with pause() and resume(), can be paused to
+            let small transfers run, None if not pausable.
+            lane (TransferLane): Lane to use instead of lane by size, e.g.
+            TransferLane.METADATA.
+
+        Returns:
+            ScheduledTransfer: Slot, to be passed to release().
+        """
+        if lane is None:
+            lane = self.get_lane(object_size)
+        entry = ScheduledTransfer(lane, transfer)
+        if self._next_waiter(lane) is None and self._can_grant(lane):
+            self._grant(entry)
+            return entry
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters[lane].append((entry, waiter))
+        self._waited_count[lane] += 1
+        if lane != TransferLane.METADATA:
+            # Small transfer may preempt a large one.
+            self._schedule()
+        start_time = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancel, give it back.
+                self.release(entry)
+            elif lane == TransferLane.METADATA:
+                self._schedule_metadata()
+            else:
+                self._schedule()
+            raise
+        finally:
+            wait_time_ms = int(round(
+                (time.perf_counter() - start_time) * 1000))
+            self._total_wait_time_ms[lane] += wait_time_ms
+            self._max_wait_time_ms[lane] = max(
+                self._max_wait_time_ms[lane], wait_time_ms)
+        return entry
+
+    def release(self, entry):
+        """Releases slot granted by acquire()."""
+        if entry.paused:
+            # Done while paused, e.g. aborted or paused after last chunk.
+            self._paused.remove(entry)
+            entry.pause_timer.cancel()
+        else:
+            self._running[entry.lane] -= 1
+            assert self._running[entry.lane] >= 0, \
+                "Bug: Released more than granted."
+            if entry in self._pausable:
+                self._pausable.remove(entry)
+        if entry.lane == TransferLane.METADATA:
+            self._schedule_metadata()
+        else:
+            self._schedule()
+
+    def get_stats(self):
+        """Returns slot usage and wait statistics per lane."""
+        stats = {
+            "max_slots": self._max_slots,
+            "max_large_slots": self._max_large_slots,
+            "metadata_slots": self._metadata_slots,
+            "preemptions_count": self._preemptions_count
+        }
+        for lane in (TransferLane.SMALL, TransferLane.LARGE,
+                     TransferLane.METADATA):
+            stats[lane] = {
+                "running_count": self._running[lane],
+                "waiting_count": len(self._waiters[lane]),
+                "granted_count": self._granted_count[lane],
+                "waited_count": self._waited_count[lane],
+                "total_wait_time_ms": self._total_wait_time_ms[lane],
+                "max_wait_time_ms": self._max_wait_time_ms[lane]
+            }
+        stats[TransferLane.LARGE]["paused_count"] = len(self._paused)
+        return stats
@@ -86,6 +86,9 @@ class ObjectDataGenerator:
             return self._md5
         return None
 
+    def get_md5(self):
+        return self.get_etag()
+
     async def fetch(self, chunk_size):
         pending_size = self._object_size
         # Generate only one chunk and just keep sending same for each iteration
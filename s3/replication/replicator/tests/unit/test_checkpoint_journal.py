@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+
+import os
+import threading
+
+from s3replicator.checkpoint_journal import CheckpointJournal
+
+
+def new_checkpoint(replication_id, parts):
+    return {
+        "replication-id": replication_id,
+        "upload_id": "upload-1",
+        "parts": {str(part_number): "etag{}".format(part_number)
+                  for part_number in range(1, parts + 1)}
+    }
+
+
+def test_latest_checkpoint_is_saved(tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    for parts in range(1, 21):
+        journal.save(new_checkpoint("rid-1", parts))
+        # Pending write is visible before it is written.
+        assert len(journal.load("rid-1")["parts"]) == parts
+    journal.close()
+
+    journal = CheckpointJournal(str(tmp_path))
+    assert len(journal.load("rid-1")["parts"]) == 20
+    journal.close()
+
+
+def test_remove_after_save(tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    journal.save(new_checkpoint("rid-1", 1))
+    journal.save(new_checkpoint("rid-2", 1))
+    journal.remove("rid-1")
+    assert journal.load("rid-1") is None
+    journal.close()
+    assert journal.load("rid-1") is None
+    assert journal.load("rid-2") is not None
+    assert sorted(os.listdir(str(tmp_path))) == \
+        [os.path.basename(journal._get_path("rid-2"))]
+
+
+def test_load_after_remove_before_file_is_removed(tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    journal.save(new_checkpoint("rid-1", 1))
+    # Wait till written, then hold journal thread.
+    journal._executor.submit(lambda: None).result()
+    resume_journal = threading.Event()
+    journal._executor.submit(resume_journal.wait)
+
+    try:
+        journal.remove("rid-1")
+        assert os.listdir(str(tmp_path)) != []
+        assert journal.load("rid-1") is None
+        journal.save(new_checkpoint("rid-1", 2))
+        assert len(journal.load("rid-1")["parts"]) == 2
+    finally:
+        resume_journal.set()
+    journal.close()
+    assert len(journal.load("rid-1")["parts"]) == 2
+
+
+def test_stale_checkpoints(event_loop, tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    journal.save(new_checkpoint("rid-active", 1))
+    journal.save(new_checkpoint("rid-stale", 1))
+    journal.mark_active("rid-active")
+    assert event_loop.run_until_complete(
+        journal.get_stale_checkpoints(3600)) == []
+    stale = event_loop.run_until_complete(journal.get_stale_checkpoints(-1))
+    assert [checkpoint["replication-id"] for checkpoint in stale] == \
+        ["rid-stale"]
+    journal.close()
+
+
+def test_abandoned_checkpoint_is_kept_apart(event_loop, tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    journal.save(new_checkpoint("rid-1", 1))
+    abandoned = journal.load("rid-1")
+    journal.save_abandoned(abandoned)
+    # New upload of same replication replaces its checkpoint.
+    new_upload = new_checkpoint("rid-1", 0)
+    new_upload["upload_id"] = "upload-2"
+    journal.save(new_upload)
+    journal.mark_active("rid-1")
+
+    stale = event_loop.run_until_complete(journal.get_stale_checkpoints(-1))
+    assert [(checkpoint["replication-id"], checkpoint["upload_id"])
+            for checkpoint in stale] == \
+        [("rid-1#abandoned-upload-1", "upload-1")]
+    assert stale[0]["update_time"] == abandoned["update_time"]
+    assert journal.load("rid-1")["upload_id"] == "upload-2"
+
+    journal.remove(stale[0]["replication-id"])
+    journal.close()
+    assert journal.load("rid-1") is not None
+    assert len(os.listdir(str(tmp_path))) == 1
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+
+from s3replicator.site_concurrency import PausableSiteSlots
+from s3replicator.site_concurrency import SiteConcurrencyLimits
+
+
+class FakeTransfer:
+    """Pausable transfer, records if paused."""
+
+    def __init__(self):
+        """Initialise."""
+        self.paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+
+def run_pending(event_loop):
+    """Lets scheduled callbacks and woken up waiters run."""
+    event_loop.run_until_complete(asyncio.sleep(0))
+
+
+def running_count(limits, netloc="source"):
+    return limits.get_stats()[SiteConcurrencyLimits.SOURCE][netloc][
+        "running_count"]
+
+
+def test_priority_request_is_granted_first(event_loop):
+    limits = SiteConcurrencyLimits(max_per_source_site=1)
+    held_slots = event_loop.run_until_complete(
+        limits.acquire("source", "target-1"))
+    waiting = asyncio.ensure_future(limits.acquire("source", "target-2"))
+    waiting_priority = asyncio.ensure_future(
+        limits.acquire("source", "target-3", priority=True))
+    run_pending(event_loop)
+
+    limits.release(held_slots)
+    run_pending(event_loop)
+
+    assert waiting_priority.done() and not waiting.done()
+    limits.release(waiting_priority.result())
+    event_loop.run_until_complete(waiting)
+
+
+def test_paused_transfer_gives_up_site_slots(event_loop):
+    limits = SiteConcurrencyLimits(max_per_source_site=1)
+    transfer = FakeTransfer()
+    site_slots = PausableSiteSlots(limits, "source", "target", transfer)
+    event_loop.run_until_complete(site_slots.acquire())
+
+    site_slots.pause()
+    assert transfer.paused
+    assert running_count(limits) == 0
+    other_slots = event_loop.run_until_complete(
+        limits.acquire("source", "target", priority=True))
+
+    # Resumed once slots are free again.
+    site_slots.resume()
+    run_pending(event_loop)
+    assert transfer.paused
+    limits.release(other_slots)
+    run_pending(event_loop)
+    run_pending(event_loop)
+    assert not transfer.paused
+    assert running_count(limits) == 1
+
+    site_slots.release()
+    assert running_count(limits) == 0
+
+
+def test_release_while_waiting_to_resume(event_loop):
+    limits = SiteConcurrencyLimits(max_per_source_site=1)
+    transfer = FakeTransfer()
+    site_slots = PausableSiteSlots(limits, "source", "target", transfer)
+    event_loop.run_until_complete(site_slots.acquire())
+    site_slots.pause()
+    other_slots = event_loop.run_until_complete(
+        limits.acquire("source", "target"))
+    site_slots.resume()
+    run_pending(event_loop)
+
+    site_slots.release()
+    run_pending(event_loop)
+    limits.release(other_slots)
+    run_pending(event_loop)
+
+    assert transfer.paused
+    assert running_count(limits) == 0
@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+
+from s3replicator.transfer_budget import TransferBudget
+
+
+def run_pending(event_loop):
+    """Lets scheduled callbacks and woken up waiters run."""
+    event_loop.run_until_complete(asyncio.sleep(0))
+
+
+def test_reserve_within_budget_does_not_wait(event_loop):
+    budget = TransferBudget(100)
+    assert event_loop.run_until_complete(budget.reserve(60)) == 60
+    assert event_loop.run_until_complete(budget.reserve(40)) == 40
+    assert budget.get_used_bytes() == 100
+    assert budget.get_stats()["waited_count"] == 0
+
+
+def test_oversize_reservation_is_reduced_to_budget(event_loop):
+    budget = TransferBudget(100)
+    assert event_loop.run_until_complete(budget.reserve(500)) == 100
+    budget.release(100)
+    assert budget.get_used_bytes() == 0
+
+
+def test_waiters_are_granted_in_fifo_order(event_loop):
+    budget = TransferBudget(100)
+    event_loop.run_until_complete(budget.reserve(100))
+    large = asyncio.ensure_future(budget.reserve(80))
+    small = asyncio.ensure_future(budget.reserve(10))
+    run_pending(event_loop)
+
+    # Small one fits, but waits behind large one.
+    budget.release(20)
+    run_pending(event_loop)
+    assert not large.done() and not small.done()
+
+    budget.release(80)
+    event_loop.run_until_complete(asyncio.gather(large, small))
+    assert budget.get_used_bytes() == 90
+    assert budget.get_stats()["waited_count"] == 2
+
+
+def test_cancelled_waiter_lets_next_waiters_run(event_loop):
+    budget = TransferBudget(100)
+    event_loop.run_until_complete(budget.reserve(50))
+    large = asyncio.ensure_future(budget.reserve(100))
+    small = asyncio.ensure_future(budget.reserve(50))
+    run_pending(event_loop)
+    assert not small.done()
+
+    large.cancel()
+    event_loop.run_until_complete(small)
+    assert large.cancelled()
+    assert budget.get_used_bytes() == 100
+    assert budget.get_stats()["waiting_count"] == 0
+
+
+def test_cancel_after_grant_gives_bytes_back(event_loop):
+    budget = TransferBudget(100)
+    event_loop.run_until_complete(budget.reserve(100))
+    waiting = asyncio.ensure_future(budget.reserve(100))
+    run_pending(event_loop)
+
+    # Granted, and cancelled before the waiting task resumes.
+    budget.release(100)
+    waiting.cancel()
+    run_pending(event_loop)
+    assert waiting.cancelled()
+    assert budget.get_used_bytes() == 0
@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+
+import asyncio
+
+from s3replicator.transfer_scheduler import TransferScheduler
+
+SMALL = 10
+LARGE = 5000
+
+
+class FakeTransfer:
+    """Pausable transfer, records if paused."""
+
+    def __init__(self):
+        """Initialise."""
+        self.paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+
+def new_scheduler(max_pause_secs=30):
+    return TransferScheduler(
+        4, 1000, reserved_small_slots=1, preemption_enabled=True,
+        min_running_large=1, max_pause_secs=max_pause_secs)
+
+
+def start_large(event_loop, scheduler, count):
+    transfers = [FakeTransfer() for _ in range(count)]
+    slots = [event_loop.run_until_complete(
+        scheduler.acquire(LARGE, transfer)) for transfer in transfers]
+    return transfers, slots
+
+
+def test_large_transfers_leave_reserved_small_slots(event_loop):
+    scheduler = new_scheduler()
+    start_large(event_loop, scheduler, 3)
+    waiting_large = asyncio.ensure_future(
+        scheduler.acquire(LARGE, FakeTransfer()))
+    event_loop.run_until_complete(asyncio.sleep(0))
+    assert not waiting_large.done()
+    # Reserved slot is free for a small transfer without preemption.
+    event_loop.run_until_complete(scheduler.acquire(SMALL))
+    assert scheduler.get_stats()["preemptions_count"] == 0
+    waiting_large.cancel()
+
+
+def test_small_transfer_preempts_latest_large(event_loop):
+    scheduler = new_scheduler()
+    transfers, _ = start_large(event_loop, scheduler, 3)
+    small_slots = [event_loop.run_until_complete(scheduler.acquire(SMALL))
+                   for _ in range(3)]
+    # First used the reserved slot, next two paused latest large ones.
+    assert [transfer.paused for transfer in transfers] == \
+        [False, True, True]
+
+    # Atleast min_running_large large transfer keeps running.
+    waiting_small = asyncio.ensure_future(scheduler.acquire(SMALL))
+    event_loop.run_until_complete(asyncio.sleep(0))
+    assert not waiting_small.done()
+
+    for slot in small_slots:
+        scheduler.release(slot)
+    scheduler.release(event_loop.run_until_complete(waiting_small))
+    # Resumed oldest first once no small transfers are waiting.
+    assert [transfer.paused for transfer in transfers] == \
+        [False, False, False]
+    stats = scheduler.get_stats()
+    assert stats["preemptions_count"] == 2
+    assert stats["large"]["running_count"] == 3
+    assert stats["large"]["paused_count"] == 0
+
+
+def test_paused_transfer_resumes_after_max_pause(event_loop):
+    scheduler = new_scheduler(max_pause_secs=0.05)
+    transfers, _ = start_large(event_loop, scheduler, 3)
+    for _ in range(2):
+        event_loop.run_until_complete(scheduler.acquire(SMALL))
+    assert transfers[2].paused
+
+    event_loop.run_until_complete(asyncio.sleep(0.1))
+    assert [transfer.paused for transfer in transfers] == \
+        [False, False, False]
+    # Transfer paused for max_pause_secs is not paused again.
+    waiting_small = asyncio.ensure_future(scheduler.acquire(SMALL))
+    event_loop.run_until_complete(asyncio.sleep(0))
+    assert not transfers[2].paused
+    waiting_small.cancel()
+
+
+def test_release_of_paused_transfer(event_loop):
+    scheduler = new_scheduler()
+    transfers, large_slots = start_large(event_loop, scheduler, 3)
+    for _ in range(2):
+        event_loop.run_until_complete(scheduler.acquire(SMALL))
+    # Aborted while paused.
+    scheduler.release(large_slots[2])
+    stats = scheduler.get_stats()
+    assert stats["large"]["paused_count"] == 0
+    assert stats["large"]["running_count"] == 2